@@ -6,6 +6,8 @@ import time
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 sys.path.append(os.path.join(current_dir, "python_app", "utils"))
+# process_launcher imports its siblings as utils.* (the app runs from python_app)
+sys.path.append(os.path.join(current_dir, "python_app"))
 
 from python_app.utils.process_launcher import ProcessLauncher
 
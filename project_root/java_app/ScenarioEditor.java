@@ -187,6 +187,10 @@ public class ScenarioEditor extends Application {
         primaryStage.setScene(scene);
         primaryStage.show();
         
+        // Tell the Python launcher the window is up
+        System.out.println("SQUAD_READY");
+        System.out.flush();
+        
         // Show welcome message
         if (currentFilePath == null) {
             Platform.runLater(() -> {
@@ -4,6 +4,7 @@ import models.Squad;
 import models.MovePoint;
 import models.Explanations;
 import utils.JSONHandler;
+import com.fasterxml.jackson.databind.ObjectMapper;
 import javafx.application.Application;
 import javafx.application.Platform;
 import javafx.scene.Scene;
@@ -17,9 +18,20 @@ import javafx.scene.shape.Circle;
 import javafx.scene.shape.Line;
 import javafx.animation.TranslateTransition;
 import javafx.util.Duration;
+import java.io.BufferedReader;
 import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
 import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.nio.file.StandardCopyOption;
 import java.util.ArrayList;
+import java.util.Arrays;
 import java.util.List;
 
 public class ScenarioPlayer extends Application {
@@ -33,15 +45,68 @@ public class ScenarioPlayer extends Application {
     private static final double CANVAS_WIDTH = 800;
     private static final double CANVAS_HEIGHT = 600;
     
+    // Protocol with the Python launcher (see utils/player_daemon.py)
+    private static final String READY_MARKER = "SQUAD_READY";
+    private static final PrintStream OUT =
+        new PrintStream(new FileOutputStream(FileDescriptor.out), true, StandardCharsets.UTF_8);
+    
+    private boolean daemonMode = false;
+    private Stage stage;
+    private String currentPath;
+    private String currentMode = "practice";
+    private String resultFile;
+    private boolean resultSent = false;
+    private boolean readySent = false;
+    // Playlist: scenarios played back to back in the same window
+    private List<String> playlist;
+    private int playlistIndex;
+    private int playlistCompleted;
+    private boolean playlistAborted;
+    private final List<String> playlistResults = new ArrayList<>();
+    
     @Override
     public void start(Stage primaryStage) {
         this.jsonHandler = new JSONHandler();
         this.currentAnimations = new ArrayList<>();
+        this.stage = primaryStage;
         
         // Get scenario path from parameters or show file chooser
         List<String> args = getParameters().getRaw();
-        if (!args.isEmpty()) {
-            loadScenario(args.get(0));
+        if (args.contains("--daemon")) {
+            startDaemon(primaryStage);
+            return;
+        }
+        
+        // Positional: <scenario> [mode]; options: --result-file <path> (fallback result channel),
+        // --playlist <json file> (then the only positional argument is the mode)
+        List<String> positional = new ArrayList<>();
+        String playlistFile = null;
+        for (int i = 0; i < args.size(); i++) {
+            if (args.get(i).equals("--result-file") && i + 1 < args.size()) {
+                resultFile = args.get(++i);
+            } else if (args.get(i).equals("--playlist") && i + 1 < args.size()) {
+                playlistFile = args.get(++i);
+            } else {
+                positional.add(args.get(i));
+            }
+        }
+        // Closing without an answer still reports back
+        primaryStage.setOnCloseRequest(e -> closeRequested());
+        
+        if (playlistFile != null) {
+            try {
+                String[] paths = new ObjectMapper().readValue(new File(playlistFile), String[].class);
+                startPlaylist(Arrays.asList(paths), positional.isEmpty() ? currentMode : positional.get(0));
+            } catch (IOException e) {
+                send("ERROR Could not read playlist: " + playlistFile);
+                Platform.exit();
+            }
+            return;
+        } else if (!positional.isEmpty()) {
+            if (positional.size() > 1) {
+                currentMode = positional.get(1);
+            }
+            loadScenario(positional.get(0));
         } else {
             showFileChooser(primaryStage);
             return;
@@ -72,8 +137,261 @@ public class ScenarioPlayer extends Application {
         }
     }
     
+    private void startDaemon(Stage primaryStage) {
+        daemonMode = true;
+        // Keep the JavaFX toolkit alive between scenarios
+        Platform.setImplicitExit(false);
+        primaryStage.setOnCloseRequest(e -> {
+            e.consume();
+            closeRequested();
+        });
+        
+        Thread reader = new Thread(this::readCommands, "player-commands");
+        reader.setDaemon(true);
+        reader.start();
+        send(READY_MARKER);
+    }
+    
+    private void readCommands() {
+        try (BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8))) {
+            String line;
+            while ((line = in.readLine()) != null) {
+                line = line.trim();
+                if (line.isEmpty()) {
+                    continue;
+                }
+                if (line.equals("quit")) {
+                    break;
+                }
+                if (line.equals("ping")) {
+                    // Answer from the FX thread so a frozen UI stops the heartbeat
+                    Platform.runLater(() -> send("PONG"));
+                } else if (line.startsWith("play ")) {
+                    String rest = line.substring(5);
+                    int space = rest.lastIndexOf(' ');
+                    if (space <= 0) {
+                        send("ERROR usage: play <path> <mode>");
+                        continue;
+                    }
+                    String path = rest.substring(0, space);
+                    String mode = rest.substring(space + 1);
+                    Platform.runLater(() -> playScenario(path, mode));
+                } else if (line.startsWith("playlist ")) {
+                    String rest = line.substring(9);
+                    int space = rest.indexOf(' ');
+                    if (space <= 0) {
+                        send("ERROR usage: playlist <mode> <json array>");
+                        continue;
+                    }
+                    List<String> paths;
+                    try {
+                        paths = Arrays.asList(new ObjectMapper().readValue(rest.substring(space + 1), String[].class));
+                    } catch (IOException | RuntimeException e) {
+                        send("ERROR usage: playlist <mode> <json array>");
+                        continue;
+                    }
+                    String mode = rest.substring(0, space);
+                    Platform.runLater(() -> startPlaylist(paths, mode));
+                } else {
+                    send("ERROR unknown command: " + line);
+                }
+            }
+        } catch (IOException e) {
+            send("ERROR " + e.getMessage());
+        }
+        // quit, or stdin closed because the launcher went away
+        Platform.exit();
+    }
+    
+    private void playScenario(String path, String mode) {
+        if (playlist != null) {
+            endPlaylist(true);
+        }
+        if (!showScenario(path, mode)) {
+            send("ERROR Could not load scenario: " + path);
+        }
+    }
+    
+    private boolean showScenario(String path, String mode) {
+        if (controlPanel != null) {
+            stopAnimation();
+        }
+        try {
+            this.currentScenario = jsonHandler.loadScenario(path);
+        } catch (IOException e) {
+            return false;
+        }
+        currentPath = path;
+        currentMode = mode;
+        selectedTeam = null;
+        resultSent = false;
+        
+        setupUI(stage);
+        stage.toFront();
+        send("PLAYING " + path);
+        return true;
+    }
+    
+    private void startPlaylist(List<String> paths, String mode) {
+        if (playlist != null) {
+            endPlaylist(true);
+        }
+        playlist = new ArrayList<>(paths);
+        playlistIndex = -1;
+        playlistCompleted = 0;
+        playlistAborted = false;
+        playlistResults.clear();
+        currentMode = mode;
+        advancePlaylist();
+    }
+    
+    private void advancePlaylist() {
+        // Go straight to the next scenario; one that cannot be loaded is reported and skipped
+        while (++playlistIndex < playlist.size()) {
+            String path = playlist.get(playlistIndex);
+            if (showScenario(path, currentMode)) {
+                return;
+            }
+            currentPath = path;
+            sendResult(null, "Could not load scenario");
+        }
+        endPlaylist(false);
+    }
+    
+    private void endPlaylist(boolean aborted) {
+        StringBuilder json = new StringBuilder("{");
+        json.append("\"count\":").append(playlist.size());
+        json.append(",\"played\":").append(playlistResults.size());
+        json.append(",\"completed\":").append(playlistCompleted);
+        json.append(",\"aborted\":").append(aborted);
+        json.append("}");
+        playlist = null;
+        send("PLAYLIST_DONE " + json);
+        
+        if (daemonMode) {
+            stopAnimation();
+            stage.hide();
+        } else {
+            Platform.exit();
+        }
+    }
+    
+    private void closeRequested() {
+        if (playlist != null) {
+            // Closing the window ends the whole playlist, not just this scenario
+            playlistAborted = true;
+            if (resultSent) {
+                endPlaylist(true);
+                return;
+            }
+        }
+        finishScenario(null);
+    }
+    
+    private void reportTeamChoice(Team team) {
+        StringBuilder json = new StringBuilder("{");
+        json.append("\"scenario\":").append(jsonString(currentPath));
+        json.append(",\"team_index\":").append(currentScenario.getTeams().indexOf(team));
+        json.append(",\"team\":").append(jsonString(team.getColor()));
+        json.append(",\"correct\":").append(team.isCorrectTeam());
+        json.append("}");
+        send("PARTIAL " + json);
+    }
+    
+    private void finishScenario(Team selected) {
+        if (currentScenario == null || resultSent) {
+            return;
+        }
+        resultSent = true;
+        sendResult(selected, null);
+        
+        if (playlist != null) {
+            if (playlistAborted) {
+                endPlaylist(true);
+            } else {
+                advancePlaylist();
+            }
+        } else if (daemonMode) {
+            stopAnimation();
+            stage.hide();
+        }
+    }
+    
+    private void sendResult(Team selected, String error) {
+        StringBuilder json = new StringBuilder("{");
+        json.append("\"scenario\":").append(jsonString(currentPath));
+        json.append(",\"scenario_file\":").append(jsonString(currentPath == null ? null : new File(currentPath).getName()));
+        json.append(",\"mode\":").append(jsonString(currentMode));
+        json.append(",\"completed\":").append(selected != null);
+        json.append(",\"selected_team\":").append(jsonString(selected == null ? null : selected.getColor()));
+        json.append(",\"correct\":").append(selected != null && selected.isCorrectTeam());
+        if (error != null) {
+            json.append(",\"error\":").append(jsonString(error));
+        }
+        if (playlist != null) {
+            json.append(",\"index\":").append(playlistIndex);
+            json.append(",\"total\":").append(playlist.size());
+        }
+        json.append("}");
+        send("RESULT " + json);
+        
+        if (playlist != null) {
+            if (selected != null) {
+                playlistCompleted++;
+            }
+            // The fallback file holds every result of the playlist so far
+            playlistResults.add(json.toString());
+            writeResultFile("[" + String.join(",", playlistResults) + "]");
+        } else {
+            writeResultFile(json.toString());
+        }
+    }
+    
+    private void writeResultFile(String json) {
+        if (resultFile == null) {
+            return;
+        }
+        try {
+            Path target = Paths.get(resultFile);
+            Path temp = Paths.get(resultFile + ".tmp");
+            Files.write(temp, json.getBytes(StandardCharsets.UTF_8));
+            Files.move(temp, target, StandardCopyOption.REPLACE_EXISTING, StandardCopyOption.ATOMIC_MOVE);
+        } catch (IOException e) {
+            System.err.println("Could not write result file " + resultFile + ": " + e.getMessage());
+        }
+    }
+    
+    private static synchronized void send(String line) {
+        OUT.println(line);
+        OUT.flush();
+    }
+    
+    private static String jsonString(String value) {
+        if (value == null) {
+            return "null";
+        }
+        StringBuilder sb = new StringBuilder("\"");
+        for (char c : value.toCharArray()) {
+            switch (c) {
+                case '"': sb.append("\\\""); break;
+                case '\\': sb.append("\\\\"); break;
+                case '\n': sb.append("\\n"); break;
+                case '\r': sb.append("\\r"); break;
+                case '\t': sb.append("\\t"); break;
+                default:
+                    if (c < 0x20) {
+                        sb.append(String.format("\\u%04x", (int) c));
+                    } else {
+                        sb.append(c);
+                    }
+            }
+        }
+        return sb.append('"').toString();
+    }
+    
     private void loadScenario(String filePath) {
         try {
+            this.currentPath = filePath;
             this.currentScenario = jsonHandler.loadScenario(filePath);
             System.out.println("Loaded scenario: " + currentScenario.getTitle());
         } catch (IOException e) {
@@ -107,6 +425,12 @@ public class ScenarioPlayer extends Application {
         primaryStage.setScene(scene);
         primaryStage.show();
         
+        // Tell the Python launcher the window is up (the daemon announced itself already)
+        if (!daemonMode && !readySent) {
+            readySent = true;
+            send(READY_MARKER);
+        }
+        
         // Draw initial positions and movement paths
         drawMovementPaths();
     }
@@ -166,6 +490,7 @@ public class ScenarioPlayer extends Application {
             RadioButton selected = (RadioButton) teamGroup.getSelectedToggle();
             if (selected != null) {
                 selectedTeam = (Team) selected.getUserData();
+                reportTeamChoice(selectedTeam);
                 evaluateSelection();
             } else {
                 showInfoDialog("No Selection", "Please select a team first.");
@@ -349,6 +674,8 @@ public class ScenarioPlayer extends Application {
         alert.setContentText(message);
         alert.getDialogPane().setPrefSize(400, 200);
         alert.showAndWait();
+        
+        finishScenario(selectedTeam);
     }
     
     private String getWrongReason(Team selectedTeam, Team correctTeam) {
@@ -2,6 +2,12 @@ import sys
 import os
 from PyQt5.QtWidgets import QApplication
 from windows.main_window import MainWindow
+from utils.json_handler import JSONHandler
+from utils.process_launcher import ProcessSupervisor
+from utils.history_store import HistoryStore
+from utils.profile_store import ProfileStore
+from utils.results_uploader import ResultsUploader
+from utils.settings_service import SettingsService
 
 def ensure_directories_and_background():
     """Ensure all required directories and background exist"""
@@ -33,12 +39,33 @@ def main():
     if project_root not in sys.path:
         sys.path.append(project_root)
     
+    # Config, courses and scenarios are re-read by most windows
+    JSONHandler.enable_cache(max_entries=256, max_bytes=16 * 1024 * 1024)
+    # Atomic, coalesced writes off the GUI thread
+    JSONHandler.start_writer(debounce=0.3)
+    
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(JSONHandler.flush)
+    # Stop editors/players (and the warm player daemon) with the app
+    app.aboutToQuit.connect(ProcessSupervisor.instance().kill_all)
     
     # Set application properties
     app.setApplicationName("Interactive Tactical Training System")
     app.setApplicationVersion("1.0")
     
+    # Push finished tests to the hall's results server, when one is configured
+    data_dir = os.path.join(current_dir, "data")
+    settings = SettingsService.instance(os.path.join(data_dir, "config.json"))
+    uploader = ResultsUploader.instance(data_dir)
+    uploader.configure(settings.results_server, settings.station_id)
+    HistoryStore.instance(data_dir).add_listener(uploader.on_history_event)
+    settings.settings_changed.connect(
+        lambda changes: uploader.configure(settings.results_server, settings.station_id))
+    
+    # Trainee profiles follow every saved test from here on
+    profiles = ProfileStore.instance(data_dir)
+    app.aboutToQuit.connect(lambda: profiles.save(sync=True))
+    
     # Create and show main window
     window = MainWindow()
     window.showMaximized()  # Fullscreen
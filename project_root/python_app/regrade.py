@@ -0,0 +1,251 @@
+"""
+Regrade the whole test history against the current scenario answer keys
+
+After a scenario's right_move is corrected, every stored result for it is
+stale. This tool streams history.jsonl in chunks, regrades each chunk in a
+worker process (see utils.grading), writes the corrected log next to the
+original and swaps it in atomically under the history lock. In the same
+pass it writes a cohort report:
+
+    <report dir>/changes.csv    one row per record whose score changed
+    <report dir>/trainees.csv   per trainee: tests, old/new mean and best
+    <report dir>/summary.json   totals and per-scenario difficulty
+
+Memory stays bounded: only a few chunks are in flight at a time and the
+report keeps one row per trainee and per scenario. Records without
+per-scenario answers (saved before answers were recorded) are copied
+unchanged. Run it while the training app is closed on this data folder.
+
+Usage:
+    python regrade.py [--data-dir PATH] [--workers N] [--chunk-size N] [--dry-run] [--report-dir PATH]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.file_lock import FileLock
+from utils.grading import AnswerKey, grade_records
+from utils.scenario_catalog import ScenarioCatalog
+
+_answer_key: Optional[AnswerKey] = None
+
+
+def _init_worker(keys: Dict[str, Any]):
+    global _answer_key
+    _answer_key = AnswerKey.from_dict(keys)
+
+
+def regrade_chunk(lines: List[bytes]) -> Dict[str, Any]:
+    """Regrade a chunk of log lines (runs in a worker process)"""
+    records, positions = [], []
+    output: List[Optional[bytes]] = list(lines)
+    for position, line in enumerate(lines):
+        try:
+            record = json.loads(line.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            # Copied through untouched, as HistoryStore skips it anyway
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+            positions.append(position)
+
+    grades = grade_records(records, _answer_key)
+    regraded = grades.regraded_records(records)
+
+    changes, trainees = [], {}
+    for position, old, new in zip(positions, records, regraded):
+        if new is not old:
+            output[position] = (json.dumps(new, ensure_ascii=False) + "\n").encode('utf-8')
+        old_score, new_score = old.get("score"), new.get("score")
+        if old_score != new_score:
+            changes.append([new.get("record_id", ""), new.get("user_id", ""), new.get("name", ""),
+                            new.get("date", ""), old_score, new_score])
+        user_id = str(new.get("user_id", ""))
+        stats = trainees.setdefault(user_id, [new.get("name") or "", 0, 0, 0, None, None, 0])
+        if isinstance(old_score, (int, float)) and isinstance(new_score, (int, float)):
+            stats[1] += 1
+            stats[2] += old_score
+            stats[3] += new_score
+            stats[4] = old_score if stats[4] is None else max(stats[4], old_score)
+            stats[5] = new_score if stats[5] is None else max(stats[5], new_score)
+        stats[6] += int(old_score != new_score)
+
+    return {
+        "data": b"".join(output),
+        "records": len(records),
+        "regradable": sum(1 for score in grades.score if int(score) >= 0),
+        "changes": changes,
+        "trainees": trainees,
+        "scenarios": {name: [int(grades.attempts[column]), int(grades.correct[column])]
+                      for column, name in enumerate(grades.scenario_files)},
+    }
+
+
+def read_chunks(path: str, chunk_size: int, start: int = 0, end: Optional[int] = None):
+    """Yield (lines, end offset) for complete lines between two byte offsets"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        offset = start
+        lines = []
+        for line in f:
+            if not line.endswith(b"\n") or (end is not None and offset + len(line) > end):
+                break
+            offset += len(line)
+            lines.append(line)
+            if len(lines) >= chunk_size:
+                yield lines, offset
+                lines = []
+        if lines:
+            yield lines, offset
+
+
+class CohortReport:
+    """Merges chunk results and writes the report files"""
+
+    def __init__(self, report_dir: str):
+        self.report_dir = report_dir
+        os.makedirs(report_dir, exist_ok=True)
+        self._changes_file = open(os.path.join(report_dir, "changes.csv"), 'w', encoding='utf-8-sig', newline='')
+        self._changes = csv.writer(self._changes_file)
+        self._changes.writerow(["record_id", "user_id", "name", "date", "old_score", "new_score"])
+        self.records = self.regradable = self.changed = 0
+        self.trainees: Dict[str, List[Any]] = {}
+        self.scenarios: Dict[str, List[int]] = {}
+
+    def add(self, result: Dict[str, Any]):
+        self.records += result["records"]
+        self.regradable += result["regradable"]
+        self.changed += len(result["changes"])
+        self._changes.writerows(result["changes"])
+        for user_id, (name, tests, old_sum, new_sum, old_best, new_best, changed) in result["trainees"].items():
+            stats = self.trainees.setdefault(user_id, [name, 0, 0, 0, None, None, 0])
+            stats[0] = name or stats[0]
+            stats[1] += tests
+            stats[2] += old_sum
+            stats[3] += new_sum
+            if old_best is not None:
+                stats[4] = old_best if stats[4] is None else max(stats[4], old_best)
+            if new_best is not None:
+                stats[5] = new_best if stats[5] is None else max(stats[5], new_best)
+            stats[6] += changed
+        for name, (attempts, correct) in result["scenarios"].items():
+            counts = self.scenarios.setdefault(name, [0, 0])
+            counts[0] += attempts
+            counts[1] += correct
+
+    def finish(self, extra: Dict[str, Any]) -> Dict[str, Any]:
+        self._changes_file.close()
+        with open(os.path.join(self.report_dir, "trainees.csv"), 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["user_id", "name", "tests", "old_mean", "new_mean", "old_best", "new_best",
+                             "changed"])
+            for user_id, (name, tests, old_sum, new_sum, old_best, new_best, changed) in sorted(self.trainees.items()):
+                writer.writerow([user_id, name, tests,
+                                 round(old_sum / tests, 1) if tests else "", round(new_sum / tests, 1) if tests else "",
+                                 "" if old_best is None else old_best, "" if new_best is None else new_best, changed])
+        summary = dict(extra, records=self.records, regradable=self.regradable, changed=self.changed,
+                       trainees=len(self.trainees),
+                       scenarios={name: {"attempts": attempts, "correct": correct,
+                                         "p_value": round(correct / attempts, 3) if attempts else None}
+                                  for name, (attempts, correct) in sorted(self.scenarios.items())})
+        with open(os.path.join(self.report_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+
+def regrade(data_dir: str, workers: Optional[int] = None, chunk_size: int = 20000,
+            dry_run: bool = False, report_dir: Optional[str] = None) -> Dict[str, Any]:
+    data_dir = os.path.abspath(data_dir)
+    log_path = os.path.join(data_dir, "history.jsonl")
+    temp_path = log_path + ".regrade.tmp"
+    report_dir = report_dir or os.path.join(data_dir, "reports", "regrade_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+
+    catalog = ScenarioCatalog.instance(os.path.join(data_dir, "scenarios"))
+    catalog.refresh()
+    keys = AnswerKey(catalog).to_dict()
+    print(f"🔑 Answer keys for {sum(1 for key in keys.values() if key)} scenario(s); "
+          f"regrading with {workers} worker(s)")
+
+    report = CohortReport(report_dir)
+    end_offset = 0
+    output = None if dry_run else open(temp_path, 'wb')
+    try:
+        if os.path.exists(log_path):
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(keys,)) as pool:
+                # A bounded window of chunks in flight keeps memory flat; results
+                # are consumed in log order so the new log keeps record order
+                in_flight = deque()
+                for lines, end_offset in read_chunks(log_path, chunk_size):
+                    in_flight.append(pool.submit(regrade_chunk, lines))
+                    if len(in_flight) >= workers * 2:
+                        _consume(in_flight.popleft().result(), report, output)
+                while in_flight:
+                    _consume(in_flight.popleft().result(), report, output)
+            print(f"📊 {report.records} record(s) regraded, {report.changed} score(s) changed")
+
+        if output is not None:
+            _swap_in(data_dir, log_path, temp_path, output, end_offset, keys, chunk_size, report)
+            output = None
+    finally:
+        if output is not None:
+            output.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    summary = report.finish({"data_dir": data_dir, "workers": workers, "dry_run": dry_run,
+                             "seconds": round(time.monotonic() - started, 2)})
+    print(f"📝 Report written to {report_dir}")
+    return summary
+
+
+def _consume(result: Dict[str, Any], report: CohortReport, output):
+    report.add(result)
+    if output is not None:
+        output.write(result["data"])
+
+
+def _swap_in(data_dir, log_path, temp_path, output, end_offset, keys, chunk_size, report):
+    """Replace the log with the regraded one, including records appended meanwhile"""
+    with FileLock(os.path.join(data_dir, "history.lock"), timeout=60):
+        if os.path.exists(log_path) and os.path.getsize(log_path) > end_offset:
+            _init_worker(keys)
+            for lines, _ in read_chunks(log_path, chunk_size, start=end_offset):
+                _consume(regrade_chunk(lines), report, output)
+        output.flush()
+        os.fsync(output.fileno())
+        output.close()
+        os.replace(temp_path, log_path)
+        # The history snapshot, trainee profiles and item statistics were all
+        # derived from the old log; each is rebuilt from the new one when loaded
+        for stale in ("history.snapshot.json", "profiles.json", "item_stats.json"):
+            try:
+                os.remove(os.path.join(data_dir, stale))
+            except FileNotFoundError:
+                pass
+    print(f"✅ History rewritten: {log_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU core")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="log lines per work item")
+    parser.add_argument("--dry-run", action="store_true", help="write the report but leave the history as is")
+    parser.add_argument("--report-dir", default=None)
+    args = parser.parse_args(argv)
+    regrade(args.data_dir, args.workers, args.chunk_size, args.dry_run, args.report_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.course_repository import CourseRepository
+from utils.json_handler import JSONHandler
+
+
+class CourseRepositoryBatchTest(unittest.TestCase):
+    """A batch is written once, or not at all"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "courses.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"id": "course_001", "title": "A"}, {"id": "course_002", "title": "B"}], f)
+        self.repository = CourseRepository(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_batch_writes_once(self):
+        with mock.patch.object(JSONHandler, "write_json", wraps=JSONHandler.write_json) as write:
+            with self.repository.batch() as batch:
+                self.repository.update("course_001", {"title": "A2"})
+                self.repository.delete("course_002")
+        self.assertTrue(batch.saved)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(CourseRepository(self.path).all(), [{"id": "course_001", "title": "A2"}])
+
+    def test_failed_save_rolls_back_the_batch(self):
+        with mock.patch.object(JSONHandler, "write_json", return_value=False):
+            with self.repository.batch() as batch:
+                self.assertTrue(self.repository.update("course_001", {"title": "A2"}))
+                self.assertTrue(self.repository.delete("course_002"))
+        self.assertFalse(batch.saved)
+        self.assertEqual([course["title"] for course in self.repository.all()], ["A", "B"])
+
+    def test_rollback_discards_changes_without_writing(self):
+        with mock.patch.object(JSONHandler, "write_json") as write:
+            with self.repository.batch() as batch:
+                self.repository.delete("course_001")
+                batch.rollback()
+        self.assertFalse(batch.saved)
+        write.assert_not_called()
+        self.assertEqual(len(self.repository), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
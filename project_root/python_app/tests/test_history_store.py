@@ -0,0 +1,101 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history_store import HistoryStore
+
+
+class HistoryStoreTornTailTest(unittest.TestCase):
+    """An interrupted append must not take the next record down with it"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.data_dir, "history.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_append_after_torn_line(self):
+        with open(self.log_path, 'wb') as f:
+            f.write(b'{"a": 1}\n{"a":2, "tor')
+
+        store = HistoryStore(self.data_dir)
+        self.assertTrue(store.append({"a": 3}))
+        self.assertEqual(store.read_all(), [{"a": 1}, {"a": 3}])
+
+        with open(self.log_path, 'rb') as f:
+            self.assertEqual(f.read(), b'{"a": 1}\n{"a": 3}\n')
+        self.assertEqual(HistoryStore(self.data_dir).read_all(), [{"a": 1}, {"a": 3}])
+
+    def test_other_instance_sees_records_after_torn_line(self):
+        with open(self.log_path, 'wb') as f:
+            f.write(b'{"a": 1}\n{"a":2, "tor')
+
+        reader = HistoryStore(self.data_dir)
+        self.assertEqual(reader.read_all(), [{"a": 1}])
+        self.assertTrue(HistoryStore(self.data_dir).extend([{"a": 3}, {"a": 4}]))
+        self.assertEqual(reader.read_all(), [{"a": 1}, {"a": 3}, {"a": 4}])
+
+        writer = HistoryStore(self.data_dir)
+        self.assertTrue(writer.append({"a": 5}))
+        self.assertEqual(writer.read_all(), reader.read_all())
+
+
+class HistoryStoreClearTest(unittest.TestCase):
+    """A clear() in another process is noticed even after the log grew back"""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_clear_and_append_past_old_offset(self):
+        reader = HistoryStore(self.data_dir)
+        reader.extend([{"a": 1}, {"a": 2}])
+        self.assertEqual(reader.read_all(), [{"a": 1}, {"a": 2}])
+
+        writer = HistoryStore(self.data_dir)
+        self.assertTrue(writer.clear())
+        writer.extend([{"b": "x" * 20}, {"b": "y" * 20}])
+        self.assertEqual(reader.read_all(), [{"b": "x" * 20}, {"b": "y" * 20}])
+
+    def test_snapshot_of_cleared_log_is_not_used(self):
+        store = HistoryStore(self.data_dir)
+        store.extend([{"a": 1}, {"a": 2}])
+        store.compact()
+
+        other = HistoryStore(self.data_dir)
+        other.clear()
+        other.extend([{"b": "x" * 20}])
+        store.compact()  # still built from the old log: must not be installed
+        self.assertEqual(HistoryStore(self.data_dir).read_all(), [{"b": "x" * 20}])
+
+
+class HistoryStoreMigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.legacy_path = os.path.join(self.data_dir, "history.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_legacy_file_is_copied_and_kept(self):
+        with open(self.legacy_path, 'w', encoding='utf-8') as f:
+            f.write('[{"a": 1}, {"a": 2}]')
+
+        self.assertEqual(HistoryStore(self.data_dir).read_all(), [{"a": 1}, {"a": 2}])
+        self.assertTrue(os.path.exists(self.legacy_path))
+
+        store = HistoryStore(self.data_dir)
+        store.append({"a": 3})
+        self.assertEqual(HistoryStore(self.data_dir).read_all(), [{"a": 1}, {"a": 2}, {"a": 3}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_handler import AtomicJSONWriter, JSONHandler
+
+
+class AtomicJSONWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.data_dir, "data.json")
+        JSONHandler._write_atomic(self.path, {"v": 1})
+        self.writer = AtomicJSONWriter(debounce=0, max_delay=0)
+
+    def tearDown(self):
+        self.writer.stop()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_write_in_progress_is_visible(self):
+        started, release = threading.Event(), threading.Event()
+        write_atomic = JSONHandler._write_atomic
+
+        def slow_write(file_path, data):
+            started.set()
+            release.wait(5)
+            return write_atomic(file_path, data)
+
+        with mock.patch.object(JSONHandler, "_write_atomic", side_effect=slow_write):
+            self.writer.submit(self.path, {"v": 2})
+            self.assertTrue(started.wait(5))
+            self.assertEqual(self.writer.pending_data(self.path), (True, {"v": 2}))
+            release.set()
+            self.assertTrue(self.writer.flush(5))
+        self.assertEqual(self.writer.pending_data(self.path), (False, None))
+        self.assertEqual(JSONHandler.read_json(self.path, use_cache=False), {"v": 2})
+
+    def test_failed_write_is_retried(self):
+        self.writer.RETRY_DELAY = 0.01
+        write_atomic = JSONHandler._write_atomic
+        outcomes = iter([False, False])
+
+        def flaky_write(file_path, data):
+            return next(outcomes, None) is not False and write_atomic(file_path, data)
+
+        with mock.patch.object(JSONHandler, "_write_atomic", side_effect=flaky_write):
+            self.writer.submit(self.path, {"v": 2})
+            self.assertTrue(self.writer.flush(5))
+        self.assertEqual(self.writer.stats()["failures"], 2)
+        self.assertEqual(JSONHandler.read_json(self.path, use_cache=False), {"v": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
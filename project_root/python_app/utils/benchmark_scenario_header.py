@@ -0,0 +1,97 @@
+"""
+Benchmark: header-only scenario title extraction vs. full read_json
+
+Generates large synthetic scenarios (many teams, squads, move points and
+long Arabic explanations) and compares JSONHandler.read_scenario_header
+with JSONHandler.read_json on bytes read and time per file.
+
+Usage:
+    python -m utils.benchmark_scenario_header [--teams N] [--squads N] [--files N] [--title-last]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.json_handler import JSONHandler
+
+
+def make_scenario(teams: int, squads: int, moves: int, title_last: bool) -> dict:
+    """Build a synthetic scenario shaped like the editor's output"""
+    explanation = "فريق ألفا تحرك مع تغطية مثالية ورؤية جيدة. " * 8
+    team_list = []
+    for t in range(teams):
+        squad_list = []
+        for _ in range(squads):
+            squad = {f"move_{m + 1}": {"x": random.randint(0, 800), "y": random.randint(0, 600)}
+                     for m in range(moves)}
+            squad_list.append(squad)
+        team_list.append({
+            "color": ["red", "blue", "green"][t % 3],
+            "squads": squad_list,
+            "right_move": t % 3,
+            "explanations": {"right": explanation, "wrong_1": explanation, "wrong_2": explanation},
+        })
+
+    header = {"title": "دورية الحركة في القطاع A", "background": "sector_a_map.png"}
+    body = {"teams": team_list, "created_by": "benchmark", "date": "2025-01-01"}
+    return {**body, **header} if title_last else {**header, **body}
+
+
+def time_per_file(paths, reader) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        reader(path)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=60)
+    parser.add_argument("--squads", type=int, default=40)
+    parser.add_argument("--moves", type=int, default=3)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--title-last", action="store_true",
+                        help="put title/background after the teams (worst case for the scanner)")
+    args = parser.parse_args()
+
+    # Measure real parsing, not the read cache
+    JSONHandler.disable_cache()
+    random.seed(42)
+    work_dir = tempfile.mkdtemp(prefix="scenario_bench_")
+    try:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(work_dir, f"scenario_{i:03d}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(make_scenario(args.teams, args.squads, args.moves, args.title_last),
+                          f, ensure_ascii=False, indent=2)
+            paths.append(path)
+
+        file_size = sum(os.path.getsize(p) for p in paths) / len(paths)
+        header_bytes = sum(JSONHandler.scan_json_header(p, ("title", "background"))[1]
+                           for p in paths) / len(paths)
+
+        full_time = time_per_file(paths, JSONHandler.read_json)
+        header_time = time_per_file(paths, JSONHandler.read_scenario_header)
+
+        print(f"📊 {args.files} synthetic scenarios, {args.teams} teams x {args.squads} squads, "
+              f"title {'last' if args.title_last else 'first'}")
+        print(f"{'reader':<22}{'bytes read/file':>18}{'ms/file':>12}")
+        print(f"{'read_json':<22}{file_size:>18,.0f}{full_time * 1000:>12.3f}")
+        print(f"{'read_scenario_header':<22}{header_bytes:>18,.0f}{header_time * 1000:>12.3f}")
+        if header_time > 0:
+            print(f"⚡ Speedup: {full_time / header_time:.1f}x, "
+                  f"{100 * header_bytes / file_size:.2f}% of bytes read")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from utils.json_handler import JSONHandler
+
+
+class CourseRepository:
+    """Id-indexed view of courses.json shared by every window.
+
+    Courses live in an OrderedDict keyed by id, so lookups and updates do
+    not scan the list, and file order is preserved when saving. Each
+    mutation persists through JSONHandler.write_json; inside batch() the
+    save is deferred until the block exits, so several changes cost a
+    single write. A failed save rolls the in-memory courses back, for a
+    batch as a whole. New ids are monotonic: course_<highest number + 1>.
+    """
+
+    ID_PREFIX = "course_"
+    _ID_PATTERN = re.compile(r"^course_(\d+)$")
+    _instances: Dict[str, "CourseRepository"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, courses_file: str):
+        self.courses_file = os.path.abspath(courses_file)
+        self._lock = threading.RLock()
+        self._courses: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._next_number = 1
+        self._batch_depth = 0
+        self._dirty = False
+        self.reload()
+
+    @classmethod
+    def instance(cls, courses_file: str) -> "CourseRepository":
+        """Return the shared repository for a courses file"""
+        key = os.path.normcase(os.path.abspath(courses_file))
+        with cls._instances_lock:
+            repository = cls._instances.get(key)
+            if repository is None:
+                repository = cls(courses_file)
+                cls._instances[key] = repository
+            return repository
+
+    def reload(self):
+        """Re-read courses.json, e.g. after it was edited by hand"""
+        courses = JSONHandler.read_json(self.courses_file) or []
+        if not isinstance(courses, list):
+            print(f"⚠️ Ignoring malformed courses file: {self.courses_file}")
+            courses = []
+
+        courses = [course for course in courses if isinstance(course, dict)]
+        with self._lock:
+            self._courses = OrderedDict()
+            self._next_number = 1
+            for course in courses:
+                if course.get('id'):
+                    self._track_id(course['id'])
+
+            # Legacy entries without an id, or clashing random ids, get fresh ones
+            needs_save = False
+            for course in courses:
+                course_id = course.get('id')
+                if not course_id or course_id in self._courses:
+                    course_id = self.new_id()
+                    course['id'] = course_id
+                    needs_save = True
+                self._courses[course_id] = course
+
+            if needs_save:
+                self._save()
+
+    def _track_id(self, course_id: str):
+        match = self._ID_PATTERN.match(str(course_id))
+        if match:
+            self._next_number = max(self._next_number, int(match.group(1)) + 1)
+
+    def new_id(self) -> str:
+        """Reserve the next free course id"""
+        with self._lock:
+            course_id = f"{self.ID_PREFIX}{self._next_number:03d}"
+            self._next_number += 1
+            return course_id
+
+    def get(self, course_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of one course, or None"""
+        with self._lock:
+            course = self._courses.get(course_id)
+            return dict(course) if course is not None else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Return copies of all courses in file order"""
+        with self._lock:
+            return [dict(course) for course in self._courses.values()]
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+    def __contains__(self, course_id: str) -> bool:
+        return course_id in self._courses
+
+    def add(self, course: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add a course (an id is generated when missing) and return it"""
+        with self._lock:
+            course = dict(course)
+            course_id = course.get('id')
+            if not course_id or course_id in self._courses:
+                course_id = self.new_id()
+                course['id'] = course_id
+            else:
+                self._track_id(course_id)
+            self._courses[course_id] = course
+            if not self._commit():
+                del self._courses[course_id]
+                return None
+            return dict(course)
+
+    def update(self, course_id: str, changes: Dict[str, Any]) -> bool:
+        """Merge changes into an existing course"""
+        with self._lock:
+            course = self._courses.get(course_id)
+            if course is None:
+                print(f"❌ Course not found: {course_id}")
+                return False
+            previous = dict(course)
+            course.update(changes)
+            course['id'] = course_id
+            if not self._commit():
+                self._courses[course_id] = previous
+                return False
+            return True
+
+    def delete(self, course_id: str) -> bool:
+        """Remove a course"""
+        with self._lock:
+            if course_id not in self._courses:
+                print(f"❌ Course not found: {course_id}")
+                return False
+            snapshot = OrderedDict(self._courses)
+            del self._courses[course_id]
+            if not self._commit():
+                self._courses = snapshot
+                return False
+            return True
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations into one write to courses.json.
+
+        Yields a CourseBatch whose saved flag tells, after the block, whether
+        the changes were written. If the save fails, the block raises or
+        calls rollback(), every change made in the batch is undone.
+        """
+        with self._lock:
+            result = CourseBatch()
+            # update() changes courses in place, so copy them
+            snapshot = OrderedDict((course_id, dict(course)) for course_id, course in self._courses.items())
+            self._batch_depth += 1
+            try:
+                yield result
+            except BaseException:
+                self._batch_depth -= 1
+                self._restore(snapshot)
+                raise
+            self._batch_depth -= 1
+            if result.rolled_back:
+                self._restore(snapshot)
+                result.saved = False
+            elif self._batch_depth == 0 and self._dirty and not self._save():
+                print(f"❌ Failed to save courses, rolling back: {self.courses_file}")
+                self._restore(snapshot)
+                result.saved = False
+
+    def _restore(self, snapshot: "OrderedDict[str, Dict[str, Any]]"):
+        self._courses = snapshot
+        if self._batch_depth == 0:
+            # Back to what is on disk (the outermost batch started from it)
+            self._dirty = False
+
+    def _commit(self) -> bool:
+        """Persist now, or mark dirty when inside a batch"""
+        if self._batch_depth:
+            self._dirty = True
+            return True
+        return self._save()
+
+    def _save(self) -> bool:
+        self._dirty = False
+        return JSONHandler.write_json(self.courses_file, list(self._courses.values()))
+
+
+class CourseBatch:
+    """Handle yielded by CourseRepository.batch()"""
+
+    def __init__(self):
+        self.saved = True
+        self.rolled_back = False
+
+    def rollback(self):
+        """Undo the batch's changes when it exits instead of saving them"""
+        self.rolled_back = True
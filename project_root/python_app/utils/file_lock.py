@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive lock shared between processes, backed by a lock file.
+
+    Uses flock() on POSIX and msvcrt.locking() on Windows; the lock is
+    released when the file is closed, so a crashed holder never leaves it
+    stuck. Re-entrant within a thread, so nested `with lock:` blocks work.
+
+        with FileLock(path + ".lock"):
+            ...
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = 10.0, poll_interval: float = 0.05):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self) -> bool:
+        """Take the lock, waiting up to timeout seconds (None waits forever)"""
+        if not self._thread_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            return False
+        if self._depth:
+            self._depth += 1
+            return True
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        handle = open(self.path, 'a+b')
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    handle.close()
+                    self._thread_lock.release()
+                    return False
+                time.sleep(self.poll_interval)
+        self._file = handle
+        self._depth = 1
+        return True
+
+    def release(self):
+        """Give the lock back (the last release unlocks the file)"""
+        if not self._depth:
+            return
+        self._depth -= 1
+        if not self._depth:
+            handle, self._file = self._file, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+            handle.close()
+        self._thread_lock.release()
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"Could not lock {self.path} within {self.timeout}s")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
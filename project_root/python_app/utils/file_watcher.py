@@ -0,0 +1,188 @@
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+
+class DirectoryWatcher(QObject):
+    """Watches folders and emits debounced per-file add/change/remove events.
+
+    Uses QFileSystemWatcher (inotify / ReadDirectoryChangesW / kqueue) and
+    falls back to polling for folders it cannot watch, or for every folder
+    when SQUAD_WATCHER_POLL=1 is set. Each burst of notifications for a
+    folder is collapsed into one files_changed(directory, added, changed,
+    removed) signal, computed by diffing (mtime_ns, size) snapshots.
+    A folder watched for named files only watches those files while they
+    all exist, so writes to its other files do not trigger a rescan.
+    """
+
+    files_changed = pyqtSignal(str, list, list, list)
+
+    _instance: Optional["DirectoryWatcher"] = None
+
+    def __init__(self, debounce_ms: int = 300, poll_interval_ms: int = 2000, parent=None):
+        super().__init__(parent)
+        self._snapshots: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._extensions: Dict[str, Optional[Tuple[str, ...]]] = {}
+        self._names: Dict[str, Tuple[str, ...]] = {}
+        self._dirty = set()
+        self._polled = set()
+        self._force_polling = os.environ.get("SQUAD_WATCHER_POLL") == "1"
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._process_dirty)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self._poll)
+
+    @classmethod
+    def instance(cls) -> "DirectoryWatcher":
+        """Return the application-wide watcher"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def normalize(directory: str) -> str:
+        """Canonical form used for the directory argument of files_changed"""
+        return os.path.normcase(os.path.abspath(directory))
+
+    def watch(self, directory: str, extensions: Optional[Iterable[str]] = None,
+              names: Optional[Iterable[str]] = None):
+        """Start watching a folder, or only the given file names in it (idempotent)"""
+        key = self.normalize(directory)
+        if key in self._snapshots:
+            return
+        os.makedirs(key, exist_ok=True)
+        self._extensions[key] = tuple(ext.lower() for ext in extensions) if extensions else None
+        if names:
+            self._names[key] = tuple(names)
+        self._snapshots[key] = self._scan(key)
+
+        if self._force_polling or not self._add_paths(key):
+            print(f"👀 Polling for changes in: {key}")
+            self._polled.add(key)
+            if not self._poll_timer.isActive():
+                self._poll_timer.start()
+
+    def _add_paths(self, key: str) -> bool:
+        snapshot = self._snapshots[key]
+        names = self._names.get(key)
+        if names and all(name in snapshot for name in names):
+            # Only the named files: a replaced file is re-added after the rescan
+            self._watch_files(key, snapshot)
+            return bool(set(os.path.join(key, name) for name in names) & set(self._watcher.files()))
+        if key not in self._watcher.directories() and not self._watcher.addPath(key):
+            return False
+        # Watch the files too, to catch in-place modifications
+        self._watch_files(key, snapshot)
+        return True
+
+    def disconnect_listener(self, slot):
+        """Disconnect a slot from files_changed (no error if it is not connected)"""
+        try:
+            self.files_changed.disconnect(slot)
+        except TypeError:
+            pass
+
+    def unwatch(self, directory: str):
+        """Stop watching a folder"""
+        key = self.normalize(directory)
+        snapshot = self._snapshots.pop(key, None)
+        if snapshot is None:
+            return
+        self._extensions.pop(key, None)
+        self._names.pop(key, None)
+        self._polled.discard(key)
+        self._dirty.discard(key)
+        paths = [key] + [os.path.join(key, name) for name in snapshot]
+        watched = set(self._watcher.directories()) | set(self._watcher.files())
+        to_remove = [p for p in paths if p in watched]
+        if to_remove:
+            self._watcher.removePaths(to_remove)
+        if not self._polled:
+            self._poll_timer.stop()
+
+    def _scan(self, directory: str) -> Dict[str, Tuple[int, int]]:
+        names = self._names.get(directory)
+        entries = {}
+        if names:
+            for name in names:
+                try:
+                    st = os.stat(os.path.join(directory, name))
+                    entries[name] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+            return entries
+
+        extensions = self._extensions.get(directory)
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if extensions and not entry.name.lower().endswith(extensions):
+                        continue
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            entries[entry.name] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    def _watch_files(self, directory: str, names: Iterable[str]):
+        watched = set(self._watcher.files())
+        paths = [os.path.join(directory, name) for name in names]
+        missing = [p for p in paths if p not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _rewatch(self, key: str):
+        names = self._names.get(key)
+        if names and key in self._watcher.directories() and all(name in self._snapshots[key] for name in names):
+            # The named files are back: stop rescanning on every write in the folder
+            self._watcher.removePath(key)
+        self._add_paths(key)
+
+    def _on_directory_changed(self, path: str):
+        self._mark_dirty(self.normalize(path))
+
+    def _on_file_changed(self, path: str):
+        self._mark_dirty(self.normalize(os.path.dirname(path)))
+
+    def _mark_dirty(self, key: str):
+        if key in self._snapshots:
+            self._dirty.add(key)
+            self._debounce_timer.start()
+
+    def _poll(self):
+        for key in self._polled:
+            self._dirty.add(key)
+        self._process_dirty()
+
+    def _process_dirty(self):
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            old = self._snapshots.get(key)
+            if old is None:
+                continue
+            new = self._scan(key)
+            self._snapshots[key] = new
+
+            added = sorted(name for name in new if name not in old)
+            removed = sorted(name for name in old if name not in new)
+            changed = sorted(name for name in new if name in old and new[name] != old[name])
+
+            if key not in self._polled:
+                # Atomic saves replace the file, which drops it from the watch list
+                self._rewatch(key)
+            if added or changed or removed:
+                self.files_changed.emit(key, added, changed, removed)
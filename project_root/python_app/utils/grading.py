@@ -0,0 +1,253 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: batch grading falls back to grading record by record
+    np = None
+
+from utils.scenario_catalog import ScenarioCatalog
+
+
+class AnswerKey:
+    """Team colors and the correct team (right_move == 1) per scenario file.
+
+    Read from the catalog's packed views, which are repacked whenever a
+    scenario file changes, so a corrected answer key is picked up on the
+    next lookup. Files that are missing or unreadable have no key.
+    """
+
+    def __init__(self, catalog: Optional[ScenarioCatalog]):
+        self.catalog = catalog
+        self._keys: Dict[str, Optional[Tuple[List[str], List[bool]]]] = {}
+
+    @classmethod
+    def from_dict(cls, keys: Dict[str, Any]) -> "AnswerKey":
+        """A fixed key from to_dict() (e.g. in a worker process); other files have no key"""
+        answer_key = cls(None)
+        answer_key._keys = {name: (list(key[0]), list(key[1])) if key else None for name, key in keys.items()}
+        return answer_key
+
+    def to_dict(self, scenario_files=None) -> Dict[str, Any]:
+        """Keys of the given files (default: every catalog scenario) as plain data"""
+        if scenario_files is None:
+            if self.catalog is not None:
+                scenario_files = [entry["file_name"] for entry in self.catalog.list_scenarios(include_invalid=True)]
+            else:
+                scenario_files = list(self._keys)
+        return {name: self.lookup(name) for name in scenario_files}
+
+    def lookup(self, scenario_file: str) -> Optional[Tuple[List[str], List[bool]]]:
+        """(team colors, is-correct flags) in team order, or None"""
+        if scenario_file not in self._keys:
+            view = self.catalog.load_view(scenario_file) if scenario_file and self.catalog is not None else None
+            if view is None or not view.team_count:
+                self._keys[scenario_file] = None
+            else:
+                colors = [str(color or "") for color in view.team_colors()]
+                self._keys[scenario_file] = (colors, [right_move == 1 for right_move in view.right_moves()])
+        return self._keys[scenario_file]
+
+
+def answer_scenario_file(answer: Dict[str, Any]) -> str:
+    """The scenario file an answer (player result or stored answer) refers to"""
+    return answer.get("scenario_file") or os.path.basename(answer.get("scenario") or "")
+
+
+def team_outcomes(key: Tuple[List[str], List[bool]], choice: int) -> Dict[str, bool]:
+    """color -> whether the decision on that team was right (chosen exactly if correct)"""
+    colors, correct_flags = key
+    return {color: (team == choice) == is_correct
+            for team, (color, is_correct) in enumerate(zip(colors, correct_flags))}
+
+
+def grade_answers(answers: List[Dict[str, Any]], answer_key: AnswerKey) -> Dict[str, Any]:
+    """Grade one test: the selected team of every scenario against its answer key.
+
+    Returns right, wrong, score (percent, rounded like finish_test) and a
+    per-scenario list with the correct team and per-team outcomes: a team
+    is graded right when it was chosen exactly if it is the correct one.
+    Answers whose scenario has no key keep the player's correct flag.
+    """
+    scenarios = []
+    for answer in answers:
+        scenario_file = answer_scenario_file(answer)
+        selected = answer.get("selected_team")
+        key = answer_key.lookup(scenario_file)
+        if key is None:
+            scenarios.append({"scenario_file": scenario_file, "selected_team": selected,
+                              "correct": bool(answer.get("correct", False)), "graded": False,
+                              "correct_team": None, "teams": []})
+            continue
+        colors, correct_flags = key
+        teams = [{"color": color, "chosen": color == selected, "is_correct": is_correct,
+                  "right": (color == selected) == is_correct}
+                 for color, is_correct in zip(colors, correct_flags)]
+        scenarios.append({
+            "scenario_file": scenario_file,
+            "selected_team": selected,
+            "correct": any(team["chosen"] and team["is_correct"] for team in teams),
+            "graded": True,
+            "correct_team": next((team["color"] for team in teams if team["is_correct"]), None),
+            "teams": teams,
+        })
+    right = sum(1 for scenario in scenarios if scenario["correct"])
+    total = len(scenarios)
+    return {
+        "right": right,
+        "wrong": total - right,
+        "score": round(right / total * 100) if total else 0,
+        "scenarios": scenarios,
+    }
+
+
+class BatchGrades:
+    """Result of grade_records: per-record totals plus per-scenario statistics.
+
+    right, wrong and score hold one entry per record (score is -1 for
+    records without stored answers, which cannot be regraded). For each
+    scenario in scenario_files, attempts and correct count its answers and
+    team_choices[s][t] how often team t was chosen. Per answer (flattened
+    in record order) answer_scenarios and answer_choices give the scenario
+    column and chosen team index (-1 none, -2 no answer key).
+    """
+
+    def __init__(self, right, wrong, score, answer_correct, scenario_files, attempts, correct, team_choices,
+                 scenario_keys, answer_scenarios, answer_choices):
+        self.right = right
+        self.wrong = wrong
+        self.score = score
+        self.answer_correct = answer_correct
+        self.scenario_files = scenario_files
+        self.attempts = attempts
+        self.correct = correct
+        self.team_choices = team_choices
+        self.scenario_keys = scenario_keys
+        self.answer_scenarios = answer_scenarios
+        self.answer_choices = answer_choices
+
+    def team_correct(self, position: int) -> Optional[Dict[str, bool]]:
+        """Per-team outcome of one flattened answer, as stored in history answers"""
+        key = self.scenario_keys[int(self.answer_scenarios[position])]
+        if key is None:
+            return None
+        return team_outcomes(key, int(self.answer_choices[position]))
+
+    def regraded_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of the records with right/wrong/score/answers replaced by the new grades"""
+        regraded = []
+        position = 0
+        for index, record in enumerate(records):
+            answers = record.get("answers") or []
+            if int(self.score[index]) < 0:
+                regraded.append(record)
+                continue
+            record = dict(record, right=int(self.right[index]), wrong=int(self.wrong[index]),
+                          score=int(self.score[index]))
+            record["answers"] = []
+            for offset, answer in enumerate(answers):
+                record["answers"].append(dict(answer, correct=bool(self.answer_correct[position + offset]),
+                                              team_correct=self.team_correct(position + offset) or {}))
+            position += len(answers)
+            regraded.append(record)
+        return regraded
+
+
+def grade_records(records: List[Dict[str, Any]], answer_key: AnswerKey) -> BatchGrades:
+    """Regrade many stored test records at once.
+
+    The answers of all records are flattened into arrays (record, scenario,
+    chosen team) in one pass; correctness, per-record totals and
+    per-scenario counts are then array operations over the answer key
+    matrix. Without NumPy each record is graded with grade_answers.
+    """
+    if np is None:
+        return _grade_records_python(records, answer_key)
+
+    scenario_files: List[str] = []
+    scenario_index: Dict[str, int] = {}
+    color_index: List[Dict[str, int]] = []
+    record_ids, scenario_ids, choices, fallback = [], [], [], []
+    has_answers = np.zeros(len(records), dtype=bool)
+
+    for index, record in enumerate(records):
+        answers = record.get("answers") or []
+        if answers:
+            has_answers[index] = True
+        for answer in answers:
+            scenario_file = answer_scenario_file(answer)
+            column = scenario_index.get(scenario_file)
+            if column is None:
+                key = answer_key.lookup(scenario_file)
+                column = scenario_index[scenario_file] = len(scenario_files)
+                scenario_files.append(scenario_file)
+                color_index.append({color: team for team, color in enumerate(key[0])} if key else None)
+            colors = color_index[column]
+            record_ids.append(index)
+            scenario_ids.append(column)
+            # -1: no team chosen (or unknown color), -2: scenario has no key
+            choices.append(-2 if colors is None else colors.get(answer.get("selected_team"), -1))
+            fallback.append(bool(answer.get("correct", False)))
+
+    team_count = max([len(colors) for colors in color_index if colors] + [1])
+    key_matrix = np.zeros((len(scenario_files), team_count), dtype=bool)
+    for column, scenario_file in enumerate(scenario_files):
+        key = answer_key.lookup(scenario_file)
+        if key is not None:
+            key_matrix[column, :len(key[1])] = key[1]
+
+    record_ids = np.asarray(record_ids, dtype=np.int64)
+    scenario_ids = np.asarray(scenario_ids, dtype=np.int64)
+    choices = np.asarray(choices, dtype=np.int64)
+    answer_correct = np.asarray(fallback, dtype=bool)
+    keyed = choices != -2
+    answer_correct[keyed] = False
+    chosen = choices >= 0
+    answer_correct[chosen] = key_matrix[scenario_ids[chosen], choices[chosen]]
+
+    right = np.bincount(record_ids, weights=answer_correct, minlength=len(records)).astype(np.int64)
+    total = np.bincount(record_ids, minlength=len(records))
+    score = np.rint(np.divide(right * 100.0, total, out=np.zeros(len(records)), where=total > 0)).astype(np.int64)
+    score[~has_answers] = -1
+
+    attempts = np.bincount(scenario_ids, minlength=len(scenario_files))
+    correct = np.bincount(scenario_ids, weights=answer_correct, minlength=len(scenario_files)).astype(np.int64)
+    team_choices = np.zeros((len(scenario_files), team_count), dtype=np.int64)
+    np.add.at(team_choices, (scenario_ids[chosen], choices[chosen]), 1)
+
+    return BatchGrades(right, total - right, score, answer_correct, scenario_files, attempts, correct, team_choices,
+                       [answer_key.lookup(name) for name in scenario_files], scenario_ids, choices)
+
+
+def _grade_records_python(records: List[Dict[str, Any]], answer_key: AnswerKey) -> BatchGrades:
+    right, wrong, score, answer_correct = [], [], [], []
+    scenario_files: List[str] = []
+    scenario_index: Dict[str, int] = {}
+    attempts, correct, team_choices = [], [], []
+    scenario_keys, answer_scenarios, answer_choices = [], [], []
+    for record in records:
+        answers = record.get("answers") or []
+        grades = grade_answers(answers, answer_key)
+        right.append(grades["right"])
+        wrong.append(grades["wrong"])
+        score.append(grades["score"] if answers else -1)
+        for scenario in grades["scenarios"]:
+            answer_correct.append(scenario["correct"])
+            column = scenario_index.get(scenario["scenario_file"])
+            if column is None:
+                column = scenario_index[scenario["scenario_file"]] = len(scenario_files)
+                scenario_files.append(scenario["scenario_file"])
+                attempts.append(0)
+                correct.append(0)
+                team_choices.append([0] * len(scenario["teams"]))
+                scenario_keys.append(answer_key.lookup(scenario["scenario_file"]))
+            answer_scenarios.append(column)
+            answer_choices.append(-2 if not scenario["graded"] else next(
+                (team for team, outcome in enumerate(scenario["teams"]) if outcome["chosen"]), -1))
+            attempts[column] += 1
+            correct[column] += int(scenario["correct"])
+            for team, outcome in enumerate(scenario["teams"]):
+                if team < len(team_choices[column]):
+                    team_choices[column][team] += int(outcome["chosen"])
+    return BatchGrades(right, wrong, score, answer_correct, scenario_files, attempts, correct, team_choices,
+                       scenario_keys, answer_scenarios, answer_choices)
@@ -0,0 +1,167 @@
+import re
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional
+
+# Harakat, superscript alef and tatweel carry no meaning for searching
+_ARABIC_MARKS = re.compile("[\u064B-\u065F\u0670\u0640]")
+_ARABIC_LETTERS = str.maketrans({
+    "\u0622": "\u0627",  # alef with madda -> alef
+    "\u0623": "\u0627",  # alef with hamza above -> alef
+    "\u0625": "\u0627",  # alef with hamza below -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0649": "\u064A",  # alef maksura -> yeh
+    "\u0629": "\u0647",  # teh marbuta -> heh
+    "\u0624": "\u0648",  # waw with hamza -> waw
+    "\u0626": "\u064A",  # yeh with hamza -> yeh
+})
+# Sorts after any character a key can contain; closes prefix ranges
+_PREFIX_END = "\uffff"
+
+
+def normalize_name(text: Any) -> str:
+    """Fold a name for matching: case, Arabic letter variants, diacritics, spacing"""
+    text = _ARABIC_MARKS.sub("", str(text or "")).translate(_ARABIC_LETTERS)
+    return " ".join(text.casefold().split())
+
+
+@lru_cache(maxsize=65536)
+def _name_words(name: str):
+    """Distinct normalized words of a name (names repeat, so this is cached)"""
+    return tuple(sorted(set(normalize_name(name).split())))
+
+
+def _score(record: Dict[str, Any]) -> float:
+    score = record.get("score")
+    return score if isinstance(score, (int, float)) else -1
+
+
+def record_matches(record: Dict[str, Any], user_id: Optional[str] = None, name: Optional[str] = None,
+                   score_min: Optional[float] = None, score_max: Optional[float] = None,
+                   date_from: Optional[str] = None, date_to: Optional[str] = None) -> bool:
+    """Whether one record passes a query (same rules as HistoryIndex.query)"""
+    if user_id is not None and str(record.get("user_id", "")) != str(user_id):
+        return False
+    score = _score(record)
+    if score_min is not None and score < score_min:
+        return False
+    if score_max is not None and score > score_max:
+        return False
+    date = str(record.get("date") or "")
+    if date_from and date < date_from:
+        return False
+    if date_to and date > date_to + _PREFIX_END:
+        return False
+    if name:
+        words = _name_words(str(record.get("name") or ""))
+        for part in normalize_name(name).split():
+            if not any(word.startswith(part) for word in words):
+                return False
+    return True
+
+
+class _SortedIndex:
+    """Keys kept sorted next to the row each one belongs to, for range scans"""
+
+    def __init__(self, keys: List, rows: Optional[List[int]] = None):
+        """Index keys[i] under rows[i] (default: under i)"""
+        if rows is None:
+            rows = range(len(keys))
+        # Stable sort, so equal keys stay in row order
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.rows = [rows[i] for i in order]
+
+    def add(self, key, row: int):
+        # Rows only grow, so (key, row) order is kept by inserting after equal keys
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.rows.insert(position, row)
+
+    def span(self, low=None, high=None):
+        """Positions [start, stop) of keys with low <= key <= high"""
+        start = 0 if low is None else bisect_left(self.keys, low)
+        stop = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return start, max(start, stop)
+
+
+class HistoryIndex:
+    """Secondary indexes over the history records, addressed by row number.
+
+    user_id maps to its rows directly; name words (normalized with
+    normalize_name), dates and scores are sorted so prefix and range
+    lookups are a bisect plus the matching rows. A query starts from the
+    most selective condition and narrows it down with the others, so its
+    cost follows the number of matching rows, not the size of the history.
+    Rows are positions in the store's record list, which only grows.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self._records = records
+        self._by_user: Dict[str, List[int]] = {}
+        for row, record in enumerate(records):
+            self._by_user.setdefault(str(record.get("user_id", "")), []).append(row)
+        words, word_rows = [], []
+        for row, record in enumerate(records):
+            for word in _name_words(str(record.get("name") or "")):
+                words.append(word)
+                word_rows.append(row)
+        self._name_words = _SortedIndex(words, word_rows)
+        self._dates = _SortedIndex([str(record.get("date") or "") for record in records])
+        self._scores = _SortedIndex([_score(record) for record in records])
+
+    def __len__(self) -> int:
+        return len(self._dates.keys)
+
+    def add(self, row: int):
+        """Index a record appended to the store's list at position row"""
+        record = self._records[row]
+        self._by_user.setdefault(str(record.get("user_id", "")), []).append(row)
+        for word in _name_words(str(record.get("name") or "")):
+            self._name_words.add(word, row)
+        self._dates.add(str(record.get("date") or ""), row)
+        self._scores.add(_score(record), row)
+
+    def query(self, user_id: Optional[str] = None, name: Optional[str] = None,
+              score_min: Optional[float] = None, score_max: Optional[float] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None,
+              limit: Optional[int] = None, newest_first: bool = False) -> List[int]:
+        """Rows of the records matching every given condition, in append order.
+
+        name matches when each of its words starts a word of the trainee's
+        name; dates compare as strings, so date_to="2026-03" includes the
+        whole month.
+        """
+        # (size, fetch rows) per condition; fetching is deferred until needed
+        sources = []
+        if user_id is not None:
+            rows = self._by_user.get(str(user_id), [])
+            sources.append((len(rows), lambda rows=rows: rows))
+        for part in normalize_name(name).split() if name else []:
+            start, stop = self._name_words.span(part, part + _PREFIX_END)
+            sources.append((stop - start, lambda start=start, stop=stop: self._name_words.rows[start:stop]))
+        if score_min is not None or score_max is not None:
+            start, stop = self._scores.span(score_min, score_max)
+            sources.append((stop - start, lambda start=start, stop=stop: self._scores.rows[start:stop]))
+        if date_from or date_to:
+            start, stop = self._dates.span(date_from or None, date_to + _PREFIX_END if date_to else None)
+            sources.append((stop - start, lambda start=start, stop=stop: self._dates.rows[start:stop]))
+
+        if sources:
+            # Intersect from the smallest source; once the survivors are few
+            # compared to the next source, checking them directly is cheaper
+            sources.sort(key=lambda source: source[0])
+            matched = set(sources[0][1]())
+            for size, fetch in sources[1:]:
+                if len(matched) * 8 < size:
+                    conditions = dict(user_id=user_id, name=name, score_min=score_min, score_max=score_max,
+                                      date_from=date_from, date_to=date_to)
+                    matched = {row for row in matched if record_matches(self._records[row], **conditions)}
+                    break
+                matched.intersection_update(fetch())
+            rows = sorted(matched)
+        else:
+            rows = list(range(len(self._records)))
+        if newest_first:
+            rows.reverse()
+        return rows if limit is None else rows[:limit]
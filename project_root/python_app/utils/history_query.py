@@ -0,0 +1,65 @@
+"""
+Search the test history from the command line
+
+Uses the same indexes as the admin dashboard's history filter: exact
+trainee ID, name words (Arabic spelling variants and diacritics are
+ignored), score range and date range. Conditions combine with AND.
+
+Usage:
+    python -m utils.history_query [--user ID] [--name TEXT] [--min-score N] [--max-score N]
+                                  [--from DATE] [--to DATE] [--limit N] [--oldest-first] [--json]
+                                  [--data-dir PATH]
+
+Dates compare as text, so --to 2026-03 covers the whole of March.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history_store import HistoryStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="trainee ID (exact)")
+    parser.add_argument("--name", help="words the trainee's name starts with")
+    parser.add_argument("--min-score", type=float)
+    parser.add_argument("--max-score", type=float)
+    parser.add_argument("--from", dest="date_from", help="first date, e.g. 2026-01-01")
+    parser.add_argument("--to", dest="date_to", help="last date (inclusive)")
+    parser.add_argument("--limit", type=int, default=50, help="0 for no limit (default 50)")
+    parser.add_argument("--oldest-first", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print matching records as JSON lines")
+    parser.add_argument("--data-dir", default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+    args = parser.parse_args(argv)
+
+    store = HistoryStore.instance(args.data_dir)
+    started = time.perf_counter()
+    store.build_index()
+    indexed = time.perf_counter()
+    records = store.query(user_id=args.user, name=args.name,
+                          score_min=args.min_score, score_max=args.max_score,
+                          date_from=args.date_from, date_to=args.date_to,
+                          limit=args.limit or None, newest_first=not args.oldest_first)
+    finished = time.perf_counter()
+
+    if args.json:
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False))
+        return
+    for record in records:
+        print(f"{record.get('date') or '':<12} {str(record.get('user_id', '')):<12} "
+              f"{str(record.get('score', '')) + '%':>5}  {record.get('name') or ''}")
+    print(f"🔎 {len(records)} record(s) of {store.count()} "
+          f"(index {(indexed - started) * 1000:.0f} ms, query {(finished - indexed) * 1000:.1f} ms)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
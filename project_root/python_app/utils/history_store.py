@@ -0,0 +1,345 @@
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils.file_lock import FileLock
+from utils.history_index import HistoryIndex
+
+
+class HistoryStore:
+    """Append-only store for test results.
+
+    Every record is one JSON line in history.jsonl, written with a single
+    write() and fsync(). A compacted snapshot (history.snapshot.json) holds
+    the records parsed so far plus the log offset they cover, so loading
+    only has to parse the log tail. The snapshot is rebuilt on a background
+    thread once the tail grows past COMPACT_EVERY records.
+
+    Writers in other processes (several app instances on one station) are
+    serialized with a lock file; before appending, and on every read, the
+    records they appended are picked up from the log. clear() swaps in a new
+    log file, so a log whose inode changed is reloaded from the start, and
+    a snapshot is only used with the log it was taken from.
+
+    query() answers searches from a HistoryIndex built on first use and
+    kept up to date as records are appended.
+    """
+
+    COMPACT_EVERY = 500
+    _instances: Dict[str, "HistoryStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, data_dir: str):
+        self.data_dir = os.path.abspath(data_dir)
+        self.log_path = os.path.join(self.data_dir, "history.jsonl")
+        self.snapshot_path = os.path.join(self.data_dir, "history.snapshot.json")
+        self.legacy_path = os.path.join(self.data_dir, "history.json")
+        self._file_lock = FileLock(os.path.join(self.data_dir, "history.lock"))
+
+        self._lock = threading.RLock()
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._index: Optional[HistoryIndex] = None
+        self._log_offset = 0
+        self._log_id: Optional[int] = None
+        self._tail_count = 0
+        self._compacting = False
+        self._generation = 0
+        self._listeners: List[Callable[[str, Optional[Dict[str, Any]]], None]] = []
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        with self._file_lock:
+            self._migrate_legacy_history()
+
+    @classmethod
+    def instance(cls, data_dir: str) -> "HistoryStore":
+        """Return the shared history store for a data folder"""
+        key = os.path.normcase(os.path.abspath(data_dir))
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(data_dir)
+                cls._instances[key] = store
+            return store
+
+    def add_listener(self, callback: Callable[[str, Optional[Dict[str, Any]]], None]):
+        """Register callback(event, record) for 'append' and 'clear' events"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a callback added with add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event: str, record: Optional[Dict[str, Any]] = None):
+        for callback in list(self._listeners):
+            try:
+                callback(event, record)
+            except Exception as e:
+                print(f"❌ History listener failed on {event}: {e}")
+
+    def _migrate_legacy_history(self):
+        """Copy records from the old history.json array into the log (one time)"""
+        # history.json is left in place (it ships with the repo): an existing
+        # log is what marks the migration as done
+        if os.path.exists(self.log_path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            records = json.loads(content) if content else []
+            if not isinstance(records, list):
+                records = []
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not migrate {self.legacy_path}: {e}")
+            records = []
+
+        temp_path = self.log_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.log_path)
+        print(f"📦 Migrated {len(records)} history record(s) to {self.log_path}")
+
+    def _load(self):
+        """Load the snapshot and replay the log tail (called with the lock held)"""
+        if self._records is not None:
+            return
+
+        records: List[Dict[str, Any]] = []
+        offset = 0
+        log_size, log_id = self._log_stat()
+
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get("log_id") == log_id and 0 <= snapshot.get("log_offset", -1) <= log_size:
+                records = snapshot.get("records", [])
+                offset = snapshot["log_offset"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️ Ignoring unreadable history snapshot: {e}")
+
+        tail, offset, read_id = self._read_log(offset)
+        if read_id != log_id:
+            # Replaced (cleared) since the stat: the snapshot belongs to the old log
+            records = []
+            tail, offset, read_id = self._read_log(0)
+        records.extend(tail)
+
+        self._records = records
+        self._log_offset = offset
+        self._log_id = read_id
+        self._tail_count = len(tail)
+        if self._tail_count >= self.COMPACT_EVERY:
+            self._schedule_compaction()
+
+    def _catch_up(self):
+        """Pick up records other processes appended (called with the lock held)"""
+        if self._records is None:
+            self._load()
+            return
+        log_size, log_id = self._log_stat()
+        if log_id == self._log_id and log_size > self._log_offset:
+            tail, offset, log_id = self._read_log(self._log_offset)
+            if log_id == self._log_id:
+                self._log_offset = offset
+                self._index_new_records(tail)
+                self._tail_count += len(tail)
+                return
+        if log_id != self._log_id or log_size < self._log_offset:
+            # Cleared by another process (maybe appended to since): start over
+            self._reload()
+
+    def _reload(self):
+        self._records = None
+        self._index = None
+        self._generation += 1
+        self._load()
+
+    def _log_stat(self):
+        """(size, inode) of the log, or (0, None) when there is none"""
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return 0, None
+        return st.st_size, st.st_ino
+
+    def _read_log(self, offset: int):
+        """Parse complete lines of the log starting at a byte offset; (records, end offset, inode)"""
+        records = []
+        try:
+            f = open(self.log_path, 'rb')
+        except FileNotFoundError:
+            return records, 0, None
+        with f:
+            log_id = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Torn final line from an interrupted append
+                    break
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line.decode('utf-8')))
+                except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                    print(f"⚠️ Skipping corrupt history line at byte {offset}: {e}")
+        return records, offset, log_id
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """Append one record to the log and make it durable"""
+        return self.extend([record])
+
+    def extend(self, records: List[Dict[str, Any]]) -> bool:
+        """Append several records with a single write() and fsync()"""
+        if not records:
+            return True
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+        with self._lock:
+            try:
+                with self._file_lock:
+                    self._catch_up()
+                    fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                    try:
+                        if os.fstat(fd).st_size > self._log_offset:
+                            # Torn final line from an interrupted append: cut it off,
+                            # or the new record would be glued onto it and lost
+                            print(f"⚠️ Dropping torn history tail at byte {self._log_offset}")
+                            os.ftruncate(fd, self._log_offset)
+                        os.write(fd, data)
+                        os.fsync(fd)
+                        st = os.fstat(fd)
+                    finally:
+                        os.close(fd)
+            except OSError as e:
+                print(f"❌ Error appending to history: {e}")
+                return False
+
+            self._index_new_records(records)
+            self._log_offset, self._log_id = st.st_size, st.st_ino
+            self._tail_count += len(records)
+            if self._tail_count >= self.COMPACT_EVERY:
+                self._schedule_compaction()
+
+        for record in records:
+            self._notify("append", record)
+        return True
+
+    def _index_new_records(self, records: List[Dict[str, Any]]):
+        """Add records to the list and, once built, the index (lock held)"""
+        start = len(self._records)
+        self._records.extend(records)
+        if self._index is not None:
+            for row in range(start, len(self._records)):
+                self._index.add(row)
+
+    def build_index(self):
+        """Build the search index now instead of on the first query"""
+        with self._lock:
+            self._catch_up()
+            if self._index is None:
+                self._index = HistoryIndex(self._records)
+
+    def query(self, user_id: Optional[str] = None, name: Optional[str] = None,
+              score_min: Optional[float] = None, score_max: Optional[float] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None,
+              limit: Optional[int] = None, newest_first: bool = False) -> List[Dict[str, Any]]:
+        """Return the records matching every given condition (see HistoryIndex.query)"""
+        with self._lock:
+            self.build_index()
+            rows = self._index.query(user_id, name, score_min, score_max, date_from, date_to,
+                                     limit, newest_first)
+            return [self._records[row] for row in rows]
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return a copy of all history records in append order"""
+        with self._lock:
+            self._catch_up()
+            return list(self._records)
+
+    def read_from(self, start: int) -> List[Dict[str, Any]]:
+        """Return the records from position start on (cheap for a recent tail)"""
+        with self._lock:
+            self._catch_up()
+            return self._records[start:]
+
+    def count(self) -> int:
+        """Return the number of stored records"""
+        with self._lock:
+            self._catch_up()
+            return len(self._records)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.read_all())
+
+    def clear(self) -> bool:
+        """Remove every record"""
+        with self._lock:
+            try:
+                with self._file_lock:
+                    temp_path = self.log_path + ".tmp"
+                    with open(temp_path, 'wb') as f:
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.log_path)
+                    if os.path.exists(self.snapshot_path):
+                        os.remove(self.snapshot_path)
+                    _, log_id = self._log_stat()
+            except OSError as e:
+                print(f"❌ Error clearing history: {e}")
+                return False
+            self._records = []
+            self._index = None
+            self._log_offset = 0
+            self._log_id = log_id
+            self._tail_count = 0
+            self._generation += 1
+
+        self._notify("clear")
+        return True
+
+    def _schedule_compaction(self):
+        """Start a background snapshot rebuild unless one is running"""
+        if self._compacting:
+            return
+        self._compacting = True
+        threading.Thread(target=self.compact, name="history-compaction", daemon=True).start()
+
+    def compact(self):
+        """Write a snapshot covering the log up to its current offset"""
+        try:
+            with self._lock:
+                self._load()
+                records = list(self._records)
+                offset = self._log_offset
+                log_id = self._log_id
+                generation = self._generation
+
+            # Per-process temp name: another instance may be compacting too
+            temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"log_id": log_id, "log_offset": offset, "records": records}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._lock, self._file_lock:
+                # A clear() while we were writing (here or in another
+                # process) invalidates this snapshot
+                log_size, current_id = self._log_stat()
+                if generation == self._generation and current_id == log_id and log_size >= offset:
+                    os.replace(temp_path, self.snapshot_path)
+                    self._tail_count = len(self._records) - len(records)
+                else:
+                    os.remove(temp_path)
+        except OSError as e:
+            print(f"❌ History compaction failed: {e}")
+        finally:
+            self._compacting = False
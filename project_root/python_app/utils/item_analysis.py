@@ -0,0 +1,270 @@
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: the full rebuild falls back to folding record by record
+    np = None
+
+from utils.grading import AnswerKey, answer_scenario_file
+from utils.history_store import HistoryStore
+from utils.json_handler import JSONHandler
+from utils.results_server import record_key
+from utils.scenario_catalog import ScenarioCatalog
+
+# Per-scenario sufficient statistics; all of them add up across records
+_COUNTERS = ("n", "n1", "n_r", "n1_r", "sum_r", "sum_r2", "sum_r1")
+
+
+def wrong_explanation(selected_index: int, correct_index: int) -> str:
+    """Which explanation the player shows for a wrong team (see ScenarioPlayer.getWrongReason)"""
+    return "wrong_1" if selected_index == 0 and correct_index == 1 else "wrong_2"
+
+
+class ItemAnalysis:
+    """Classical item statistics per scenario over the whole test history.
+
+    Each scenario of a test is an item. Difficulty is its p-value (share of
+    correct answers); discrimination is the point-biserial correlation of
+    the item with the rest of the test (the share of the test's other
+    scenarios answered correctly, so the item does not correlate with
+    itself). Distractor frequencies count how often each wrong team was
+    chosen, labelled with the explanation the player shows for it, and the
+    answers' team_correct outcomes give the share of right decisions per
+    team.
+
+    Only sums are kept per scenario (n, correct, sums of rest score, its
+    square and its product with the item), so every saved test is folded
+    in O(answers). item_stats.json caches them with the same head check as
+    ProfileStore; a full rebuild runs vectorized with NumPy.
+    """
+
+    SAVE_EVERY = 20
+    _instances: Dict[str, "ItemAnalysis"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, data_dir: str):
+        self.data_dir = os.path.abspath(data_dir)
+        self.path = os.path.join(self.data_dir, "item_stats.json")
+        self.history_store = HistoryStore.instance(self.data_dir)
+        self.catalog = ScenarioCatalog.instance(os.path.join(self.data_dir, "scenarios"))
+
+        self._lock = threading.RLock()
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._folded = 0
+        self._last_key: Optional[str] = None
+        self._unsaved = 0
+
+        saved = JSONHandler.read_json(self.path, use_cache=False)
+        with self._lock:
+            if isinstance(saved, dict) and isinstance(saved.get("items"), dict):
+                self._items = saved["items"]
+                self._folded = saved.get("records", 0)
+                self._last_key = saved.get("last_key")
+            self._sync()
+        self.history_store.add_listener(self._on_history_event)
+
+    @classmethod
+    def instance(cls, data_dir: str) -> "ItemAnalysis":
+        """Return the shared item analysis for a data folder"""
+        key = os.path.normcase(os.path.abspath(data_dir))
+        with cls._instances_lock:
+            analysis = cls._instances.get(key)
+            if analysis is None:
+                analysis = cls(data_dir)
+                cls._instances[key] = analysis
+            return analysis
+
+    def _consistent(self) -> bool:
+        if self._folded == 0:
+            return True
+        if self.history_store.count() < self._folded:
+            return False
+        tail = self.history_store.read_from(self._folded - 1)
+        return bool(tail) and record_key(tail[0]) == self._last_key
+
+    def _sync(self):
+        """Fold records appended since the last sync (called with the lock held)"""
+        if not self._consistent():
+            print("🔄 Item statistics out of date with the history; rebuilding")
+            self._items, self._folded, self._last_key = {}, 0, None
+        records = self.history_store.read_from(self._folded)
+        if not records:
+            return
+        if self._folded == 0 and np is not None:
+            self._rebuild(records)
+        else:
+            for record in records:
+                self._fold(record)
+        self._folded += len(records)
+        self._last_key = record_key(records[-1])
+        self._unsaved += len(records)
+        if self._unsaved >= self.SAVE_EVERY or len(records) > 1:
+            self.save()
+
+    def _item(self, scenario_file: str) -> Dict[str, Any]:
+        item = self._items.get(scenario_file)
+        if item is None:
+            item = self._items[scenario_file] = dict({counter: 0 for counter in _COUNTERS}, choices={}, teams={})
+        return item
+
+    def _fold(self, record: Dict[str, Any]):
+        answers = record.get("answers") or []
+        right = sum(1 for answer in answers if answer.get("correct"))
+        for answer in answers:
+            item = self._item(answer_scenario_file(answer))
+            correct = 1 if answer.get("correct") else 0
+            item["n"] += 1
+            item["n1"] += correct
+            if len(answers) > 1:
+                rest = (right - correct) / (len(answers) - 1)
+                item["n_r"] += 1
+                item["n1_r"] += correct
+                item["sum_r"] += rest
+                item["sum_r2"] += rest * rest
+                item["sum_r1"] += rest * correct
+            choice = answer.get("selected_team") or ""
+            item["choices"][choice] = item["choices"].get(choice, 0) + 1
+            for color, right_team in (answer.get("team_correct") or {}).items():
+                outcome = item["teams"].setdefault(color, [0, 0])
+                outcome[0 if right_team else 1] += 1
+
+    def _rebuild(self, records: List[Dict[str, Any]]):
+        """Compute every scenario's sums at once from flattened answer arrays"""
+        scenario_index: Dict[str, int] = {}
+        choice_index: Dict[str, int] = {}
+        team_index: Dict[tuple, int] = {}
+        scenario_ids, choice_ids, correct, lengths, rights = [], [], [], [], []
+        team_ids, team_wrong = [], []
+        for record in records:
+            answers = record.get("answers") or []
+            right = sum(1 for answer in answers if answer.get("correct"))
+            for answer in answers:
+                scenario_file = answer_scenario_file(answer)
+                for color, right_team in (answer.get("team_correct") or {}).items():
+                    team_ids.append(team_index.setdefault((scenario_file, color), len(team_index)))
+                    team_wrong.append(0 if right_team else 1)
+                scenario_ids.append(scenario_index.setdefault(scenario_file, len(scenario_index)))
+                choice_ids.append(choice_index.setdefault(answer.get("selected_team") or "", len(choice_index)))
+                correct.append(1.0 if answer.get("correct") else 0.0)
+                lengths.append(len(answers))
+                rights.append(right)
+        if not scenario_ids:
+            return
+
+        scenario_ids = np.asarray(scenario_ids, dtype=np.int64)
+        correct = np.asarray(correct)
+        lengths = np.asarray(lengths, dtype=np.float64)
+        has_rest = lengths > 1
+        rest = np.where(has_rest, (np.asarray(rights) - correct) / np.maximum(lengths - 1, 1), 0.0)
+        weight = has_rest.astype(np.float64)
+        count = len(scenario_index)
+        sums = {
+            "n": np.bincount(scenario_ids, minlength=count),
+            "n1": np.bincount(scenario_ids, weights=correct, minlength=count),
+            "n_r": np.bincount(scenario_ids, weights=weight, minlength=count),
+            "n1_r": np.bincount(scenario_ids, weights=correct * weight, minlength=count),
+            "sum_r": np.bincount(scenario_ids, weights=rest, minlength=count),
+            "sum_r2": np.bincount(scenario_ids, weights=rest * rest, minlength=count),
+            "sum_r1": np.bincount(scenario_ids, weights=rest * correct, minlength=count),
+        }
+        choices = np.zeros((count, len(choice_index)), dtype=np.int64)
+        np.add.at(choices, (scenario_ids, np.asarray(choice_ids, dtype=np.int64)), 1)
+
+        choice_names = sorted(choice_index, key=choice_index.get)
+        for scenario_file, column in scenario_index.items():
+            item = self._item(scenario_file)
+            for counter in _COUNTERS:
+                value = sums[counter][column]
+                item[counter] += int(value) if counter in ("n", "n1", "n_r", "n1_r") else float(value)
+            for name, chosen in zip(choice_names, choices[column].tolist()):
+                if chosen:
+                    item["choices"][name] = item["choices"].get(name, 0) + chosen
+
+        if team_ids:
+            outcomes = np.zeros((len(team_index), 2), dtype=np.int64)
+            np.add.at(outcomes, (np.asarray(team_ids, dtype=np.int64), np.asarray(team_wrong, dtype=np.int64)), 1)
+            for (scenario_file, color), row in team_index.items():
+                outcome = self._item(scenario_file)["teams"].setdefault(color, [0, 0])
+                outcome[0] += int(outcomes[row, 0])
+                outcome[1] += int(outcomes[row, 1])
+
+    def _on_history_event(self, event: str, record: Optional[Dict[str, Any]]):
+        with self._lock:
+            if event == "clear":
+                self._items, self._folded, self._last_key = {}, 0, None
+                self.save()
+            else:
+                self._sync()
+
+    def save(self, sync: bool = False) -> bool:
+        """Write item_stats.json (through JSONHandler's background writer unless sync)"""
+        with self._lock:
+            data = {
+                "records": self._folded,
+                "last_key": self._last_key,
+                "items": {name: self._copy(item) for name, item in self._items.items()},
+            }
+            self._unsaved = 0
+        return JSONHandler.write_json(self.path, data, sync=sync)
+
+    def statistics(self) -> List[Dict[str, Any]]:
+        """Difficulty, discrimination and distractors per scenario, hardest first"""
+        with self._lock:
+            self._sync()
+            items = {name: self._copy(item) for name, item in self._items.items()}
+        answer_key = AnswerKey(self.catalog)
+        rows = [self._statistics(name, item, answer_key) for name, item in items.items() if item["n"]]
+        rows.sort(key=lambda row: (row["difficulty"], row["scenario_file"]))
+        return rows
+
+    @staticmethod
+    def _copy(item: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(item, choices=dict(item["choices"]),
+                    teams={color: list(outcome) for color, outcome in item.get("teams", {}).items()})
+
+    def _statistics(self, scenario_file: str, item: Dict[str, Any], answer_key: AnswerKey) -> Dict[str, Any]:
+        entry = self.catalog.get(scenario_file)
+        row = {
+            "scenario_file": scenario_file,
+            "title": entry.get("title") if entry else None,
+            "attempts": item["n"],
+            "difficulty": round(item["n1"] / item["n"], 3),
+            "discrimination": None,
+            "correct_team": None,
+            "distractors": [],
+            "no_choice": item["choices"].get("", 0),
+            # Share of decisions on each team that were right (from the answers' team_correct)
+            "teams": {color: round(right / (right + wrong), 3)
+                      for color, (right, wrong) in sorted(item["teams"].items()) if right + wrong},
+        }
+
+        n_r, n1_r = item["n_r"], item["n1_r"]
+        if 0 < n1_r < n_r:
+            mean = item["sum_r"] / n_r
+            variance = item["sum_r2"] / n_r - mean * mean
+            if variance > 1e-12:
+                mean_correct = item["sum_r1"] / n1_r
+                mean_wrong = (item["sum_r"] - item["sum_r1"]) / (n_r - n1_r)
+                p = n1_r / n_r
+                row["discrimination"] = round((mean_correct - mean_wrong) / math.sqrt(variance)
+                                              * math.sqrt(p * (1 - p)), 3)
+
+        key = answer_key.lookup(scenario_file)
+        if key is not None:
+            colors, correct_flags = key
+            correct_index = next((team for team, is_correct in enumerate(correct_flags) if is_correct), -1)
+            row["correct_team"] = colors[correct_index] if correct_index >= 0 else None
+            for team, color in enumerate(colors):
+                if team == correct_index:
+                    continue
+                chosen = item["choices"].get(color, 0)
+                row["distractors"].append({
+                    "team": color,
+                    "explanation": wrong_explanation(team, correct_index),
+                    "chosen": chosen,
+                    "frequency": round(chosen / item["n"], 3),
+                })
+        return row
@@ -1,11 +1,346 @@
+import atexit
+import codecs
 import json
 import os
-from typing import Any, Dict, List, Optional
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Characters that matter while skipping a JSON value
+_SKIP_OUTSIDE_STRING = re.compile(r'["\[\]{}]')
+_SKIP_INSIDE_STRING = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[,}\]\s]')
+_WHITESPACE = re.compile(r'\s*')
+
+
+def _copy_json(value: Any) -> Any:
+    """Copy a JSON-shaped value (much faster than copy.deepcopy for dicts/lists)"""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+class JSONReadCache:
+    """LRU cache of parsed JSON files validated by (st_mtime_ns, st_size).
+
+    Entries are bounded both by count and by the total size of the files
+    they were parsed from. Every lookup returns a private copy, so callers
+    can mutate what they get without corrupting the cache.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def get(self, file_path: str, stat: os.stat_result) -> Tuple[bool, Any]:
+        """Return (True, copy) when a valid entry exists, otherwise (False, None)"""
+        key = self._key(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                data = entry[1]
+            else:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return False, None
+        return True, _copy_json(data)
+
+    def put(self, file_path: str, stat: os.stat_result, data: Any):
+        """Store a private copy of data for the given file version"""
+        key = self._key(file_path)
+        size = stat.st_size
+        if size > self.max_bytes:
+            self.invalidate(file_path)
+            return
+        data = _copy_json(data)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = ((stat.st_mtime_ns, size), data)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, file_path: str):
+        """Forget the entry for one file"""
+        with self._lock:
+            self._drop(self._key(file_path))
+
+    def clear(self):
+        """Forget every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def resize(self, max_entries: int, max_bytes: int):
+        """Change the budget, evicting entries if needed"""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0][1]
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry[0][1]
+            self.evictions += 1
+
+
+class AtomicJSONWriter:
+    """Background writer that coalesces and atomically replaces JSON files.
+
+    Repeated writes to the same path within the debounce window collapse
+    into one write of the latest data. Each write goes to a temp file in
+    the target folder, is fsync'ed, then swapped in with os.replace, so a
+    crash leaves either the old or the new file, never a truncated one.
+    A failed write is queued again with exponential backoff (up to
+    MAX_RETRIES times) unless newer data for the path has been submitted.
+    """
+
+    MAX_RETRIES = 5
+    RETRY_DELAY = 0.5
+
+    def __init__(self, debounce: float = 0.3, max_delay: float = 2.0):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        # key -> [file_path, data, first_submit, last_submit, retry_at, attempts]
+        self._pending: "OrderedDict[str, list]" = OrderedDict()
+        # (key, data) of the write in progress; still newer than the file on disk
+        self._writing: Optional[Tuple[str, Any]] = None
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._stopped = False
+
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._total_latency_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="json-writer", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def submit(self, file_path: str, data: Any):
+        """Queue data to be written to file_path"""
+        snapshot = _copy_json(data)
+        now = time.monotonic()
+        key = self._key(file_path)
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is not None:
+                entry[1] = snapshot
+                entry[3] = now
+                self.coalesced += 1
+            else:
+                self._pending[key] = [file_path, snapshot, now, now, 0.0, 0]
+            self._cond.notify_all()
+
+    def pending_data(self, file_path: str) -> Tuple[bool, Any]:
+        """Return (True, copy) when a write to file_path is queued or in progress"""
+        key = self._key(file_path)
+        with self._cond:
+            entry = self._pending.get(key)
+            if entry is not None:
+                data = entry[1]
+            elif self._writing is not None and self._writing[0] == key:
+                data = self._writing[1]
+            else:
+                return False, None
+        return True, _copy_json(data)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued now and wait until it is on disk"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._writing is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self._flush_requested = False
+        return True
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Flush and stop the worker thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        """Return write counters and latency (submit to durable, in ms)"""
+        with self._cond:
+            return {
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "pending": len(self._pending),
+                "last_latency_ms": round(self.last_latency_ms, 2),
+                "max_latency_ms": round(self.max_latency_ms, 2),
+                "avg_latency_ms": round(self._total_latency_ms / self.writes, 2) if self.writes else 0.0,
+            }
+
+    def _next_due(self, now: float):
+        """Return (key, wait_seconds) for the entry that is due first"""
+        best_key, best_wait = None, None
+        for key, entry in self._pending.items():
+            due = entry[4] if self._flush_requested else max(entry[4], min(entry[3] + self.debounce,
+                                                                           entry[2] + self.max_delay))
+            wait = max(0.0, due - now)
+            if best_wait is None or wait < best_wait:
+                best_key, best_wait = key, wait
+        return best_key, best_wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped and not self._pending:
+                        return
+                    key, wait = self._next_due(time.monotonic())
+                    if key is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                file_path, data, first_submit, _, _, attempts = self._pending.pop(key)
+                self._writing = (key, data)
+
+            ok = JSONHandler._write_atomic(file_path, data)
+            latency_ms = (time.monotonic() - first_submit) * 1000
+
+            with self._cond:
+                self._writing = None
+                if ok:
+                    self.writes += 1
+                    self.last_latency_ms = latency_ms
+                    self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+                    self._total_latency_ms += latency_ms
+                else:
+                    self.failures += 1
+                    if key in self._pending:
+                        pass  # superseded by newer data, which is written instead
+                    elif attempts < self.MAX_RETRIES:
+                        now = time.monotonic()
+                        self._pending[key] = [file_path, data, first_submit, now,
+                                              now + self.RETRY_DELAY * 2 ** attempts, attempts + 1]
+                    else:
+                        print(f"❌ Giving up on writing {file_path} after {attempts + 1} attempts")
+                self._cond.notify_all()
+
 
 class JSONHandler:
+    # Process-wide read cache, disabled until enable_cache() is called
+    _cache: Optional[JSONReadCache] = None
+    # Background writer, disabled until start_writer() is called
+    _writer: Optional[AtomicJSONWriter] = None
+
+    @staticmethod
+    def start_writer(debounce: float = 0.3, max_delay: float = 2.0) -> AtomicJSONWriter:
+        """Route write_json through a coalescing background writer"""
+        if JSONHandler._writer is None:
+            JSONHandler._writer = AtomicJSONWriter(debounce, max_delay)
+            atexit.register(JSONHandler.flush)
+        return JSONHandler._writer
+
+    @staticmethod
+    def flush(timeout: Optional[float] = 10.0) -> bool:
+        """Block until every queued write is on disk (call on shutdown)"""
+        writer = JSONHandler._writer
+        if writer is None:
+            return True
+        ok = writer.flush(timeout)
+        if not ok:
+            print("⚠️ Timed out waiting for pending JSON writes")
+        return ok
+
     @staticmethod
-    def read_json(file_path: str) -> Any:
+    def writer_stats() -> Optional[Dict[str, float]]:
+        """Return background writer counters, or None when it is off"""
+        writer = JSONHandler._writer
+        return writer.stats() if writer is not None else None
+
+    @staticmethod
+    def enable_cache(max_entries: int = 128, max_bytes: int = 8 * 1024 * 1024) -> JSONReadCache:
+        """Turn on the process-wide read cache (or resize it)"""
+        if JSONHandler._cache is None:
+            JSONHandler._cache = JSONReadCache(max_entries, max_bytes)
+        else:
+            JSONHandler._cache.resize(max_entries, max_bytes)
+        return JSONHandler._cache
+
+    @staticmethod
+    def disable_cache():
+        """Turn off the read cache and drop its entries"""
+        JSONHandler._cache = None
+
+    @staticmethod
+    def cache_stats() -> Optional[Dict[str, int]]:
+        """Return read cache counters, or None when the cache is off"""
+        cache = JSONHandler._cache
+        return cache.stats() if cache is not None else None
+
+    @staticmethod
+    def read_json(file_path: str, use_cache: bool = True) -> Any:
         """Read JSON file and return data"""
+        writer = JSONHandler._writer
+        if writer is not None:
+            # A queued write is newer than whatever is on disk
+            queued, data = writer.pending_data(file_path)
+            if queued:
+                return data
+        
+        cache = JSONHandler._cache if use_cache else None
+        stat = None
+        if cache is not None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                stat = None
+            if stat is not None:
+                hit, data = cache.get(file_path, stat)
+                if hit:
+                    return data
+
         try:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -49,13 +384,20 @@ class JSONHandler:
                         return default_data
                     return None
                 
-                return json.loads(content)
+                data = json.loads(content)
+                if cache is not None and stat is not None:
+                    cache.put(file_path, stat, data)
+                return data
                 
         except json.JSONDecodeError as e:
             print(f"JSON decode error in {file_path}: {e}")
-            # If it's history.json and corrupted, reset it
+            # If it's history.json and corrupted, keep a copy and reset it
             if "history" in file_path:
                 print("Resetting corrupted history.json")
+                try:
+                    os.replace(file_path, file_path + ".corrupt")
+                except OSError:
+                    pass
                 default_data = []
                 JSONHandler.write_json(file_path, default_data)
                 return default_data
@@ -65,18 +407,99 @@ class JSONHandler:
             return None
 
     @staticmethod
-    def write_json(file_path: str, data: Any) -> bool:
-        """Write data to JSON file"""
+    def write_json(file_path: str, data: Any, sync: bool = False) -> bool:
+        """Write data to JSON file (queued when the background writer is on)"""
+        writer = JSONHandler._writer
+        if writer is not None and not sync:
+            try:
+                writer.submit(file_path, data)
+                return True
+            except Exception as e:
+                print(f"Error queueing JSON write {file_path}: {e}")
+                return False
+        return JSONHandler._write_atomic(file_path, data)
+
+    @staticmethod
+    def _write_atomic(file_path: str, data: Any) -> bool:
+        """Write to a temp file and swap it in with os.replace"""
+        temp_path = None
         try:
             # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            directory = os.path.dirname(os.path.abspath(file_path))
+            os.makedirs(directory, exist_ok=True)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
+            fd, temp_path = tempfile.mkstemp(
+                dir=directory, prefix=os.path.basename(file_path) + ".", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600 files; keep the permissions of the file we replace
+            try:
+                mode = os.stat(file_path).st_mode & 0o777
+            except OSError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, file_path)
+            temp_path = None
+            
+            cache = JSONHandler._cache
+            if cache is not None:
+                cache.put(file_path, os.stat(file_path), data)
             return True
         except Exception as e:
             print(f"Error writing JSON file {file_path}: {e}")
             return False
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def read_scenario_header(file_path: str,
+                             fields: Iterable[str] = ("title", "background")) -> Optional[Dict[str, Any]]:
+        """Read only the top-level fields of a scenario, stopping once they are found.
+
+        Meant for one-off reads such as tools and the benchmark. Listing
+        screens go through ScenarioCatalog instead: it needs the whole
+        document of a changed file (validation, team counts, packing) and
+        serves unchanged files from its index without opening them.
+        """
+        header, _ = JSONHandler.scan_json_header(file_path, fields)
+        return header
+
+    @staticmethod
+    def scan_json_header(file_path: str, fields: Iterable[str], chunk_size: int = 4096,
+                         stream_limit: int = 64 * 1024) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Stream a JSON object and return (wanted top-level fields, bytes read).
+
+        Values of other keys are skipped without being decoded. Falls back to
+        a full parse if the document is not a well-formed object, or if the
+        fields are not found within stream_limit bytes (skipping in Python is
+        slower than the C parser once most of the file has to be walked).
+        """
+        wanted = set(fields)
+        scanner = _HeaderScanner(file_path, wanted, chunk_size, stream_limit)
+        try:
+            return scanner.scan()
+        except _StreamLimitReached:
+            pass
+        except (ValueError, UnicodeDecodeError) as e:
+            print(f"Header scan failed for {file_path}, using full parse: {e}")
+        except OSError as e:
+            print(f"Error reading JSON file {file_path}: {e}")
+            return None, 0
+
+        data = JSONHandler.read_json(file_path)
+        try:
+            size = scanner.bytes_read + os.path.getsize(file_path)
+        except OSError:
+            size = scanner.bytes_read
+        if not isinstance(data, dict):
+            return None, size
+        return {key: data[key] for key in wanted if key in data}, size
 
     @staticmethod
     def update_json(file_path: str, updates: Dict[str, Any]) -> bool:
@@ -90,4 +513,154 @@ class JSONHandler:
             return JSONHandler.write_json(file_path, data)
         except Exception as e:
             print(f"Error updating JSON file {file_path}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+class _StreamLimitReached(Exception):
+    """Raised when a header scan should give up and use the full parser"""
+
+
+class _HeaderScanner:
+    """Incremental tokenizer used by JSONHandler.scan_json_header"""
+
+    def __init__(self, file_path: str, wanted: set, chunk_size: int, stream_limit: int):
+        self.file_path = file_path
+        self.wanted = wanted
+        self.chunk_size = chunk_size
+        self.stream_limit = stream_limit
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+        self.file = None
+
+    def scan(self) -> Tuple[Dict[str, Any], int]:
+        found: Dict[str, Any] = {}
+        with open(self.file_path, 'rb') as self.file:
+            self._expect('{')
+            self._skip_ws()
+            if self._peek() == '}':
+                return found, self.bytes_read
+            while True:
+                self._skip_ws()
+                if self._peek() != '"':
+                    raise ValueError(f"expected key at offset {self.pos}")
+                key = self._decode_value()
+                self._expect(':')
+                self._skip_ws()
+                if key in self.wanted and key not in found:
+                    found[key] = self._decode_value()
+                    if len(found) == len(self.wanted):
+                        return found, self.bytes_read
+                else:
+                    self._skip_value()
+                self._skip_ws()
+                separator = self._next_char()
+                if separator == '}':
+                    return found, self.bytes_read
+                if separator != ',':
+                    raise ValueError(f"expected ',' or '}}' at offset {self.pos}")
+                # Drop what we have consumed so the buffer stays small
+                self.buf = self.buf[self.pos:]
+                self.pos = 0
+
+    def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        if self.bytes_read >= self.stream_limit:
+            raise _StreamLimitReached()
+        chunk = self.file.read(min(self.chunk_size, self.stream_limit - self.bytes_read))
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+            self.buf += self.utf8.decode(b"", final=True)
+            return False
+        self.buf += self.utf8.decode(chunk)
+        # Larger reads once we know we are walking through a big document
+        self.chunk_size = min(self.chunk_size * 2, 256 * 1024)
+        return True
+
+    def _peek(self) -> str:
+        while self.pos >= len(self.buf):
+            if not self._read_more():
+                raise ValueError("unexpected end of document")
+        return self.buf[self.pos]
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self.pos += 1
+        return char
+
+    def _expect(self, char: str):
+        self._skip_ws()
+        if self._next_char() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos - 1}")
+
+    def _skip_ws(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._read_more():
+                return
+
+    def _decode_value(self) -> Any:
+        """Decode one complete value at pos, reading more input as needed"""
+        if self._peek() not in '"[{':
+            # A number or literal is only complete once its delimiter is buffered
+            while not _SCALAR_END.search(self.buf, self.pos) and self._read_more():
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            self.pos = end
+            return value
+
+    def _skip_value(self):
+        """Advance past one value without decoding it"""
+        first = self._peek()
+        if first not in '"[{':
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                if not self._read_more():
+                    return
+
+        depth = 0
+        in_string = False
+        while True:
+            pattern = _SKIP_INSIDE_STRING if in_string else _SKIP_OUTSIDE_STRING
+            match = pattern.search(self.buf, self.pos)
+            if match is None:
+                # Nothing interesting left in this chunk: discard it
+                self.buf = ""
+                self.pos = 0
+                if not self._read_more():
+                    raise ValueError("unexpected end of document")
+                continue
+            char = match.group()
+            self.pos = match.end()
+            if in_string:
+                if char == '\\':
+                    if self.pos >= len(self.buf) and not self._read_more():
+                        raise ValueError("unexpected end of document")
+                    self.pos += 1
+                else:
+                    in_string = False
+                    if depth == 0:
+                        return
+            elif char == '"':
+                in_string = True
+            elif char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional, Tuple
+
+MAX_SCORE = 100
+
+
+def score_bucket(score) -> int:
+    """Map a score onto the 0..MAX_SCORE integer domain"""
+    return min(MAX_SCORE, max(0, int(round(score))))
+
+
+class FenwickTree:
+    """Counts over 0..size-1 with O(log n) update and prefix sum"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+        self.total = 0
+
+    @classmethod
+    def from_counts(cls, counts: List[int]) -> "FenwickTree":
+        """Build in O(n) from per-position counts"""
+        tree = cls(len(counts))
+        for position, count in enumerate(counts, start=1):
+            tree._tree[position] += count
+            parent = position + (position & -position)
+            if parent <= tree.size:
+                tree._tree[parent] += tree._tree[position]
+        tree.total = sum(counts)
+        return tree
+
+    def add(self, position: int, delta: int = 1):
+        self.total += delta
+        position += 1
+        while position <= self.size:
+            self._tree[position] += delta
+            position += position & -position
+
+    def count_below(self, position: int) -> int:
+        """Sum of counts at positions < position"""
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+
+class Leaderboard:
+    """Order statistics over scores, kept current as results come in.
+
+    One Fenwick tree counts every result by score and another counts
+    trainees by their best score, so "better than X%" is a prefix sum.
+    Trainees are also bucketed by best score (earliest achiever first),
+    which makes the top k a walk down from the highest bucket.
+    """
+
+    def __init__(self):
+        self.results = FenwickTree(MAX_SCORE + 1)
+        self.trainees = FenwickTree(MAX_SCORE + 1)
+        self._buckets: List[Dict[str, None]] = [{} for _ in range(MAX_SCORE + 1)]
+        self._best: Dict[str, int] = {}
+
+    @classmethod
+    def from_profiles(cls, result_counts: List[int], bests: List[Tuple[str, float, int]]) -> "Leaderboard":
+        """Rebuild from a score histogram and (user_id, best, best_at) per trainee"""
+        board = cls()
+        counts = list(result_counts)[:MAX_SCORE + 1]
+        board.results = FenwickTree.from_counts(counts + [0] * (MAX_SCORE + 1 - len(counts)))
+        trainee_counts = [0] * (MAX_SCORE + 1)
+        for user_id, best, _ in sorted(bests, key=lambda entry: entry[2]):
+            bucket = score_bucket(best)
+            board._buckets[bucket][user_id] = None
+            board._best[user_id] = bucket
+            trainee_counts[bucket] += 1
+        board.trainees = FenwickTree.from_counts(trainee_counts)
+        return board
+
+    def histogram(self) -> List[int]:
+        """Number of results per score"""
+        return [self.results.count_below(bucket + 1) - self.results.count_below(bucket)
+                for bucket in range(MAX_SCORE + 1)]
+
+    def add_result(self, user_id: str, score) -> bool:
+        """Count one result; True if it raised the trainee's best score"""
+        bucket = score_bucket(score)
+        self.results.add(bucket)
+        previous = self._best.get(user_id)
+        if previous is not None and previous >= bucket:
+            return False
+        if previous is not None:
+            del self._buckets[previous][user_id]
+            self.trainees.add(previous, -1)
+        self._buckets[bucket][user_id] = None
+        self._best[user_id] = bucket
+        self.trainees.add(bucket)
+        return True
+
+    def trainee_percentile(self, score, user_id: Optional[str] = None) -> Optional[float]:
+        """Percent of other trainees whose best score is below score"""
+        bucket = score_bucket(score)
+        below = self.trainees.count_below(bucket)
+        others = self.trainees.total
+        own = self._best.get(user_id) if user_id is not None else None
+        if own is not None:
+            others -= 1
+            if own < bucket:
+                below -= 1
+        if others <= 0:
+            return None
+        return round(100.0 * below / others, 1)
+
+    def result_percentile(self, score) -> Optional[float]:
+        """Percent of all results below score"""
+        if not self.results.total:
+            return None
+        return round(100.0 * self.results.count_below(score_bucket(score)) / self.results.total, 1)
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        """(user_id, best score) of the k best trainees"""
+        leaders = []
+        for bucket in range(MAX_SCORE, -1, -1):
+            for user_id in self._buckets[bucket]:
+                leaders.append((user_id, bucket))
+                if len(leaders) >= k:
+                    return leaders
+        return leaders
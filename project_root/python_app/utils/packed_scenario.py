@@ -0,0 +1,465 @@
+"""
+Packed scenario container (.sqpk)
+
+JSON stays the interchange format for the Java ScenarioEditor/ScenarioPlayer.
+The packed form is what the Python side reads for listing, grading and
+analytics: move points live in typed int32 arrays instead of one
+{"x":..,"y":..} dict per point, and every string is stored once in a table.
+
+Layout (little-endian):
+    b"SQPK" u16 version u16 flags
+    u64 source mtime_ns, u64 source size   (the JSON file this was built from)
+    u32 string count, then (u32 length, utf-8 bytes) per string
+    u32 team count,  int32[teams + 1]  squad offsets per team
+    u32 squad count, int32[squads + 1] point offsets per squad
+    u32 point count, int16[points] move number, int32[points] x, int32[points] y
+    u32 skeleton length, skeleton bytes
+
+The skeleton is the rest of the document (everything except the packed
+move points) in a small tagged encoding that refers to the string table.
+
+Usage:
+    python -m utils.packed_scenario pack   <scenario.json | folder> [output]
+    python -m utils.packed_scenario unpack <scenario.sqpk | folder> [output]
+    python -m utils.packed_scenario verify <scenario.json | folder>
+"""
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+MAGIC = b"SQPK"
+VERSION = 1
+PACKED_EXTENSION = ".sqpk"
+
+_MOVE_KEY = re.compile(r"move_(\d+)$")
+_INT32_MIN, _INT32_MAX = -2 ** 31, 2 ** 31 - 1
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+# Skeleton value tags
+_NULL, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT = range(8)
+
+
+def _is_packable_point(value: Any) -> bool:
+    if not isinstance(value, dict) or len(value) != 2:
+        return False
+    x, y = value.get("x"), value.get("y")
+    return (type(x) is int and type(y) is int
+            and _INT32_MIN <= x <= _INT32_MAX and _INT32_MIN <= y <= _INT32_MAX)
+
+
+class _Writer:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.out = bytearray()
+
+    def intern(self, text: str) -> int:
+        idx = self.index.get(text)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings.append(text)
+            self.index[text] = idx
+        return idx
+
+    def varint(self, value: int):
+        while True:
+            byte = value & 0x7F
+            value >>= 7
+            if value:
+                self.out.append(byte | 0x80)
+            else:
+                self.out.append(byte)
+                return
+
+    def value(self, value: Any):
+        if value is None:
+            self.out.append(_NULL)
+        elif value is True:
+            self.out.append(_TRUE)
+        elif value is False:
+            self.out.append(_FALSE)
+        elif isinstance(value, int):
+            self.out.append(_INT)
+            # Zigzag so negative numbers stay short
+            self.varint(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            self.out.append(_FLOAT)
+            self.out += struct.pack("<d", value)
+        elif isinstance(value, str):
+            self.out.append(_STR)
+            self.varint(self.intern(value))
+        elif isinstance(value, list):
+            self.out.append(_LIST)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, dict):
+            self.out.append(_DICT)
+            self.varint(len(value))
+            for key, item in value.items():
+                self.varint(self.intern(str(key)))
+                self.value(item)
+        else:
+            raise TypeError(f"Cannot pack value of type {type(value).__name__}")
+
+
+class _Reader:
+    def __init__(self, data: bytes, strings: List[str]):
+        self.data = data
+        self.pos = 0
+        self.strings = strings
+
+    def varint(self) -> int:
+        result = shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+    def value(self) -> Any:
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _NULL:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            raw = self.varint()
+            return raw >> 1 if not raw & 1 else -((raw + 1) >> 1)
+        if tag == _FLOAT:
+            value = struct.unpack_from("<d", self.data, self.pos)[0]
+            self.pos += 8
+            return value
+        if tag == _STR:
+            return self.strings[self.varint()]
+        if tag == _LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _DICT:
+            result = {}
+            for _ in range(self.varint()):
+                key = self.strings[self.varint()]
+                result[key] = self.value()
+            return result
+        raise ValueError(f"Unknown tag {tag} at offset {self.pos - 1}")
+
+
+def _typed_array(typecode: str, values) -> array:
+    return array(typecode, values)
+
+
+def _array_bytes(values: array) -> bytes:
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_array(typecode: str, data: bytes, pos: int, count: int) -> Tuple[array, int]:
+    values = array(typecode)
+    end = pos + count * values.itemsize
+    values.frombytes(data[pos:end])
+    if not _LITTLE_ENDIAN:
+        values.byteswap()
+    return values, end
+
+
+def pack_scenario(document: Dict[str, Any], source_stat: Tuple[int, int] = (0, 0)) -> bytes:
+    """Encode a scenario document into the packed container"""
+    if not isinstance(document, dict):
+        raise ValueError("Scenario document must be a JSON object")
+
+    team_offsets = [0]
+    point_offsets = [0]
+    move_numbers, xs, ys = [], [], []
+
+    skeleton = dict(document)
+    teams = document.get("teams")
+    if isinstance(teams, list):
+        skeleton_teams = []
+        for team in teams:
+            if not isinstance(team, dict) or not isinstance(team.get("squads"), list):
+                # Unusual shape: keep it verbatim with no squads in the arrays
+                skeleton_teams.append(team)
+                team_offsets.append(team_offsets[-1])
+                continue
+            skeleton_squads = []
+            for squad in team["squads"]:
+                rest = squad
+                if isinstance(squad, dict):
+                    moves = []
+                    rest = {}
+                    for key, value in squad.items():
+                        match = _MOVE_KEY.match(key) if isinstance(key, str) else None
+                        if match and _is_packable_point(value) and int(match.group(1)) <= 32767 \
+                                and key == f"move_{int(match.group(1))}":
+                            moves.append((int(match.group(1)), value["x"], value["y"]))
+                        else:
+                            rest[key] = value
+                    for number, x, y in moves:
+                        move_numbers.append(number)
+                        xs.append(x)
+                        ys.append(y)
+                point_offsets.append(len(xs))
+                skeleton_squads.append(rest)
+            skeleton_team = dict(team)
+            skeleton_team["squads"] = skeleton_squads
+            skeleton_teams.append(skeleton_team)
+            team_offsets.append(len(point_offsets) - 1)
+        skeleton["teams"] = skeleton_teams
+
+    writer = _Writer()
+    writer.value(skeleton)
+    skeleton_bytes = bytes(writer.out)
+
+    out = bytearray(MAGIC)
+    out += struct.pack("<HHQQ", VERSION, 0, source_stat[0], source_stat[1])
+    out += struct.pack("<I", len(writer.strings))
+    for text in writer.strings:
+        encoded = text.encode("utf-8")
+        out += struct.pack("<I", len(encoded))
+        out += encoded
+    out += struct.pack("<I", len(team_offsets) - 1)
+    out += _array_bytes(_typed_array("i", team_offsets))
+    out += struct.pack("<I", len(point_offsets) - 1)
+    out += _array_bytes(_typed_array("i", point_offsets))
+    out += struct.pack("<I", len(xs))
+    out += _array_bytes(_typed_array("h", move_numbers))
+    out += _array_bytes(_typed_array("i", xs))
+    out += _array_bytes(_typed_array("i", ys))
+    out += struct.pack("<I", len(skeleton_bytes))
+    out += skeleton_bytes
+    return bytes(out)
+
+
+class PackedScenario:
+    """Array-backed, read-only view of a packed scenario"""
+
+    def __init__(self, data: bytes):
+        if data[:4] != MAGIC:
+            raise ValueError("Not a packed scenario")
+        version, _flags, mtime_ns, size = struct.unpack_from("<HHQQ", data, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported packed scenario version {version}")
+        self.source_stat = (mtime_ns, size)
+        pos = 4 + struct.calcsize("<HHQQ")
+
+        (string_count,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        strings = []
+        for _ in range(string_count):
+            (length,) = struct.unpack_from("<I", data, pos)
+            pos += 4
+            strings.append(data[pos:pos + length].decode("utf-8"))
+            pos += length
+        self.strings = strings
+
+        (team_count,) = struct.unpack_from("<I", data, pos)
+        self.team_squad_offsets, pos = _read_array("i", data, pos + 4, team_count + 1)
+        (squad_count,) = struct.unpack_from("<I", data, pos)
+        self.squad_point_offsets, pos = _read_array("i", data, pos + 4, squad_count + 1)
+        (point_count,) = struct.unpack_from("<I", data, pos)
+        self.move_numbers, pos = _read_array("h", data, pos + 4, point_count)
+        self.xs, pos = _read_array("i", data, pos, point_count)
+        self.ys, pos = _read_array("i", data, pos, point_count)
+        (skeleton_length,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        self.skeleton: Dict[str, Any] = _Reader(data[pos:pos + skeleton_length], strings).value()
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.skeleton.get("title")
+
+    @property
+    def background(self) -> Optional[str]:
+        return self.skeleton.get("background")
+
+    @property
+    def teams(self) -> List[Dict[str, Any]]:
+        """Team dicts without move points (colors, right_move, explanations...)"""
+        teams = self.skeleton.get("teams")
+        return teams if isinstance(teams, list) else []
+
+    @property
+    def team_count(self) -> int:
+        return len(self.teams)
+
+    @property
+    def squad_count(self) -> int:
+        return sum(len(team.get("squads") or []) for team in self.teams if isinstance(team, dict))
+
+    @property
+    def point_count(self) -> int:
+        return len(self.xs)
+
+    def right_moves(self) -> List[Optional[int]]:
+        """right_move per team, in team order"""
+        return [team.get("right_move") if isinstance(team, dict) else None for team in self.teams]
+
+    def team_colors(self) -> List[Optional[str]]:
+        """color per team, in team order"""
+        return [team.get("color") if isinstance(team, dict) else None for team in self.teams]
+
+    def squad_points(self, team_index: int, squad_index: int) -> List[Tuple[int, int, int]]:
+        """(move number, x, y) for one squad, read straight from the arrays"""
+        squad = self.team_squad_offsets[team_index] + squad_index
+        start, end = self.squad_point_offsets[squad], self.squad_point_offsets[squad + 1]
+        return [(self.move_numbers[i], self.xs[i], self.ys[i]) for i in range(start, end)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the original JSON document"""
+        document = dict(self.skeleton)
+        teams = document.get("teams")
+        if not isinstance(teams, list):
+            return document
+        rebuilt_teams = []
+        for team_index, team in enumerate(teams):
+            if not isinstance(team, dict) or not isinstance(team.get("squads"), list):
+                rebuilt_teams.append(team)
+                continue
+            squads = []
+            for squad_index, rest in enumerate(team["squads"]):
+                points = self.squad_points(team_index, squad_index)
+                if not points:
+                    squads.append(rest)
+                    continue
+                squad = {f"move_{number}": {"x": x, "y": y} for number, x, y in points}
+                squad.update(rest)
+                squads.append(squad)
+            rebuilt = dict(team)
+            rebuilt["squads"] = squads
+            rebuilt_teams.append(rebuilt)
+        document["teams"] = rebuilt_teams
+        return document
+
+
+def load_packed(path: str) -> PackedScenario:
+    """Read a .sqpk file"""
+    with open(path, "rb") as f:
+        return PackedScenario(f.read())
+
+
+def save_packed(document: Dict[str, Any], path: str, source_stat: Tuple[int, int] = (0, 0)):
+    """Write a .sqpk file atomically"""
+    write_packed(pack_scenario(document, source_stat), path)
+
+
+def write_packed(data: bytes, path: str):
+    """Write already packed bytes to a .sqpk file atomically"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def packed_path_for(json_path: str, packed_dir: str) -> str:
+    """Location of the packed copy of a scenario JSON file"""
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    return os.path.join(packed_dir, name + PACKED_EXTENSION)
+
+
+def load_scenario_view(json_path: str, packed_dir: str,
+                       document: Optional[Dict[str, Any]] = None,
+                       source_stat: Optional[Tuple[int, int]] = None) -> Optional[PackedScenario]:
+    """Return the packed view of a scenario, repacking it if the JSON changed.
+
+    A caller that already read the document passes it with the
+    (mtime_ns, size) stat taken when it was read.
+    """
+    if source_stat is None:
+        try:
+            st = os.stat(json_path)
+        except OSError:
+            return None
+        source_stat = (st.st_mtime_ns, st.st_size)
+    packed_path = packed_path_for(json_path, packed_dir)
+
+    if document is None:
+        try:
+            view = load_packed(packed_path)
+            if view.source_stat == source_stat:
+                return view
+        except (OSError, ValueError, struct.error):
+            pass
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read scenario {json_path}: {e}")
+            return None
+
+    try:
+        data = pack_scenario(document, source_stat)
+        view = PackedScenario(data)
+        write_packed(data, packed_path)
+        return view
+    except (OSError, ValueError, TypeError) as e:
+        print(f"❌ Could not pack scenario {json_path}: {e}")
+        return None
+
+
+def _convert_paths(source: str, output: Optional[str], from_ext: str, to_ext: str):
+    if os.path.isdir(source):
+        out_dir = output or source
+        for name in sorted(os.listdir(source)):
+            if name.endswith(from_ext):
+                yield (os.path.join(source, name),
+                       os.path.join(out_dir, name[:-len(from_ext)] + to_ext))
+    else:
+        yield source, output or os.path.splitext(source)[0] + to_ext
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert scenarios between JSON and the packed format")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("pack", "unpack"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("source")
+        cmd.add_argument("output", nargs="?")
+    verify = sub.add_parser("verify", help="check that pack -> unpack is lossless")
+    verify.add_argument("source")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    if args.command == "pack":
+        for src, dst in _convert_paths(args.source, args.output, ".json", PACKED_EXTENSION):
+            with open(src, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            st = os.stat(src)
+            save_packed(document, dst, (st.st_mtime_ns, st.st_size))
+            print(f"📦 {src} -> {dst} ({os.path.getsize(src)} -> {os.path.getsize(dst)} bytes)")
+    elif args.command == "unpack":
+        for src, dst in _convert_paths(args.source, args.output, PACKED_EXTENSION, ".json"):
+            document = load_packed(src).to_dict()
+            with open(dst, "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+            print(f"📄 {src} -> {dst}")
+    else:
+        for src, _ in _convert_paths(args.source, None, ".json", PACKED_EXTENSION):
+            with open(src, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            ok = PackedScenario(pack_scenario(document)).to_dict() == document
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {src}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Printed by the player once it accepts commands (same marker as single launches)
+READY_MARKER = "SQUAD_READY"
+
+
+RESULT_COMMANDS = ("RESULT", "PARTIAL", "PLAYLIST_DONE")
+
+
+def parse_result_line(line: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return ('result' | 'partial' | 'playlist_done', payload) for result lines, else None"""
+    command, _, rest = line.partition(" ")
+    if command not in RESULT_COMMANDS:
+        return None
+    try:
+        payload = json.loads(rest)
+    except json.JSONDecodeError as e:
+        print(f"⚠️ Ignoring malformed player {command.lower()}: {e}")
+        return None
+    if not isinstance(payload, dict):
+        print(f"⚠️ Ignoring player {command.lower()} that is not an object")
+        return None
+    return command.lower(), payload
+
+
+class PlayerDaemon:
+    """Keeps one scenario player process warm and drives it over stdin/stdout.
+
+    Protocol, one line per message:
+
+        app -> player   play <absolute path> <mode>
+                        playlist <mode> <json array of absolute paths>
+                        ping
+                        quit
+        player -> app   SQUAD_READY
+                        PLAYING <path>
+                        PARTIAL <json object>   (one per team choice, as it happens)
+                        RESULT <json object>
+                        PLAYLIST_DONE <json object>  (after the last RESULT of a playlist)
+                        ERROR <message>
+                        PONG
+
+    While running, the daemon pings the player every heartbeat_interval
+    seconds; with a supervisor (ProcessSupervisor) the drained output is
+    buffered there and a player that stops answering for three intervals
+    is killed, which the restart policy below then handles.
+
+    Commands sent before SQUAD_READY are queued. The process is stopped
+    after idle_timeout seconds without a scenario, and restarted after a
+    crash unless it already crashed max_restarts times within
+    restart_window seconds. Listeners receive (event, payload) on the
+    reader thread; events are 'ready', 'playing', 'partial', 'result',
+    'playlist_done', 'error', 'pong', 'restart' and 'exit'.
+    """
+
+    IDLE_TIMEOUT = 300.0
+    MAX_RESTARTS = 3
+    RESTART_WINDOW = 60.0
+    HEARTBEAT_INTERVAL = 10.0
+
+    def __init__(self, command: List[str], idle_timeout: float = IDLE_TIMEOUT,
+                 max_restarts: int = MAX_RESTARTS, restart_window: float = RESTART_WINDOW,
+                 popen_kwargs: Optional[Dict[str, Any]] = None, supervisor=None,
+                 heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        self.command = list(command)
+        self.idle_timeout = idle_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.popen_kwargs = dict(popen_kwargs or {})
+        self.supervisor = supervisor
+        self.heartbeat_interval = heartbeat_interval
+
+        self._lock = threading.RLock()
+        self._process: Optional[subprocess.Popen] = None
+        self._ready = False
+        self._stopping = False
+        self._queued: List[str] = []
+        # (what is playing, mode, whether it is a playlist)
+        self._current: Optional[Tuple[str, str, bool]] = None
+        self._restarts = deque()
+        self._idle_timer: Optional[threading.Timer] = None
+        self._stderr_tail = deque(maxlen=40)
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+    def add_listener(self, callback: Callable[[str, Any], None]):
+        """Register callback(event, payload)"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a callback added with add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event: str, payload: Any = None):
+        for callback in list(self._listeners):
+            try:
+                callback(event, payload)
+            except Exception as e:
+                print(f"❌ Player daemon listener failed on {event}: {e}")
+
+    @property
+    def pid(self) -> Optional[int]:
+        process = self._process
+        return process.pid if process is not None else None
+
+    def is_running(self) -> bool:
+        process = self._process
+        return process is not None and process.poll() is None
+
+    def is_ready(self) -> bool:
+        return self._ready and self.is_running()
+
+    def is_busy(self) -> bool:
+        return self._current is not None
+
+    def start(self) -> bool:
+        """Start the player process unless it is already running"""
+        with self._lock:
+            if self.is_running():
+                return True
+            if self.supervisor is not None and not self.supervisor.can_spawn():
+                print("❌ Not starting player daemon: too many child processes")
+                return False
+            print(f"🚀 Starting player daemon: {' '.join(self.command)}")
+            try:
+                process = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    **self.popen_kwargs
+                )
+            except OSError as e:
+                print(f"❌ Could not start player daemon: {e}")
+                return False
+
+            self._process = process
+            self._ready = False
+            self._stopping = False
+            self._stderr_tail.clear()
+            if self.supervisor is not None:
+                self.supervisor.register(process, "Scenario Player daemon",
+                                         heartbeat_timeout=3 * self.heartbeat_interval, stop=self.stop)
+            threading.Thread(target=self._read_stdout, args=(process,),
+                             name="player-daemon-stdout", daemon=True).start()
+            threading.Thread(target=self._read_stderr, args=(process,),
+                             name="player-daemon-stderr", daemon=True).start()
+            threading.Thread(target=self._wait, args=(process,),
+                             name="player-daemon-wait", daemon=True).start()
+            threading.Thread(target=self._heartbeat, args=(process,),
+                             name="player-daemon-heartbeat", daemon=True).start()
+            self._arm_idle_timer()
+            return True
+
+    def play(self, scenario_path: str, mode: str) -> bool:
+        """Ask the player to show a scenario; the outcome arrives as a 'result' event"""
+        scenario_path = os.path.abspath(scenario_path)
+        with self._lock:
+            if not self.start():
+                return False
+            self._current = (os.path.basename(scenario_path), mode, False)
+            self._cancel_idle_timer()
+            return self._send(f"play {scenario_path} {mode}")
+
+    def play_playlist(self, scenario_paths: List[str], mode: str) -> bool:
+        """Play scenarios back to back in one window; one 'result' event per
+        scenario as it finishes, then 'playlist_done'"""
+        scenario_paths = [os.path.abspath(path) for path in scenario_paths]
+        if not scenario_paths:
+            return False
+        with self._lock:
+            if not self.start():
+                return False
+            self._current = (f"playlist of {len(scenario_paths)} scenario(s)", mode, True)
+            self._cancel_idle_timer()
+            return self._send(f"playlist {mode} " + json.dumps(scenario_paths, ensure_ascii=False))
+
+    def ping(self) -> bool:
+        """Check that the player still answers (replies with a 'pong' event)"""
+        with self._lock:
+            return self.is_running() and self._send("ping")
+
+    def stop(self, timeout: float = 5.0):
+        """Ask the player to quit, killing it if it does not exit in time"""
+        with self._lock:
+            process = self._process
+            if process is None or process.poll() is not None:
+                return
+            self._stopping = True
+            self._cancel_idle_timer()
+            self._write(process, "quit")
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print("⚠️ Player daemon did not quit, killing it")
+            process.kill()
+
+    def _send(self, line: str) -> bool:
+        """Send a command now, or queue it until the player is ready"""
+        if not self._ready:
+            self._queued.append(line)
+            return True
+        return self._write(self._process, line)
+
+    def _write(self, process: subprocess.Popen, line: str) -> bool:
+        try:
+            process.stdin.write((line + "\n").encode('utf-8'))
+            process.stdin.flush()
+            return True
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not send '{line.split(' ', 1)[0]}' to player daemon: {e}")
+            return False
+
+    def _arm_idle_timer(self):
+        self._cancel_idle_timer()
+        if self.idle_timeout and self.idle_timeout > 0:
+            self._idle_timer = threading.Timer(self.idle_timeout, self._on_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _on_idle(self):
+        with self._lock:
+            if self._current is not None or not self.is_running():
+                return
+        print(f"💤 Player daemon idle for {self.idle_timeout:.0f}s, shutting it down")
+        self.stop()
+
+    def _heartbeat(self, process: subprocess.Popen):
+        """Ping the player periodically; its PONG is the heartbeat"""
+        while process.poll() is None:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                if process is not self._process or process.poll() is not None:
+                    return
+                if self._ready:
+                    self._write(process, "ping")
+
+    def _read_stdout(self, process: subprocess.Popen):
+        for raw in iter(process.stdout.readline, b""):
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            if self.supervisor is not None:
+                self.supervisor.record_output(process.pid, "stdout", line)
+            if not line:
+                continue
+            command, _, rest = line.partition(" ")
+            if line == READY_MARKER:
+                with self._lock:
+                    if process is not self._process:
+                        continue
+                    self._ready = True
+                    queued, self._queued = self._queued, []
+                    for queued_line in queued:
+                        self._write(process, queued_line)
+                print(f"✅ Player daemon ready (pid {process.pid})")
+                self._notify("ready")
+            elif command == "PLAYING":
+                self._notify("playing", rest)
+            elif command in RESULT_COMMANDS:
+                parsed = parse_result_line(line)
+                if parsed is None:
+                    continue
+                kind, payload = parsed
+                current = self._current
+                if kind == "playlist_done" or (kind == "result" and not (current and current[2])):
+                    self._finish_current()
+                self._notify(kind, payload)
+            elif command == "ERROR":
+                self._finish_current()
+                self._notify("error", rest)
+            elif command == "PONG":
+                self._notify("pong")
+            else:
+                print(f"📤 [player] {line}")
+        process.stdout.close()
+
+    def _read_stderr(self, process: subprocess.Popen):
+        for raw in iter(process.stderr.readline, b""):
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            if self.supervisor is not None:
+                self.supervisor.record_output(process.pid, "stderr", line)
+            if line:
+                self._stderr_tail.append(line)
+        process.stderr.close()
+
+    def _finish_current(self):
+        with self._lock:
+            self._current = None
+            self._arm_idle_timer()
+
+    def _wait(self, process: subprocess.Popen):
+        returncode = process.wait()
+        if self.supervisor is not None:
+            self.supervisor.unregister(process.pid)
+        with self._lock:
+            if process is not self._process:
+                return
+            self._ready = False
+            stopping = self._stopping
+            current, self._current = self._current, None
+            self._queued = []
+            self._cancel_idle_timer()
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+        if stopping:
+            print(f"🏁 Player daemon exited with code {returncode}")
+            self._notify("exit", returncode)
+            return
+
+        details = "\n".join(self._stderr_tail) or "no error output"
+        print(f"💥 Player daemon crashed with code {returncode}:\n{details}")
+        if current is not None:
+            self._notify("error", f"Player exited with code {returncode} while playing {current[0]}")
+
+        now = time.monotonic()
+        while self._restarts and now - self._restarts[0] > self.restart_window:
+            self._restarts.popleft()
+        if len(self._restarts) >= self.max_restarts:
+            print(f"❌ Player daemon crashed {len(self._restarts) + 1} times in "
+                  f"{self.restart_window:.0f}s, not restarting")
+            self._notify("exit", returncode)
+            return
+
+        self._restarts.append(now)
+        if self.start():
+            self._notify("restart", len(self._restarts))
+        else:
+            self._notify("exit", returncode)
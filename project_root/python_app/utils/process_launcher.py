@@ -1,18 +1,538 @@
+import atexit
 import subprocess
 import os
 import sys
 import json
+import shutil
 import threading
 import time
-from typing import Optional
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+try:
+    import psutil
+except ImportError:  # optional: per-child RSS/CPU falls back to /proc
+    psutil = None
+
+from utils.json_handler import JSONHandler
+from utils.player_daemon import PlayerDaemon, READY_MARKER, parse_result_line
+
+
+class ChildProcess:
+    """Bookkeeping for one supervised child"""
+
+    def __init__(self, process: subprocess.Popen, name: str, heartbeat_timeout: Optional[float],
+                 stop: Optional[Callable[[], None]], buffer_lines: int):
+        self.process = process
+        self.pid = process.pid
+        self.name = name
+        self.heartbeat_timeout = heartbeat_timeout
+        self.stop = stop
+        self.started = time.monotonic()
+        self.last_heartbeat = self.started
+        self.stdout = deque(maxlen=buffer_lines)
+        self.stderr = deque(maxlen=buffer_lines)
+        self.rss_bytes: Optional[int] = None
+        self.cpu_percent: Optional[float] = None
+        self._cpu_time: Optional[float] = None
+        self._sampled_at: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "uptime": round(now - self.started, 1),
+            "since_heartbeat": round(now - self.last_heartbeat, 1),
+            "rss_bytes": self.rss_bytes,
+            "cpu_percent": self.cpu_percent,
+            "stdout_lines": len(self.stdout),
+            "stderr_lines": len(self.stderr),
+        }
+
+
+class ProcessSupervisor:
+    """Tracks every child process the launcher starts.
+
+    Callers register each Popen and feed it the lines their reader threads
+    drain; the last buffer_lines of each stream are kept in ring buffers.
+    A monitor thread samples RSS and CPU per child (psutil when installed,
+    /proc otherwise), forgets children that exited, and kills children
+    whose heartbeat_timeout passed without output. At most max_children
+    may run at once, and kill_all() (also run at exit) stops them all.
+    """
+
+    MAX_CHILDREN = 4
+    SAMPLE_INTERVAL = 2.0
+    BUFFER_LINES = 500
+
+    _instance: Optional["ProcessSupervisor"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_children: int = MAX_CHILDREN, sample_interval: float = SAMPLE_INTERVAL,
+                 buffer_lines: int = BUFFER_LINES):
+        self.max_children = max_children
+        self.sample_interval = sample_interval
+        self.buffer_lines = buffer_lines
+        self._lock = threading.RLock()
+        self._children: Dict[int, ChildProcess] = {}
+        self._monitor: Optional[threading.Thread] = None
+        self._shutting_down = False
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    @classmethod
+    def instance(cls) -> "ProcessSupervisor":
+        """Return the application-wide supervisor"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.kill_all)
+            return cls._instance
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Register callback(event, snapshot) for 'spawned', 'exited' and 'hung'"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a callback added with add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event: str, child: ChildProcess):
+        snapshot = child.snapshot()
+        for callback in list(self._listeners):
+            try:
+                callback(event, snapshot)
+            except Exception as e:
+                print(f"❌ Supervisor listener failed on {event}: {e}")
+
+    def can_spawn(self) -> bool:
+        """False while shutting down or when max_children are running"""
+        with self._lock:
+            self._reap()
+            if self._shutting_down:
+                return False
+            if len(self._children) >= self.max_children:
+                print(f"⚠️ {len(self._children)} child processes already running (limit {self.max_children})")
+                return False
+            return True
+
+    def register(self, process: subprocess.Popen, name: str, heartbeat_timeout: Optional[float] = None,
+                 stop: Optional[Callable[[], None]] = None) -> ChildProcess:
+        """Start tracking a child; stop() is used instead of terminate() by kill_all"""
+        child = ChildProcess(process, name, heartbeat_timeout, stop, self.buffer_lines)
+        with self._lock:
+            self._children[child.pid] = child
+            if self._monitor is None or not self._monitor.is_alive():
+                self._monitor = threading.Thread(target=self._run, name="process-supervisor", daemon=True)
+                self._monitor.start()
+        self._notify("spawned", child)
+        return child
+
+    def record_output(self, pid: int, stream: str, line: str):
+        """Buffer a drained line; any output counts as a heartbeat"""
+        child = self._children.get(pid)
+        if child is None:
+            return
+        (child.stderr if stream == "stderr" else child.stdout).append(line)
+        child.last_heartbeat = time.monotonic()
+
+    def beat(self, pid: int):
+        """Record a heartbeat without output"""
+        child = self._children.get(pid)
+        if child is not None:
+            child.last_heartbeat = time.monotonic()
+
+    def unregister(self, pid: int):
+        """Stop tracking a child that exited"""
+        with self._lock:
+            child = self._children.pop(pid, None)
+        if child is not None:
+            self._notify("exited", child)
+
+    def get(self, pid: int) -> Optional[ChildProcess]:
+        return self._children.get(pid)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Snapshots of all running children"""
+        with self._lock:
+            return [child.snapshot() for child in self._children.values()]
+
+    def _reap(self):
+        for pid, child in list(self._children.items()):
+            if child.process.poll() is not None:
+                self.unregister(pid)
+
+    def _run(self):
+        while True:
+            time.sleep(self.sample_interval)
+            with self._lock:
+                self._reap()
+                children = list(self._children.values())
+                if not children:
+                    self._monitor = None
+                    return
+            now = time.monotonic()
+            for child in children:
+                self._sample(child, now)
+                if (child.heartbeat_timeout and not self._shutting_down
+                        and now - child.last_heartbeat > child.heartbeat_timeout):
+                    print(f"💀 {child.name} (pid {child.pid}) sent no heartbeat for "
+                          f"{now - child.last_heartbeat:.0f}s, killing it")
+                    self._notify("hung", child)
+                    child.process.kill()
+
+    def _sample(self, child: ChildProcess, now: float):
+        """Update RSS and CPU% of one child"""
+        usage = self._read_usage(child.pid)
+        if usage is None:
+            return
+        rss_bytes, cpu_time = usage
+        child.rss_bytes = rss_bytes
+        if child._cpu_time is not None and now > child._sampled_at:
+            child.cpu_percent = round(100.0 * (cpu_time - child._cpu_time) / (now - child._sampled_at), 1)
+        child._cpu_time = cpu_time
+        child._sampled_at = now
+
+    @staticmethod
+    def _read_usage(pid: int) -> Optional[Tuple[int, float]]:
+        """(rss bytes, total cpu seconds) of a process, or None when unavailable"""
+        if psutil is not None:
+            try:
+                proc = psutil.Process(pid)
+                times = proc.cpu_times()
+                return proc.memory_info().rss, times.user + times.system
+            except (psutil.Error, OSError):
+                return None
+        try:
+            with open(f"/proc/{pid}/stat", 'r') as f:
+                # Fields after the parenthesised command name; utime/stime are 14th/15th
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{pid}/statm", 'r') as f:
+                resident_pages = int(f.read().split()[1])
+            ticks = os.sysconf("SC_CLK_TCK")
+            cpu_time = (int(fields[11]) + int(fields[12])) / ticks
+            return resident_pages * os.sysconf("SC_PAGE_SIZE"), cpu_time
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    def kill_all(self, timeout: float = 3.0):
+        """Stop every child: graceful stop hooks first, then terminate, then kill"""
+        with self._lock:
+            self._shutting_down = True
+            children = list(self._children.values())
+        if not children:
+            return
+        print(f"🧹 Stopping {len(children)} child process(es)")
+        for child in children:
+            try:
+                if child.stop is not None:
+                    child.stop()
+                elif child.process.poll() is None:
+                    child.process.terminate()
+            except Exception as e:
+                print(f"⚠️ Could not stop {child.name} (pid {child.pid}): {e}")
+        deadline = time.monotonic() + timeout
+        for child in children:
+            try:
+                child.process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                print(f"⚠️ Killing {child.name} (pid {child.pid})")
+                child.process.kill()
+            self.unregister(child.pid)
+
+
+class LaunchHandle(QObject):
+    """A launched JVM, observed from background threads.
+
+    Reader threads drain stdout/stderr (so the pipes never fill up) and
+    watch for READY_MARKER. They start on the next event loop turn, so
+    callers can connect the signals first. Signals are emitted from those
+    threads and are delivered queued to slots living in the GUI thread:
+
+    ready      - the marker was printed, or the process survived ready_timeout
+                 (older builds that do not print the marker)
+    partial    - a PARTIAL line (one team choice), as soon as it is printed
+    result     - each RESULT line (one per scenario of a playlist); results
+                 missing by exit are read from the result_file instead
+    playlist_done - the PLAYLIST_DONE summary after the last scenario
+    failed     - the process exited before it became ready
+    finished   - the process exited after it became ready (after result)
+    output     - every other stdout line
+    """
+
+    ready = pyqtSignal()
+    partial = pyqtSignal(dict)
+    result = pyqtSignal(dict)
+    playlist_done = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal(int)
+    output = pyqtSignal(str)
+
+    def __init__(self, process: subprocess.Popen, name: str, ready_timeout: float = 20.0,
+                 result_file: Optional[str] = None, supervisor: Optional[ProcessSupervisor] = None,
+                 playlist_file: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.process = process
+        self.name = name
+        self.pid = process.pid
+        self.result_file = result_file
+        self.playlist_file = playlist_file
+        self.supervisor = supervisor
+        if supervisor is not None:
+            supervisor.register(process, name)
+        self.is_ready = False
+        self.has_result = False
+        self.result_count = 0
+        self.returncode: Optional[int] = None
+
+        self._lock = threading.Lock()
+        self._ready_event = threading.Event()
+        self._stderr_tail = deque(maxlen=40)
+        self._ready_timeout = ready_timeout
+        self._started = False
+        QTimer.singleShot(0, self._start)
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._ready_timer = threading.Timer(self._ready_timeout, self._mark_ready, args=("timeout",))
+        self._ready_timer.daemon = True
+        self._readers = [
+            threading.Thread(target=self._read_stdout, name=f"{self.name}-stdout", daemon=True),
+            threading.Thread(target=self._read_stderr, name=f"{self.name}-stderr", daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+        threading.Thread(target=self._wait, name=f"{self.name}-wait", daemon=True).start()
+        self._ready_timer.start()
+
+    def _read_stdout(self):
+        for raw in iter(self.process.stdout.readline, b""):
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            if self.supervisor is not None:
+                self.supervisor.record_output(self.pid, "stdout", line)
+            if line == READY_MARKER:
+                self._mark_ready("marker")
+                continue
+            parsed = parse_result_line(line)
+            if parsed is not None:
+                kind, payload = parsed
+                if kind == "result":
+                    self.has_result = True
+                    self.result_count += 1
+                    self.result.emit(payload)
+                elif kind == "playlist_done":
+                    self.playlist_done.emit(payload)
+                else:
+                    self.partial.emit(payload)
+            elif line:
+                print(f"📤 [{self.name}] {line}")
+                self.output.emit(line)
+        self.process.stdout.close()
+
+    def _read_stderr(self):
+        for raw in iter(self.process.stderr.readline, b""):
+            line = raw.decode('utf-8', errors='replace').rstrip()
+            if not line:
+                continue
+            if self.supervisor is not None:
+                self.supervisor.record_output(self.pid, "stderr", line)
+            self._stderr_tail.append(line)
+            # JavaFX prints harmless warnings; only echo real problems
+            lowered = line.lower()
+            if 'error' in lowered or 'exception' in lowered:
+                print(f"⚠️ [{self.name}] {line}")
+        self.process.stderr.close()
+
+    def _mark_ready(self, reason: str):
+        with self._lock:
+            if self.is_ready or self.returncode is not None:
+                return
+            self.is_ready = True
+        self._ready_timer.cancel()
+        self._ready_event.set()
+        print(f"✅ {self.name} is ready (pid {self.pid}, {reason})")
+        self.ready.emit()
+
+    def _wait(self):
+        returncode = self.process.wait()
+        for reader in self._readers:
+            reader.join(timeout=2)
+        if self.supervisor is not None:
+            self.supervisor.unregister(self.pid)
+        with self._lock:
+            self.returncode = returncode
+            was_ready = self.is_ready
+        self._ready_timer.cancel()
+        self._ready_event.set()
+
+        self._read_result_file()
+        self._discard_file(self.playlist_file)
+
+        if was_ready or self.has_result:
+            print(f"🏁 {self.name} exited with code {returncode}")
+            self.finished.emit(returncode)
+        else:
+            details = "\n".join(self._stderr_tail) or "no error output"
+            message = f"{self.name} exited with code {returncode} before it was ready:\n{details}"
+            print(f"❌ {message}")
+            self.failed.emit(message)
+
+    def _read_result_file(self):
+        """Fallback channel: pick up results the player wrote but did not print.
+
+        A single run writes one object, a playlist the list of results so far.
+        """
+        if not self.result_file or not os.path.exists(self.result_file):
+            return
+        try:
+            with open(self.result_file, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error reading result file {self.result_file}: {e}")
+            return
+        finally:
+            self._discard_file(self.result_file)
+        if isinstance(results, dict):
+            results = [results]
+        if not isinstance(results, list):
+            return
+        for result in results[self.result_count:]:
+            if isinstance(result, dict):
+                print(f"📊 Scenario result (from file): {result}")
+                self.has_result = True
+                self.result_count += 1
+                self.result.emit(result)
+
+    @staticmethod
+    def _discard_file(path: Optional[str]):
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the process is ready or has exited; True when ready"""
+        self._start()
+        self._ready_event.wait(timeout)
+        return self.is_ready
+
+    def is_running(self) -> bool:
+        return self.process.poll() is None
+
+    def terminate(self):
+        """Ask the process to exit"""
+        if self.is_running():
+            self.process.terminate()
+
+
+class PlayerService(QObject):
+    """Qt signals for the shared PlayerDaemon.
+
+    Daemon events arrive on its reader thread and are re-emitted as signals,
+    which Qt delivers queued to slots in the GUI thread.
+    """
+
+    ready = pyqtSignal()
+    playing = pyqtSignal(str)
+    partial = pyqtSignal(dict)
+    result = pyqtSignal(dict)
+    playlist_done = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    restarted = pyqtSignal(int)
+    stopped = pyqtSignal(int)
+
+    def __init__(self, daemon: PlayerDaemon, parent=None):
+        super().__init__(parent)
+        self.daemon = daemon
+        daemon.add_listener(self._on_event)
+
+    def _on_event(self, event: str, payload: Any):
+        if event == "ready":
+            self.ready.emit()
+        elif event == "playing":
+            self.playing.emit(payload)
+        elif event == "partial":
+            self.partial.emit(payload)
+        elif event == "result":
+            self.result.emit(payload)
+        elif event == "playlist_done":
+            self.playlist_done.emit(payload)
+        elif event == "error":
+            self.error.emit(payload)
+        elif event == "restart":
+            self.restarted.emit(payload)
+        elif event == "exit":
+            self.stopped.emit(payload)
+
+    def start(self) -> bool:
+        """Boot the player ahead of time so the first scenario opens warm"""
+        return self.daemon.start()
+
+    def play(self, scenario_path: str, mode: str) -> bool:
+        return self.daemon.play(scenario_path, mode)
+
+    def play_playlist(self, scenario_paths: List[str], mode: str) -> bool:
+        return self.daemon.play_playlist(scenario_paths, mode)
+
+    def is_busy(self) -> bool:
+        return self.daemon.is_busy()
+
+    def stop(self):
+        self.daemon.stop()
+
 
 class ProcessLauncher:
-    def __init__(self, java_app_path: str):
+    """Builds and starts the Java editor/player commands.
+
+    One launcher is shared per java_app folder (see instance()). The Java
+    environment (java executable, JavaFX SDK, JARs, libraries, classpaths)
+    is probed without starting any process, and the probe is persisted to
+    data/java_probe.json. It is reused as long as PATH, JAVA_HOME, the
+    JAR/library mtimes and the JavaFX folder are unchanged.
+    """
+
+    READY_TIMEOUT = 20.0
+    PROBE_VERSION = 1
+    # Kept as the last candidate for installs that still rely on it
+    LEGACY_JAVAFX_PATH = "C:\\Users\\Asus\\Desktop\\javafx\\javafx-sdk-25\\lib"
+
+    _instances: Dict[str, "ProcessLauncher"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, java_app_path: str, probe_file: Optional[str] = None):
         self.java_app_path = java_app_path
-        self.javafx_path = "C:\\Users\\Asus\\Desktop\\javafx\\javafx-sdk-25\\lib"
+        if probe_file is None:
+            probe_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "java_probe.json")
+        self.probe_file = probe_file
+        self.results_dir = os.path.join(os.path.dirname(os.path.abspath(probe_file)), "results")
+        
+        # Build paths
+        self.build_path = os.path.join(java_app_path, "build")
+        self.libs_path = os.path.join(self.build_path, "libs")
+        self.editor_jar = os.path.join(self.build_path, "scenario_editor.jar")
+        self.player_jar = os.path.join(self.build_path, "scenario_player.jar")
         
-        # Build libs path
-        self.libs_path = os.path.join(java_app_path, "build", "libs")
+        # Warm players: leased one per test session, kept warm once released
+        self._player_services: List[PlayerService] = []
+        self._player_leases: Dict[str, PlayerService] = {}
+        self._player_lock = threading.Lock()
+        self.supervisor = ProcessSupervisor.instance()
+        
+        self.probe = self.load_probe()
+        self.java_executable = self.probe["java"] or "java"
+        self.javafx_path = self.probe["javafx_path"] or self.LEGACY_JAVAFX_PATH
         
         print(f"🔧 ProcessLauncher initialized:")
         print(f"   Java app path: {java_app_path}")
@@ -21,48 +541,187 @@ class ProcessLauncher:
         
         # Verify paths exist
         self.verify_paths()
+    
+    @classmethod
+    def instance(cls, java_app_path: Optional[str] = None) -> "ProcessLauncher":
+        """Return the shared launcher for a java_app folder"""
+        if java_app_path is None:
+            java_app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "java_app")
+        key = os.path.normcase(os.path.abspath(java_app_path))
+        with cls._instances_lock:
+            launcher = cls._instances.get(key)
+            if launcher is None:
+                launcher = cls(java_app_path)
+                cls._instances[key] = launcher
+            return launcher
+    
+    @staticmethod
+    def _mtime(path: Optional[str]) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return None
+    
+    def javafx_candidates(self) -> List[str]:
+        """Folders that may hold the JavaFX SDK lib directory, most specific first"""
+        candidates = []
+        for var in ("JAVAFX_HOME", "PATH_TO_FX"):
+            value = os.environ.get(var)
+            if value:
+                candidates += [value, os.path.join(value, "lib")]
+        
+        candidates += [
+            os.path.join(self.java_app_path, "javafx", "lib"),
+            os.path.join(self.java_app_path, "lib", "javafx"),
+        ]
+        
+        # javafx-sdk-* folders in the usual install locations, newest version first
+        roots = [
+            os.path.expanduser("~"),
+            os.path.join(os.path.expanduser("~"), "Desktop", "javafx"),
+            os.path.join(os.path.expanduser("~"), "javafx"),
+            os.path.join(os.environ.get("ProgramFiles", "C:\\Program Files"), "Java"),
+            os.environ.get("ProgramFiles", "C:\\Program Files"),
+            "/opt",
+            "/usr/share/openjfx",
+            "/usr/lib/jvm",
+        ]
+        for root in roots:
+            try:
+                names = sorted((name for name in os.listdir(root) if name.lower().startswith("javafx")),
+                               reverse=True)
+            except OSError:
+                continue
+            candidates += [os.path.join(root, name, "lib") for name in names]
+        candidates.append("/usr/share/openjfx/lib")
+        
+        candidates.append(self.LEGACY_JAVAFX_PATH)
+        return candidates
+    
+    def discover_javafx(self) -> Optional[str]:
+        """Return the first candidate folder that contains JavaFX JARs"""
+        for candidate in self.javafx_candidates():
+            try:
+                if any(name.startswith("javafx") and name.endswith(".jar") for name in os.listdir(candidate)):
+                    return os.path.abspath(candidate)
+            except OSError:
+                continue
+        return None
+    
+    def find_java(self) -> Optional[str]:
+        """Locate the java executable (JAVA_HOME first, then PATH) without running it"""
+        java_home = os.environ.get("JAVA_HOME")
+        if java_home:
+            for name in ("java.exe", "java") if os.name == 'nt' else ("java",):
+                candidate = os.path.join(java_home, "bin", name)
+                if os.path.isfile(candidate):
+                    return candidate
+        return shutil.which("java")
+    
+    def probe_key(self) -> Dict[str, Any]:
+        """Everything the probe result depends on"""
+        return {
+            "version": self.PROBE_VERSION,
+            "java_app_path": os.path.abspath(self.java_app_path),
+            "PATH": os.environ.get("PATH", ""),
+            "JAVA_HOME": os.environ.get("JAVA_HOME", ""),
+            "JAVAFX_HOME": os.environ.get("JAVAFX_HOME", ""),
+            "PATH_TO_FX": os.environ.get("PATH_TO_FX", ""),
+            "editor_jar": self._mtime(self.editor_jar),
+            "player_jar": self._mtime(self.player_jar),
+            "libs": self._mtime(self.libs_path),
+        }
+    
+    def run_probe(self) -> Dict[str, Any]:
+        """Inspect the Java environment (no processes are started)"""
+        libs = []
+        if os.path.isdir(self.libs_path):
+            libs = sorted(lib for lib in os.listdir(self.libs_path) if lib.endswith('.jar'))
+        
+        javafx_path = self.discover_javafx()
+        result = {
+            "java": self.find_java(),
+            "javafx_path": javafx_path,
+            "javafx_mtime": self._mtime(javafx_path),
+            "editor_jar_size": os.path.getsize(self.editor_jar) if os.path.exists(self.editor_jar) else None,
+            "player_jar_size": os.path.getsize(self.player_jar) if os.path.exists(self.player_jar) else None,
+            "libs_exists": os.path.isdir(self.libs_path),
+            "libs": libs,
+        }
+        # Use semicolon for Windows, colon for Unix
+        separator = ';' if os.name == 'nt' else ':'
+        result["classpaths"] = {
+            jar: separator.join([jar] + [os.path.join(self.libs_path, lib) for lib in libs])
+            for jar in (self.editor_jar, self.player_jar)
+        }
+        return result
+    
+    def load_probe(self, force: bool = False) -> Dict[str, Any]:
+        """Return the persisted probe when still valid, else probe again and persist"""
+        key = self.probe_key()
+        if not force:
+            try:
+                with open(self.probe_file, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                result = cached.get("result") or {}
+                # The JavaFX folder is discovered, so validate it separately
+                # (and keep looking while none has been found)
+                if (cached.get("key") == key and result.get("javafx_path")
+                        and self._mtime(result.get("javafx_path")) == result.get("javafx_mtime")):
+                    print("⚡ Using cached Java environment probe")
+                    return result
+            except (OSError, ValueError, AttributeError):
+                pass
+        
+        result = self.run_probe()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.probe_file)), exist_ok=True)
+            temp_path = self.probe_file + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "result": result}, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.probe_file)
+        except OSError as e:
+            print(f"⚠️ Could not save Java probe cache: {e}")
+        return result
+    
+    def refresh_probe(self):
+        """Probe again, e.g. after rebuilding the JARs or installing JavaFX"""
+        self.probe = self.load_probe(force=True)
+        self.java_executable = self.probe["java"] or "java"
+        self.javafx_path = self.probe["javafx_path"] or self.LEGACY_JAVAFX_PATH
         
     def verify_paths(self):
-        """Verify all required paths exist"""
+        """Report the probed paths"""
         print("\n🔍 Verifying paths...")
+        probe = self.probe
         
         # Check Java
-        try:
-            result = subprocess.run(["java", "-version"], capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                print("✅ Java is accessible")
-            else:
-                print("❌ Java not found in PATH")
-        except Exception as e:
-            print(f"❌ Java check failed: {e}")
+        if probe["java"]:
+            print(f"✅ Java is accessible: {probe['java']}")
+        else:
+            print("❌ Java not found in JAVA_HOME or PATH")
         
         # Check JavaFX
-        if os.path.exists(self.javafx_path):
-            print(f"✅ JavaFX found: {self.javafx_path}")
+        if probe["javafx_path"]:
+            print(f"✅ JavaFX found: {probe['javafx_path']}")
         else:
-            print(f"❌ JavaFX not found: {self.javafx_path}")
+            print(f"❌ JavaFX not found (set JAVAFX_HOME or PATH_TO_FX)")
         
         # Check JAR files
-        editor_jar = os.path.join(self.java_app_path, "build", "scenario_editor.jar")
-        player_jar = os.path.join(self.java_app_path, "build", "scenario_player.jar")
-        
-        if os.path.exists(editor_jar):
-            size = os.path.getsize(editor_jar)
-            print(f"✅ Scenario Editor JAR found: {editor_jar} ({size} bytes)")
+        if probe["editor_jar_size"] is not None:
+            print(f"✅ Scenario Editor JAR found: {self.editor_jar} ({probe['editor_jar_size']} bytes)")
         else:
-            print(f"❌ Scenario Editor JAR not found: {editor_jar}")
+            print(f"❌ Scenario Editor JAR not found: {self.editor_jar}")
             
-        if os.path.exists(player_jar):
-            size = os.path.getsize(player_jar)
-            print(f"✅ Scenario Player JAR found: {player_jar} ({size} bytes)")
+        if probe["player_jar_size"] is not None:
+            print(f"✅ Scenario Player JAR found: {self.player_jar} ({probe['player_jar_size']} bytes)")
         else:
-            print(f"❌ Scenario Player JAR not found: {player_jar}")
+            print(f"❌ Scenario Player JAR not found: {self.player_jar}")
         
         # Check Jackson libraries
-        if os.path.exists(self.libs_path):
-            libs = os.listdir(self.libs_path)
-            if libs:
-                print(f"✅ Libraries found: {', '.join(libs)}")
+        if probe["libs_exists"]:
+            if probe["libs"]:
+                print(f"✅ Libraries found: {', '.join(probe['libs'])}")
             else:
                 print(f"⚠️ Libs folder exists but is empty")
         else:
@@ -70,33 +729,69 @@ class ProcessLauncher:
     
     def build_classpath(self, jar_file: str) -> str:
         """Build complete classpath including JAR and libraries"""
-        classpath_parts = [jar_file]
+        classpath = self.probe["classpaths"].get(jar_file)
+        if classpath is None:
+            libs = [os.path.join(self.libs_path, lib) for lib in self.probe["libs"]]
+            # Use semicolon for Windows, colon for Unix
+            separator = ';' if os.name == 'nt' else ':'
+            classpath = separator.join([jar_file] + libs)
+            self.probe["classpaths"][jar_file] = classpath
+        return classpath
+    
+    def _spawn(self, cmd: List[str], name: str, result_file: Optional[str] = None,
+               playlist_file: Optional[str] = None) -> Optional[LaunchHandle]:
+        """Start a JVM and return its handle without waiting for it"""
+        print(f"\n🖥️ Full command:")
+        print(f"   {' '.join(cmd)}")
+        print()
+        print("🎬 Starting Java process...")
         
-        # Add all JAR files from libs folder
-        if os.path.exists(self.libs_path):
-            for lib in os.listdir(self.libs_path):
-                if lib.endswith('.jar'):
-                    classpath_parts.append(os.path.join(self.libs_path, lib))
+        if not self.supervisor.can_spawn():
+            print(f"❌ Not starting {name}: too many child processes")
+            return None
         
-        # Use semicolon for Windows, colon for Unix
-        separator = ';' if os.name == 'nt' else ':'
-        return separator.join(classpath_parts)
+        try:
+            # Use CREATE_NO_WINDOW on Windows to prevent console window
+            if os.name == 'nt':
+                CREATE_NO_WINDOW = 0x08000000
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    creationflags=CREATE_NO_WINDOW
+                )
+            else:
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
+        except OSError as e:
+            print(f"❌ FAILED to start {name}: {e}")
+            return None
+        
+        print(f"   Process ID: {process.pid}")
+        return LaunchHandle(process, name, ready_timeout=self.READY_TIMEOUT,
+                            result_file=result_file, supervisor=self.supervisor,
+                            playlist_file=playlist_file)
     
-    def launch_scenario_editor(self, scenario_file: Optional[str] = None) -> bool:
-        """Launch JavaFX Scenario Editor with comprehensive debugging"""
+    def start_scenario_editor(self, scenario_file: Optional[str] = None) -> Optional[LaunchHandle]:
+        """Start the JavaFX Scenario Editor; returns immediately (None if it cannot start)"""
         try:
             print("\n" + "="*70)
             print("🚀 LAUNCHING SCENARIO EDITOR")
             print("="*70)
             
-            editor_jar = os.path.join(self.java_app_path, "build", "scenario_editor.jar")
+            editor_jar = self.editor_jar
             print(f"📦 JAR path: {editor_jar}")
             
             if not os.path.exists(editor_jar):
                 print(f"❌ CRITICAL: JAR file not found!")
                 print(f"   Expected location: {editor_jar}")
                 print(f"   Please run the build script first!")
-                return False
+                return None
             
             # Build classpath
             classpath = self.build_classpath(editor_jar)
@@ -104,7 +799,7 @@ class ProcessLauncher:
             
             # Build the command - CRITICAL: Use -cp instead of -jar when using classpath
             cmd = [
-                "java",
+                self.java_executable,
                 "-cp", classpath,
                 "--module-path", self.javafx_path,
                 "--add-modules", "javafx.controls,javafx.fxml,javafx.graphics",
@@ -118,163 +813,147 @@ class ProcessLauncher:
                 else:
                     print(f"⚠️ Scenario file not found: {scenario_file}")
             
-            print(f"\n🖥️ Full command:")
-            print(f"   {' '.join(cmd)}")
-            print()
-            
-            # Launch the process
-            print("🎬 Starting Java process...")
-            
-            # Use DETACHED_PROCESS on Windows to prevent console window
-            if os.name == 'nt':
-                CREATE_NO_WINDOW = 0x08000000
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    creationflags=CREATE_NO_WINDOW
-                )
-            else:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-            
-            # Give it time to start
-            time.sleep(3)
-            
-            # Check if process is still running
-            poll_result = process.poll()
-            
-            if poll_result is None:
-                print("✅ SUCCESS: Java process is running!")
-                print(f"   Process ID: {process.pid}")
-                
-                # Start a thread to capture any output
-                def monitor_output():
-                    try:
-                        stdout, stderr = process.communicate(timeout=5)
-                        if stdout:
-                            print(f"📤 Output: {stdout.decode('utf-8', errors='ignore')}")
-                        if stderr:
-                            stderr_text = stderr.decode('utf-8', errors='ignore')
-                            # Only print if it's an actual error (not JavaFX warnings)
-                            if 'error' in stderr_text.lower() or 'exception' in stderr_text.lower():
-                                print(f"⚠️ Errors: {stderr_text}")
-                    except subprocess.TimeoutExpired:
-                        pass  # Process is still running, which is good
-                
-                monitor_thread = threading.Thread(target=monitor_output, daemon=True)
-                monitor_thread.start()
-                
-                return True
-            else:
-                print(f"❌ FAILED: Process terminated immediately with code: {poll_result}")
-                
-                # Read any error output
-                stdout, stderr = process.communicate()
-                if stdout:
-                    print(f"📤 Output: {stdout.decode('utf-8', errors='ignore')}")
-                if stderr:
-                    print(f"📥 Errors: {stderr.decode('utf-8', errors='ignore')}")
-                
-                return False
+            return self._spawn(cmd, "Scenario Editor")
                 
         except Exception as e:
-            print(f"💥 EXCEPTION in launch_scenario_editor: {e}")
+            print(f"💥 EXCEPTION in start_scenario_editor: {e}")
             import traceback
             traceback.print_exc()
-            return False
+            return None
 
-    def launch_scenario_player(self, scenario_file: str, mode: str) -> bool:
-        """Launch JavaFX Scenario Player"""
+    def player_command(self) -> Optional[List[str]]:
+        """Command that starts the player, without its arguments"""
+        if os.environ.get("SQUAD_STANDIN_PLAYER") == "1":
+            standin = os.path.join(os.path.dirname(os.path.abspath(__file__)), "standin_player.py")
+            print(f"🧪 Using stand-in player: {standin}")
+            return [sys.executable, standin]
+        
+        player_jar = self.player_jar
+        print(f"📦 JAR path: {player_jar}")
+        
+        if not os.path.exists(player_jar):
+            print(f"❌ Player JAR not found!")
+            return None
+        
+        # Build classpath
+        classpath = self.build_classpath(player_jar)
+        print(f"📚 Classpath: {classpath}")
+        
+        return [
+            self.java_executable,
+            "-cp", classpath,
+            "--module-path", self.javafx_path,
+            "--add-modules", "javafx.controls,javafx.fxml,javafx.graphics",
+            "ScenarioPlayer"  # Main class name
+        ]
+    
+    def acquire_player_service(self, owner: str) -> Optional["PlayerService"]:
+        """Lease a warm player to one owner (a test session), reusing an idle
+        one when possible; None without a player"""
+        with self._player_lock:
+            service = self._player_leases.get(owner)
+            if service is not None:
+                return service
+            leased = set(map(id, self._player_leases.values()))
+            idle = [service for service in self._player_services if id(service) not in leased]
+            if idle:
+                service = idle[0]
+            else:
+                cmd = self.player_command()
+                if cmd is None:
+                    return None
+                popen_kwargs = {}
+                if os.name == 'nt':
+                    popen_kwargs["creationflags"] = 0x08000000  # CREATE_NO_WINDOW
+                daemon = PlayerDaemon(cmd + ["--daemon"], popen_kwargs=popen_kwargs, supervisor=self.supervisor)
+                service = PlayerService(daemon)
+                self._player_services.append(service)
+                atexit.register(daemon.stop)
+            self._player_leases[owner] = service
+            print(f"🎮 Player {self._player_services.index(service) + 1} leased to session {owner}")
+            return service
+    
+    def release_player_service(self, owner: str):
+        """Return a leased player; one still playing for its owner is stopped"""
+        with self._player_lock:
+            service = self._player_leases.pop(owner, None)
+        if service is not None and service.is_busy():
+            service.stop()
+    
+    def start_scenario_player(self, scenario_file: str, mode: str,
+                              result_file: Optional[str] = None) -> Optional[LaunchHandle]:
+        """Start the JavaFX Scenario Player; returns immediately (None if it cannot start)"""
         try:
             print("\n" + "="*70)
             print(f"🎮 LAUNCHING SCENARIO PLAYER (mode: {mode})")
             print("="*70)
             
-            player_jar = os.path.join(self.java_app_path, "build", "scenario_player.jar")
-            print(f"📦 JAR path: {player_jar}")
-            
-            if not os.path.exists(player_jar):
-                print(f"❌ Player JAR not found!")
-                return False
-            
             if not os.path.exists(scenario_file):
                 print(f"❌ Scenario file not found: {scenario_file}")
-                return False
+                return None
             
-            # Build classpath
-            classpath = self.build_classpath(player_jar)
-            print(f"📚 Classpath: {classpath}")
+            cmd = self.player_command()
+            if cmd is None:
+                return None
+            # Results come back on stdout; the per-launch file is the fallback
+            if result_file is None:
+                os.makedirs(self.results_dir, exist_ok=True)
+                result_file = os.path.join(self.results_dir, f"result_{uuid.uuid4().hex}.json")
+            cmd += [os.path.abspath(scenario_file), mode, "--result-file", os.path.abspath(result_file)]
             
-            # Build the command
-            cmd = [
-                "java",
-                "-cp", classpath,
-                "--module-path", self.javafx_path,
-                "--add-modules", "javafx.controls,javafx.fxml,javafx.graphics",
-                "ScenarioPlayer",  # Main class name
-                os.path.abspath(scenario_file),
-                mode
-            ]
+            return self._spawn(cmd, "Scenario Player", result_file=result_file)
                 
-            print(f"\n🖥️ Full command:")
-            print(f"   {' '.join(cmd)}")
-            print()
-            
-            # Launch the process
-            print("🎬 Starting Java process...")
-            
-            if os.name == 'nt':
-                CREATE_NO_WINDOW = 0x08000000
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    creationflags=CREATE_NO_WINDOW
-                )
-            else:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
+        except Exception as e:
+            print(f"💥 EXCEPTION in start_scenario_player: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def start_scenario_playlist(self, scenario_files: List[str], mode: str,
+                                result_file: Optional[str] = None) -> Optional[LaunchHandle]:
+        """Start one player for several scenarios, played back to back in the
+        same window; each result is emitted as it finishes (None if it cannot start)"""
+        try:
+            print("\n" + "="*70)
+            print(f"🎮 LAUNCHING SCENARIO PLAYLIST ({len(scenario_files)} scenarios, mode: {mode})")
+            print("="*70)
             
-            time.sleep(3)
+            missing = [path for path in scenario_files if not os.path.exists(path)]
+            if missing or not scenario_files:
+                print(f"❌ Scenario files not found: {missing}")
+                return None
             
-            poll_result = process.poll()
+            cmd = self.player_command()
+            if cmd is None:
+                return None
+            os.makedirs(self.results_dir, exist_ok=True)
+            token = uuid.uuid4().hex
+            playlist_file = os.path.join(self.results_dir, f"playlist_{token}.json")
+            if result_file is None:
+                result_file = os.path.join(self.results_dir, f"result_{token}.json")
+            # The player reads it at startup, so bypass the background writer
+            if not JSONHandler.write_json(playlist_file, [os.path.abspath(path) for path in scenario_files],
+                                          sync=True):
+                print(f"❌ Could not write playlist file: {playlist_file}")
+                return None
+            cmd += ["--playlist", os.path.abspath(playlist_file), mode,
+                    "--result-file", os.path.abspath(result_file)]
             
-            if poll_result is None:
-                print("✅ SUCCESS: Player process is running!")
-                print(f"   Process ID: {process.pid}")
-                return True
-            else:
-                print(f"❌ FAILED: Process terminated with code: {poll_result}")
-                stdout, stderr = process.communicate()
-                if stdout:
-                    print(f"📤 Output: {stdout.decode('utf-8', errors='ignore')}")
-                if stderr:
-                    print(f"📥 Errors: {stderr.decode('utf-8', errors='ignore')}")
-                return False
+            return self._spawn(cmd, "Scenario Player", result_file=result_file,
+                               playlist_file=playlist_file)
                 
         except Exception as e:
-            print(f"💥 EXCEPTION in launch_scenario_player: {e}")
+            print(f"💥 EXCEPTION in start_scenario_playlist: {e}")
             import traceback
             traceback.print_exc()
-            return False
-
-    def get_scenario_result(self, temp_result_path: str) -> Optional[dict]:
-        """Read temporary result file created by Java player"""
-        try:
-            if os.path.exists(temp_result_path):
-                with open(temp_result_path, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
-                os.remove(temp_result_path)
-                print(f"📊 Scenario result: {result}")
-                return result
             return None
-        except Exception as e:
-            print(f"❌ Error reading result: {e}")
-            return None
\ No newline at end of file
+
+    def launch_scenario_editor(self, scenario_file: Optional[str] = None) -> bool:
+        """Launch the editor and wait until it is ready or has failed (blocking)"""
+        handle = self.start_scenario_editor(scenario_file)
+        return handle is not None and handle.wait_ready(self.READY_TIMEOUT)
+
+    def launch_scenario_player(self, scenario_file: str, mode: str) -> bool:
+        """Launch the player and wait until it is ready or has failed (blocking)"""
+        handle = self.start_scenario_player(scenario_file, mode)
+        return handle is not None and handle.wait_ready(self.READY_TIMEOUT)
@@ -0,0 +1,196 @@
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from utils.history_store import HistoryStore
+from utils.json_handler import JSONHandler
+from utils.leaderboard import Leaderboard
+from utils.results_server import record_key
+
+
+class ProfileStore:
+    """Per-trainee running aggregates over the test history.
+
+    Each profile keeps count, sum and sum of squares of the scores, the
+    best and last score and date, and right/wrong counts per scenario file,
+    so a lookup never scans the history. Records are folded in one at a
+    time as HistoryStore appends them (and on lookup, for records other
+    processes appended). profiles.json stores the profiles with the number
+    of records folded and the key of the last one; if that record is no
+    longer where it was (history cleared or replaced) the profiles are
+    rebuilt from the log.
+
+    A Leaderboard is folded alongside for percentile ranks and the top
+    trainees; it is saved as a score histogram plus each trainee's best.
+    """
+
+    SAVE_EVERY = 20
+    _instances: Dict[str, "ProfileStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, data_dir: str):
+        self.data_dir = os.path.abspath(data_dir)
+        self.path = os.path.join(self.data_dir, "profiles.json")
+        self.history_store = HistoryStore.instance(self.data_dir)
+
+        self._lock = threading.RLock()
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._folded = 0
+        self._last_key: Optional[str] = None
+        self._unsaved = 0
+        self._leaderboard = Leaderboard()
+
+        self._load()
+        self.history_store.add_listener(self._on_history_event)
+
+    @classmethod
+    def instance(cls, data_dir: str) -> "ProfileStore":
+        """Return the shared profile store for a data folder"""
+        key = os.path.normcase(os.path.abspath(data_dir))
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(data_dir)
+                cls._instances[key] = store
+            return store
+
+    def _load(self):
+        saved = JSONHandler.read_json(self.path, use_cache=False)
+        with self._lock:
+            if (isinstance(saved, dict) and isinstance(saved.get("profiles"), dict)
+                    and isinstance(saved.get("score_counts"), list)):
+                self._profiles = saved["profiles"]
+                self._folded = saved.get("records", 0)
+                self._last_key = saved.get("last_key")
+                self._leaderboard = Leaderboard.from_profiles(
+                    saved["score_counts"],
+                    [(user_id, profile["best"], profile.get("best_at", 0))
+                     for user_id, profile in self._profiles.items() if profile.get("best") is not None])
+            self._sync()
+
+    def _consistent(self) -> bool:
+        """Whether the folded records are still the head of the history"""
+        if self._folded == 0:
+            return True
+        if self.history_store.count() < self._folded:
+            return False
+        tail = self.history_store.read_from(self._folded - 1)
+        return bool(tail) and record_key(tail[0]) == self._last_key
+
+    def _sync(self):
+        """Fold records appended since the last sync (called with the lock held)"""
+        if not self._consistent():
+            print("🔄 Trainee profiles out of date with the history; rebuilding")
+            self._reset()
+        records = self.history_store.read_from(self._folded)
+        for position, record in enumerate(records, start=self._folded):
+            self._fold(record, position)
+        if records:
+            self._folded += len(records)
+            self._last_key = record_key(records[-1])
+            self._unsaved += len(records)
+            if self._unsaved >= self.SAVE_EVERY or len(records) > 1:
+                self.save()
+
+    def _reset(self):
+        self._profiles, self._folded, self._last_key = {}, 0, None
+        self._leaderboard = Leaderboard()
+
+    def _fold(self, record: Dict[str, Any], position: int):
+        user_id = str(record.get("user_id", ""))
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            profile = self._profiles[user_id] = {
+                "user_id": user_id, "name": None, "count": 0, "sum": 0, "sum_sq": 0,
+                "best": None, "last_score": None, "last_date": None, "scenarios": {},
+            }
+        score = record.get("score")
+        if isinstance(score, (int, float)):
+            profile["count"] += 1
+            profile["sum"] += score
+            profile["sum_sq"] += score * score
+            profile["best"] = score if profile["best"] is None else max(profile["best"], score)
+            profile["last_score"] = score
+            if self._leaderboard.add_result(user_id, score):
+                # Ties on the leaderboard go to whoever got there first
+                profile["best_at"] = position
+        profile["name"] = record.get("name") or profile["name"]
+        profile["last_date"] = record.get("date") or profile["last_date"]
+        for answer in record.get("answers") or []:
+            scenario_file = answer.get("scenario_file")
+            if scenario_file:
+                counts = profile["scenarios"].setdefault(scenario_file, [0, 0])
+                counts[0 if answer.get("correct") else 1] += 1
+
+    def _on_history_event(self, event: str, record: Optional[Dict[str, Any]]):
+        with self._lock:
+            if event == "clear":
+                self._reset()
+                self.save()
+            else:
+                self._sync()
+
+    def save(self, sync: bool = False) -> bool:
+        """Write profiles.json (through JSONHandler's background writer unless sync)"""
+        with self._lock:
+            data = {
+                "records": self._folded,
+                "last_key": self._last_key,
+                "score_counts": self._leaderboard.histogram(),
+                "profiles": {user_id: dict(profile, scenarios={name: list(counts) for name, counts
+                                                               in profile["scenarios"].items()})
+                             for user_id, profile in self._profiles.items()},
+            }
+            self._unsaved = 0
+        return JSONHandler.write_json(self.path, data, sync=sync)
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """A trainee's profile with mean and standard deviation, or None"""
+        with self._lock:
+            self._sync()
+            profile = self._profiles.get(str(user_id))
+            if profile is None:
+                return None
+            return self._summary(profile)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Every trainee's profile, most attempts first"""
+        with self._lock:
+            self._sync()
+            summaries = [self._summary(profile) for profile in self._profiles.values()]
+        summaries.sort(key=lambda profile: (-profile["count"], profile["user_id"]))
+        return summaries
+
+    def trainee_percentile(self, score, user_id: Optional[str] = None) -> Optional[float]:
+        """Percent of trainees (other than user_id) whose best score is below score"""
+        with self._lock:
+            self._sync()
+            return self._leaderboard.trainee_percentile(score, str(user_id) if user_id is not None else None)
+
+    def result_percentile(self, score) -> Optional[float]:
+        """Percent of all saved results below score"""
+        with self._lock:
+            self._sync()
+            return self._leaderboard.result_percentile(score)
+
+    def leaderboard(self, k: int = 10) -> List[Dict[str, Any]]:
+        """The k trainees with the best scores, with rank, name, best and attempts"""
+        with self._lock:
+            self._sync()
+            leaders = self._leaderboard.top(k)
+            return [{"rank": rank, "user_id": user_id, "name": self._profiles[user_id]["name"],
+                     "best": self._profiles[user_id]["best"], "count": self._profiles[user_id]["count"]}
+                    for rank, (user_id, _) in enumerate(leaders, start=1)]
+
+    @staticmethod
+    def _summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+        summary = dict(profile, scenarios={name: list(counts) for name, counts in profile["scenarios"].items()})
+        count = profile["count"]
+        if count:
+            mean = profile["sum"] / count
+            summary["mean"] = round(mean, 1)
+            summary["stddev"] = round(math.sqrt(max(0.0, profile["sum_sq"] / count - mean * mean)), 1)
+        else:
+            summary["mean"] = summary["stddev"] = None
+        return summary
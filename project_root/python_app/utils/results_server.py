@@ -0,0 +1,268 @@
+"""
+Results aggregation service for a training hall
+
+Stations push the result records of finished tests (see ResultsUploader)
+and the admin dashboard queries the combined view. Plain HTTP with JSON
+bodies, served by asyncio from the standard library:
+
+    POST /results          {"station": "...", "records": [{...}, ...]}
+                           -> {"accepted": n, "duplicates": m}
+    GET  /summary          per-trainee aggregates for the whole hall
+    GET  /users/<user_id>  one trainee's aggregate and records
+    GET  /health
+
+Records are deduplicated on record_id, so a station can resend a batch
+after a timeout without double counting. Accepted records are stored in a
+HistoryStore log in the service's data folder; batches arriving together
+are written with one fsync (group commit).
+
+Usage:
+    python -m utils.results_server [--host 0.0.0.0] [--port 8765] [--data-dir PATH]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history_store import HistoryStore
+
+DEFAULT_PORT = 8765
+MAX_BODY = 8 * 1024 * 1024
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """Idempotency key: the record_id, or a hash of the record for old records"""
+    record_id = record.get("record_id")
+    if record_id:
+        return str(record_id)
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultsIndex:
+    """Per-trainee aggregates over every accepted record"""
+
+    def __init__(self):
+        self.keys = set()
+        self.by_user: Dict[str, List[Dict[str, Any]]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.stations = set()
+
+    def add(self, record: Dict[str, Any]):
+        key = record_key(record)
+        if key in self.keys:
+            return
+        self.keys.add(key)
+        user_id = str(record.get("user_id", ""))
+        self.by_user.setdefault(user_id, []).append(record)
+        station = record.get("station")
+        if station:
+            self.stations.add(station)
+
+        stats = self.users.get(user_id)
+        if stats is None:
+            stats = self.users[user_id] = {
+                "user_id": user_id, "name": record.get("name"), "tests": 0,
+                "total_score": 0, "best_score": None, "last_date": None,
+                "right": 0, "wrong": 0, "stations": [],
+            }
+        score = record.get("score") or 0
+        stats["tests"] += 1
+        stats["total_score"] += score
+        stats["best_score"] = score if stats["best_score"] is None else max(stats["best_score"], score)
+        stats["right"] += record.get("right") or 0
+        stats["wrong"] += record.get("wrong") or 0
+        date = record.get("date")
+        if date and (stats["last_date"] is None or date >= stats["last_date"]):
+            stats["last_date"] = date
+            stats["name"] = record.get("name") or stats["name"]
+        if station and station not in stats["stations"]:
+            stats["stations"].append(station)
+
+    def user_summary(self, user_id: str) -> Optional[Dict[str, Any]]:
+        stats = self.users.get(user_id)
+        if stats is None:
+            return None
+        summary = dict(stats)
+        summary["average_score"] = round(stats["total_score"] / stats["tests"], 1)
+        del summary["total_score"]
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        users = [self.user_summary(user_id) for user_id in self.users]
+        users.sort(key=lambda user: (-user["average_score"], user["user_id"]))
+        return {"records": len(self.keys), "stations": len(self.stations), "users": users}
+
+
+class ResultsServer:
+    """asyncio HTTP service that aggregates result records from many stations"""
+
+    def __init__(self, data_dir: str, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.store = HistoryStore.instance(data_dir)
+        self.index = ResultsIndex()
+        for record in self.store.read_all():
+            self.index.add(record)
+        self._pending: List[Tuple[List[Dict[str, Any]], asyncio.Future]] = []
+        # Keys of records being written, so a concurrent resend is not stored twice
+        self._inflight = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._server = None
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        asyncio.get_running_loop().create_task(self._writer())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        sockets = self._server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        print(f"📡 Results server listening on {self.host}:{self.port} "
+              f"({len(self.index.keys)} records, {len(self.index.users)} trainees)")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _writer(self):
+        """Group commit: write every batch queued since the last fsync at once"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            pending, self._pending = self._pending, []
+            if not pending:
+                continue
+            records = [record for batch, _ in pending for record in batch]
+            try:
+                ok = await loop.run_in_executor(None, self.store.extend, records)
+            except Exception as e:
+                # Fail these requests (503) but keep the writer alive for the next ones
+                print(f"❌ Failed to store {len(records)} result(s): {e}")
+                error = OSError(f"could not store results: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for _, future in pending:
+                if not future.done():
+                    future.set_result(ok)
+
+    async def _store(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        fresh, keys, duplicates = [], [], 0
+        for record in records:
+            key = record_key(record)
+            if key in self.index.keys or key in self._inflight:
+                duplicates += 1
+                continue
+            self._inflight.add(key)
+            keys.append(key)
+            fresh.append(record)
+
+        if fresh:
+            future = asyncio.get_running_loop().create_future()
+            self._pending.append((fresh, future))
+            self._wakeup.set()
+            try:
+                if not await future:
+                    raise OSError("could not store results")
+                # Indexed only once durable
+                for record in fresh:
+                    self.index.add(record)
+            finally:
+                self._inflight.difference_update(keys)
+        return {"accepted": len(fresh), "duplicates": duplicates}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, body = await self._respond(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            status, body = 400, {"error": str(e)}
+        except OSError as e:
+            status, body = 503, {"error": str(e)}
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  503: "Service Unavailable"}.get(status, "Error")
+        try:
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode('ascii') + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise ValueError("malformed request line")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            return 413, {"error": "batch too large"}
+        body = await reader.readexactly(length) if length else b""
+
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if method == "GET" and path == "/health":
+            return 200, {"ok": True, "records": len(self.index.keys)}
+        if method == "GET" and path == "/summary":
+            return 200, self.index.summary()
+        if method == "GET" and path.startswith("/users/"):
+            user_id = unquote(path[len("/users/"):])
+            summary = self.index.user_summary(user_id)
+            if summary is None:
+                return 404, {"error": f"unknown user {user_id}"}
+            return 200, {"user": summary, "records": self.index.by_user.get(user_id, [])}
+        if method == "POST" and path == "/results":
+            batch = json.loads(body.decode('utf-8'))
+            records = batch.get("records") if isinstance(batch, dict) else None
+            if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+                raise ValueError("expected {\"records\": [...]}")
+            station = batch.get("station")
+            if station:
+                for record in records:
+                    record.setdefault("station", station)
+            return 200, await self._store(records)
+        return 404, {"error": f"no route for {method} {path}"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 to accept stations on the LAN")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "hall"))
+    args = parser.parse_args(argv)
+
+    server = ResultsServer(args.data_dir, args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("🛑 Results server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import json
+import os
+import random
+import socket
+import threading
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from utils.file_lock import FileLock
+from utils.results_server import record_key
+
+
+def query_server(server_url: str, path: str, timeout: float = 5.0) -> Optional[Any]:
+    """GET a JSON document from the results server; None when it cannot be reached"""
+    url = server_url.rstrip("/") + path
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Results server query failed ({url}): {e}")
+        return None
+
+
+class ResultsUploader:
+    """Pushes finished test records to the hall's results server.
+
+    While a server is configured, records are first appended to an offline
+    queue (upload_queue.jsonl) and sent in batches of up to BATCH_SIZE by a
+    background thread. A flush reads the queue once (then only what was
+    appended meanwhile) and rewrites it once at the end, without the
+    batches the server acknowledged. Failures are retried with exponential
+    backoff plus jitter, so a hall full of stations coming back online
+    does not retry in lockstep. The server deduplicates on record_id, so
+    resending after a lost reply is safe.
+    """
+
+    BATCH_SIZE = 100
+    MIN_BACKOFF = 1.0
+    MAX_BACKOFF = 120.0
+    TIMEOUT = 10.0
+
+    _instances: Dict[str, "ResultsUploader"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, data_dir: str):
+        self.data_dir = os.path.abspath(data_dir)
+        self.queue_path = os.path.join(self.data_dir, "upload_queue.jsonl")
+        self.server_url = ""
+        self.station_id = socket.gethostname()
+
+        self._file_lock = FileLock(self.queue_path + ".lock")
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def instance(cls, data_dir: str) -> "ResultsUploader":
+        """Return the shared uploader for a data folder"""
+        key = os.path.normcase(os.path.abspath(data_dir))
+        with cls._instances_lock:
+            uploader = cls._instances.get(key)
+            if uploader is None:
+                uploader = cls(data_dir)
+                cls._instances[key] = uploader
+            return uploader
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.server_url)
+
+    def configure(self, server_url: Optional[str], station_id: Optional[str] = None):
+        """Set the server (empty disables uploading) and this station's name"""
+        self.server_url = (server_url or "").strip()
+        if station_id:
+            self.station_id = station_id
+        if self.enabled:
+            self._ensure_thread()
+            self._wakeup.set()
+
+    def on_history_event(self, event: str, record: Optional[Dict[str, Any]]):
+        """HistoryStore listener: queue newly saved test records while uploading is on"""
+        if event == "append" and record is not None and self.enabled:
+            self.enqueue(record)
+
+    def enqueue(self, record: Dict[str, Any]) -> bool:
+        """Add a record to the offline queue"""
+        record = dict(record)
+        record.setdefault("station", self.station_id)
+        record.setdefault("record_id", record_key(record))
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        try:
+            with self._file_lock:
+                with open(self.queue_path, 'ab') as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            print(f"❌ Could not queue result for upload: {e}")
+            return False
+        self._wakeup.set()
+        return True
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Records waiting in the offline queue"""
+        return self._read_queue(0)[0]
+
+    def _read_queue(self, offset: int):
+        """Parse the complete lines of the queue from a byte offset; (records, end offset, file id)"""
+        records = []
+        try:
+            with open(self.queue_path, 'rb') as f:
+                file_id = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    try:
+                        records.append(json.loads(line.decode('utf-8')))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        continue
+        except FileNotFoundError:
+            return records, 0, None
+        return records, offset, file_id
+
+    def flush(self) -> bool:
+        """Send queued records now, batch by batch; True once the queue is empty"""
+        if not self.enabled:
+            return False
+        sent = set()
+        offset, file_id = 0, None
+        try:
+            while True:
+                records, end, current_id = self._read_queue(offset)
+                if file_id is not None and (current_id != file_id or end < offset):
+                    # Rewritten by another instance's uploader: read it again from the start
+                    records, end, current_id = self._read_queue(0)
+                offset, file_id = end, current_id
+                records = [record for record in records if record.get("record_id") not in sent]
+                if not records:
+                    return True
+                for start in range(0, len(records), self.BATCH_SIZE):
+                    batch = records[start:start + self.BATCH_SIZE]
+                    if not self._send(batch):
+                        return False
+                    sent.update(record["record_id"] for record in batch if "record_id" in record)
+        finally:
+            if sent:
+                self._drop(sent)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> bool:
+        body = json.dumps({"station": self.station_id, "records": batch}, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(
+            self.server_url.rstrip("/") + "/results", data=body, method="POST",
+            headers={"Content-Type": "application/json; charset=utf-8"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.TIMEOUT) as response:
+                reply = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            if e.code == 400:
+                # The server will never accept this batch; do not block the queue on it
+                print(f"❌ Results server rejected {len(batch)} record(s): {e}")
+                return True
+            print(f"⚠️ Results upload failed: {e}")
+            return False
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Results upload failed: {e}")
+            return False
+        print(f"📤 Uploaded {reply.get('accepted', 0)} result(s) "
+              f"({reply.get('duplicates', 0)} already on the server)")
+        return True
+
+    def _drop(self, record_ids):
+        """Remove acknowledged records from the queue file"""
+        with self._file_lock:
+            remaining = [record for record in self.pending() if record.get("record_id") not in record_ids]
+            temp_path = self.queue_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+                for record in remaining:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.queue_path)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="results-uploader", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        backoff = self.MIN_BACKOFF
+        while not self._stopping:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while self.enabled and not self._stopping and not self.flush():
+                delay = random.uniform(backoff / 2, backoff)
+                print(f"⏳ Retrying results upload in {delay:.1f}s")
+                if self._wakeup.wait(delay):
+                    self._wakeup.clear()
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+            backoff = self.MIN_BACKOFF
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.packed_scenario import PackedScenario, load_scenario_view, packed_path_for
+from utils.scenario_prefetcher import validate_scenario
+
+
+class ScenarioCatalog:
+    """Persistent index of the scenarios folder.
+
+    Each row is keyed by file name and validated against the file's mtime,
+    size and content hash, so a refresh only reparses files that changed.
+    Every indexed scenario also gets a packed copy (see packed_scenario.py)
+    which is what listing, grading and analytics read. The problems
+    validate_scenario() finds are stored with it: such scenarios are still
+    listed (and can be practised) but are left out of tests, the same way
+    the prefetch check would drop them.
+    """
+
+    SCHEMA_VERSION = 3
+    _instances: Dict[str, "ScenarioCatalog"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, scenarios_dir: str, index_path: Optional[str] = None):
+        self.scenarios_dir = os.path.abspath(scenarios_dir)
+        if index_path is None:
+            index_path = os.path.join(os.path.dirname(self.scenarios_dir), "scenario_catalog.db")
+        self.index_path = index_path
+        self.packed_dir = os.path.join(os.path.dirname(os.path.abspath(self.index_path)), "packed_scenarios")
+        self._lock = threading.RLock()
+
+        os.makedirs(self.scenarios_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._init_schema()
+
+    @classmethod
+    def instance(cls, scenarios_dir: str) -> "ScenarioCatalog":
+        """Return the shared catalog for a scenarios folder"""
+        key = os.path.normcase(os.path.abspath(scenarios_dir))
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls(scenarios_dir)
+                cls._instances[key] = catalog
+            return catalog
+
+    def _init_schema(self):
+        """Create the index tables, rebuilding them on a schema change"""
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS scenarios")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS scenarios (
+                    file_name    TEXT PRIMARY KEY,
+                    mtime_ns     INTEGER NOT NULL,
+                    size         INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    valid        INTEGER NOT NULL,
+                    title        TEXT,
+                    team_count   INTEGER NOT NULL DEFAULT 0,
+                    squad_count  INTEGER NOT NULL DEFAULT 0,
+                    background   TEXT,
+                    problems     TEXT NOT NULL DEFAULT '[]'
+                )
+            """)
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def refresh(self, file_names: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """Bring the index up to date with the scenarios folder.
+
+        When file_names is given only those files are checked. Returns the
+        file names that were added, changed and removed.
+        """
+        diff = {"added": [], "changed": [], "removed": []}
+        with self._lock:
+            known = {
+                row[0]: (row[1], row[2], row[3])
+                for row in self._conn.execute(
+                    "SELECT file_name, mtime_ns, size, content_hash FROM scenarios")
+            }
+
+            if file_names is None:
+                on_disk = self._scan_directory()
+                candidates = set(on_disk) | set(known)
+            else:
+                candidates = {name for name in file_names if name.endswith('.json')}
+                on_disk = {}
+                for name in candidates:
+                    try:
+                        st = os.stat(os.path.join(self.scenarios_dir, name))
+                        on_disk[name] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        pass
+
+            for name in sorted(candidates):
+                stat = on_disk.get(name)
+                if stat is None:
+                    if name in known:
+                        self._conn.execute("DELETE FROM scenarios WHERE file_name = ?", (name,))
+                        self._remove_packed(name)
+                        diff["removed"].append(name)
+                    continue
+
+                previous = known.get(name)
+                if previous and previous[0] == stat[0] and previous[1] == stat[1]:
+                    continue
+
+                status = self._index_file(name, stat, previous[2] if previous else None)
+                if status == "new":
+                    diff["added" if previous is None else "changed"].append(name)
+
+            self._conn.commit()
+
+        if any(diff.values()):
+            print(f"📚 Scenario catalog: +{len(diff['added'])} ~{len(diff['changed'])} -{len(diff['removed'])}")
+        return diff
+
+    def _scan_directory(self) -> Dict[str, tuple]:
+        """Stat every scenario file in the folder"""
+        entries = {}
+        try:
+            with os.scandir(self.scenarios_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        st = entry.stat()
+                        entries[entry.name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            os.makedirs(self.scenarios_dir, exist_ok=True)
+        return entries
+
+    def _index_file(self, name: str, stat: tuple, previous_hash: Optional[str]) -> str:
+        """Hash and, if the content changed, parse one scenario file"""
+        path = os.path.join(self.scenarios_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                # Stat the file that is read (it may have been replaced since the
+                # scan), before reading, so a later write always changes the key
+                st = os.fstat(f.fileno())
+                content = f.read()
+            stat = (st.st_mtime_ns, st.st_size)
+        except OSError as e:
+            print(f"❌ Catalog could not read {path}: {e}")
+            return "skipped"
+
+        content_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if content_hash == previous_hash:
+            # Touched but not modified: only refresh the stat key
+            self._conn.execute(
+                "UPDATE scenarios SET mtime_ns = ?, size = ? WHERE file_name = ?",
+                (stat[0], stat[1], name))
+            return "touched"
+
+        summary = self._summarize(path, stat, content)
+        if summary is None:
+            print(f"⚠️ Catalog skipped invalid scenario: {name}")
+        summary = summary or {}
+        self._conn.execute("""
+            INSERT OR REPLACE INTO scenarios
+                (file_name, mtime_ns, size, content_hash, valid, title,
+                 team_count, squad_count, background, problems)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            name, stat[0], stat[1], content_hash,
+            1 if summary else 0,
+            summary.get("title"),
+            summary.get("team_count", 0),
+            summary.get("squad_count", 0),
+            summary.get("background"),
+            json.dumps(summary.get("problems", []), ensure_ascii=False),
+        ))
+        return "new"
+
+    def _summarize(self, path: str, stat: tuple, content: bytes) -> Optional[Dict[str, Any]]:
+        """Pack a scenario document and extract the listing fields from it"""
+        try:
+            data = json.loads(content.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        view = load_scenario_view(path, self.packed_dir, document=data, source_stat=stat)
+        if view is None:
+            return None
+        return {
+            "title": view.title,
+            "team_count": view.team_count,
+            "squad_count": view.squad_count,
+            "background": view.background,
+            "problems": validate_scenario(data),
+        }
+
+    def _remove_packed(self, name: str):
+        try:
+            os.remove(packed_path_for(name, self.packed_dir))
+        except OSError:
+            pass
+
+    def load_view(self, file_name: str) -> Optional[PackedScenario]:
+        """Return the array-backed view of a scenario (repacked if stale)"""
+        return load_scenario_view(os.path.join(self.scenarios_dir, file_name), self.packed_dir)
+
+    def list_scenarios(self, include_invalid: bool = False) -> List[Dict[str, Any]]:
+        """Return the indexed scenarios ordered by file name"""
+        query = ("SELECT file_name, title, team_count, squad_count, background, valid, problems "
+                 "FROM scenarios")
+        if not include_invalid:
+            query += " WHERE valid = 1"
+        query += " ORDER BY file_name"
+        with self._lock:
+            rows = self._conn.execute(query).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """Return the index entry for one scenario file"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_name, title, team_count, squad_count, background, valid, problems "
+                "FROM scenarios WHERE file_name = ?", (file_name,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def file_names(self, testable_only: bool = False) -> List[str]:
+        """Return the file names of all valid scenarios (without problems, if testable_only)"""
+        query = "SELECT file_name FROM scenarios WHERE valid = 1"
+        if testable_only:
+            query += " AND problems = '[]'"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY file_name").fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        return {
+            "file_name": row[0],
+            "title": row[1],
+            "team_count": row[2],
+            "squad_count": row[3],
+            "background": row[4],
+            "valid": bool(row[5]),
+            "problems": json.loads(row[6]) if row[6] else [],
+        }
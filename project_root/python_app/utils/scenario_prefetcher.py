@@ -0,0 +1,239 @@
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+READ_CHUNK = 1024 * 1024
+
+
+def validate_scenario(document: Any) -> List[str]:
+    """Return the problems that would make the Java player fail to load a scenario.
+
+    Mirrors utils/JSONHandler.java: title and background are required, every
+    team needs color and right_move, and move points need x and y. On top of
+    what the loader checks, exactly one team must be the right move, since a
+    test answer could not be graded otherwise.
+    """
+    if not isinstance(document, dict):
+        return ["scenario is not a JSON object"]
+    errors = []
+    for key in ("title", "background"):
+        if document.get(key) is None:
+            errors.append(f"missing '{key}'")
+    teams = document.get("teams")
+    if not isinstance(teams, list) or not teams:
+        errors.append("no teams")
+        return errors
+
+    right_teams = 0
+    for team_index, team in enumerate(teams, 1):
+        if not isinstance(team, dict):
+            errors.append(f"team {team_index} is not an object")
+            continue
+        for key in ("color", "right_move"):
+            if team.get(key) is None:
+                errors.append(f"team {team_index}: missing '{key}'")
+        if team.get("right_move") == 1:
+            right_teams += 1
+        squads = team.get("squads")
+        if squads is None:
+            continue
+        if not isinstance(squads, list):
+            errors.append(f"team {team_index}: 'squads' is not a list")
+            continue
+        for squad_index, squad in enumerate(squads, 1):
+            if not isinstance(squad, dict):
+                errors.append(f"team {team_index} squad {squad_index} is not an object")
+                continue
+            move = 1
+            while f"move_{move}" in squad:
+                point = squad[f"move_{move}"]
+                if not isinstance(point, dict) or not all(
+                        isinstance(point.get(axis), (int, float)) for axis in ("x", "y")):
+                    errors.append(f"team {team_index} squad {squad_index}: bad move_{move}")
+                move += 1
+    if right_teams != 1:
+        errors.append(f"{right_teams} teams marked as the right move (expected 1)")
+    return errors
+
+
+def referenced_images(document: Dict[str, Any]) -> List[str]:
+    """Image names a scenario refers to: its background and squad marker icons"""
+    names = []
+    background = document.get("background")
+    if isinstance(background, str) and background:
+        names.append(background)
+    for team in document.get("teams") or []:
+        if not isinstance(team, dict):
+            continue
+        for squad in team.get("squads") or []:
+            icon = squad.get("marker_icon") if isinstance(squad, dict) else None
+            if isinstance(icon, str) and icon and icon not in names:
+                names.append(icon)
+    return names
+
+
+def warm_file(path: str) -> int:
+    """Pull a file into the OS page cache; returns the bytes read"""
+    total = 0
+    with open(path, 'rb') as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            total += len(chunk)
+    return total
+
+
+class ScenarioPrefetcher:
+    """Checks upcoming scenarios on a background thread before they are played.
+
+    prefetch() queues scenario files; the worker reads and parses each one,
+    validates it the way the Java player loads it, resolves its background
+    and marker images against the asset folders and reads them once so
+    they sit in the page cache when the player opens them. report() returns
+    the outcome, computing it on the spot for files that were not queued or
+    changed on disk since; cached_report() never blocks. Reports are plain dicts:
+
+        path, ok, errors, warnings (missing images), images (resolved paths),
+        title, bytes (read while warming)
+    """
+
+    _instances: Dict[str, "ScenarioPrefetcher"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, asset_dirs: Iterable[str]):
+        self.asset_dirs = [os.path.abspath(directory) for directory in asset_dirs]
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size) or None when missing, report)
+        self._reports: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[str, Any]]] = {}
+        self._pending = set()
+        self._done = threading.Condition(self._lock)
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    @classmethod
+    def instance(cls, assets_dir: str) -> "ScenarioPrefetcher":
+        """Return the shared prefetcher for an assets folder"""
+        key = os.path.normcase(os.path.abspath(assets_dir))
+        with cls._instances_lock:
+            prefetcher = cls._instances.get(key)
+            if prefetcher is None:
+                prefetcher = cls([os.path.join(assets_dir, "backgrounds"),
+                                  os.path.join(assets_dir, "squad_markers"),
+                                  assets_dir])
+                cls._instances[key] = prefetcher
+            return prefetcher
+
+    def prefetch(self, scenario_paths: Iterable[str]):
+        """Queue scenarios for background checking (already checked ones are skipped)"""
+        with self._lock:
+            for path in scenario_paths:
+                path = os.path.abspath(path)
+                if path in self._pending or self._cached(path) is not None:
+                    continue
+                self._pending.add(path)
+                self._queue.put(path)
+            if self._pending and (self._worker is None or not self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="scenario-prefetch", daemon=True)
+                self._worker.start()
+
+    def report(self, scenario_path: str, timeout: float = 5.0) -> Dict[str, Any]:
+        """Return the check result for a scenario, waiting for a queued check
+        up to timeout seconds before doing it on the calling thread"""
+        path = os.path.abspath(scenario_path)
+        with self._lock:
+            self._done.wait_for(lambda: path not in self._pending, timeout)
+            cached = self._cached(path)
+        if cached is not None:
+            return cached
+        return self._check(path)
+
+    def cached_report(self, scenario_path: str) -> Optional[Dict[str, Any]]:
+        """Return the check result if it is ready, without waiting or checking (else None)"""
+        with self._lock:
+            return self._cached(os.path.abspath(scenario_path))
+
+    def _cached(self, path: str) -> Optional[Dict[str, Any]]:
+        entry = self._reports.get(path)
+        if entry is None:
+            return None
+        return entry[1] if entry[0] == self._stat(path) else None
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _run(self):
+        while True:
+            try:
+                path = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+            try:
+                self._check(path)
+            finally:
+                with self._lock:
+                    self._pending.discard(path)
+                    self._done.notify_all()
+
+    def _check(self, path: str) -> Dict[str, Any]:
+        report = {"path": path, "ok": False, "errors": [], "warnings": [],
+                  "images": [], "title": None, "bytes": 0}
+        stat = self._stat(path)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            document = json.loads(content.decode('utf-8'))
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            report["errors"].append(str(e))
+            document = None
+        else:
+            report["bytes"] = len(content)
+            report["errors"] = validate_scenario(document)
+            report["ok"] = not report["errors"]
+        if isinstance(document, dict):
+            report["title"] = document.get("title")
+            for name in referenced_images(document):
+                image = self.resolve_image(name, os.path.dirname(path))
+                if image is None:
+                    report["warnings"].append(f"image not found: {name}")
+                    continue
+                try:
+                    report["bytes"] += warm_file(image)
+                    report["images"].append(image)
+                except OSError as e:
+                    report["warnings"].append(f"image not readable: {name} ({e})")
+
+        if report["errors"]:
+            print(f"⚠️ Prefetch: {os.path.basename(path)} cannot be played: {'; '.join(report['errors'])}")
+        for warning in report["warnings"]:
+            print(f"⚠️ Prefetch: {os.path.basename(path)}: {warning}")
+
+        with self._lock:
+            self._reports[path] = (stat, report)
+        return report
+
+    def resolve_image(self, name: str, scenario_dir: str) -> Optional[str]:
+        """Find an image referenced by a scenario (absolute, next to it, or in the asset folders)"""
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            return None
+        if os.path.isabs(name):
+            return name if os.path.isfile(name) else None
+        for directory in [scenario_dir] + self.asset_dirs:
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
@@ -0,0 +1,130 @@
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SessionRegistry:
+    """Test sessions running side by side on this station.
+
+    Every TestWindow opens a session; the session id keys everything that
+    used to be shared: the player the window drives, its fallback result
+    files (data/results/<session id>/) and its progress. Listeners receive
+    (event, session) for 'open', 'update' and 'close' events; sessions are
+    plain dicts:
+
+        id, user_id, name, state ('running' | 'finished' | 'abandoned'),
+        started, index (scenarios done), total, correct
+    """
+
+    _instances: Dict[str, "SessionRegistry"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, data_dir: str):
+        self.data_dir = os.path.abspath(data_dir)
+        self.results_dir = os.path.join(self.data_dir, "results")
+        self._lock = threading.RLock()
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    @classmethod
+    def instance(cls, data_dir: str) -> "SessionRegistry":
+        """Return the shared registry for a data folder"""
+        key = os.path.normcase(os.path.abspath(data_dir))
+        with cls._instances_lock:
+            registry = cls._instances.get(key)
+            if registry is None:
+                registry = cls(data_dir)
+                cls._instances[key] = registry
+            return registry
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """Register callback(event, session)"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """Unregister a callback added with add_listener"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event: str, session: Dict[str, Any]):
+        for callback in list(self._listeners):
+            try:
+                callback(event, dict(session))
+            except Exception as e:
+                print(f"❌ Session listener failed on {event}: {e}")
+
+    def open(self, user_id: str, name: str, total: int = 0) -> Optional[Dict[str, Any]]:
+        """Start a session; None if this trainee already has one running"""
+        with self._lock:
+            if self.active_for(user_id) is not None:
+                print(f"⚠️ Trainee {user_id} already has a test running")
+                return None
+            session = {
+                "id": uuid.uuid4().hex[:12],
+                "user_id": user_id,
+                "name": name,
+                "state": "running",
+                "started": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "index": 0,
+                "total": total,
+                "correct": 0,
+            }
+            self._sessions[session["id"]] = session
+        print(f"🧑‍✈️ Test session {session['id']} opened for {name} ({user_id})")
+        self._notify("open", session)
+        return dict(session)
+
+    def update(self, session_id: str, **fields) -> bool:
+        """Change progress fields of a running session"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            session.update(fields)
+            snapshot = dict(session)
+        self._notify("update", snapshot)
+        return True
+
+    def close(self, session_id: str, state: str = "finished"):
+        """End a session and remove its result folder"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        session["state"] = state
+        shutil.rmtree(self.session_results_dir(session_id), ignore_errors=True)
+        print(f"🏁 Test session {session_id} {state}")
+        self._notify("close", session)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            return dict(session) if session else None
+
+    def active_for(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the running session of a trainee, if any"""
+        with self._lock:
+            for session in self._sessions.values():
+                if session["user_id"] == user_id:
+                    return dict(session)
+        return None
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """Return the running sessions in start order"""
+        with self._lock:
+            return [dict(session) for session in self._sessions.values()]
+
+    def session_results_dir(self, session_id: str) -> str:
+        return os.path.join(self.results_dir, session_id)
+
+    def result_file(self, session_id: str) -> str:
+        """A fresh fallback result path private to one session"""
+        directory = self.session_results_dir(session_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"result_{uuid.uuid4().hex}.json")
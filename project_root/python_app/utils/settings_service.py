@@ -0,0 +1,128 @@
+import hmac
+import os
+from typing import Any, Dict, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from utils.file_watcher import DirectoryWatcher
+from utils.json_handler import JSONHandler
+
+
+class SettingsService(QObject):
+    """Application-wide view of config.json.
+
+    The file is read once; getters serve the cached values. update() merges
+    changes, persists them atomically through JSONHandler.write_json and
+    emits setting_changed(key, value) for every key whose value changed,
+    followed by one settings_changed(changes). Hand edits of config.json
+    are picked up through the folder watcher and announced the same way.
+    """
+
+    setting_changed = pyqtSignal(str, object)
+    settings_changed = pyqtSignal(dict)
+
+    # results_server: URL of the hall's results service (empty = this station only);
+    # station_id: name reported with uploaded results (empty = host name)
+    DEFAULTS = {"admin_password": "1234", "language": "ar", "theme": "dark",
+                "results_server": "", "station_id": ""}
+
+    _instance: Optional["SettingsService"] = None
+
+    def __init__(self, config_file: str, parent=None):
+        super().__init__(parent)
+        self.config_file = os.path.abspath(config_file)
+        self._values: Dict[str, Any] = dict(self.DEFAULTS)
+        self._values.update(self._read())
+
+        self._watcher = DirectoryWatcher.instance()
+        self._watcher.watch(os.path.dirname(self.config_file), names=(os.path.basename(self.config_file),))
+        self._watcher.files_changed.connect(self._on_files_changed)
+
+    @classmethod
+    def instance(cls, config_file: Optional[str] = None) -> "SettingsService":
+        """Return the shared settings service (config_file is needed the first time)"""
+        if cls._instance is None:
+            if config_file is None:
+                config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           "..", "data", "config.json")
+            cls._instance = cls(config_file)
+        return cls._instance
+
+    def _read(self) -> Dict[str, Any]:
+        config = JSONHandler.read_json(self.config_file)
+        if not isinstance(config, dict):
+            print(f"⚠️ Using default settings, could not read {self.config_file}")
+            return {}
+        return config
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a cached setting"""
+        return self._values.get(key, default)
+
+    def all(self) -> Dict[str, Any]:
+        """Return a copy of every setting"""
+        return dict(self._values)
+
+    @property
+    def admin_password(self) -> str:
+        return str(self._values.get("admin_password", self.DEFAULTS["admin_password"]))
+
+    @property
+    def language(self) -> str:
+        return str(self._values.get("language", self.DEFAULTS["language"]))
+
+    @property
+    def theme(self) -> str:
+        return str(self._values.get("theme", self.DEFAULTS["theme"]))
+
+    @property
+    def results_server(self) -> str:
+        return str(self._values.get("results_server") or "")
+
+    @property
+    def station_id(self) -> str:
+        return str(self._values.get("station_id") or "")
+
+    def check_password(self, password: str) -> bool:
+        """Compare a password with the admin password in constant time"""
+        return hmac.compare_digest(password.encode('utf-8'), self.admin_password.encode('utf-8'))
+
+    def set(self, key: str, value: Any) -> bool:
+        """Change one setting"""
+        return self.update({key: value})
+
+    def update(self, updates: Dict[str, Any]) -> bool:
+        """Merge settings, persist them and notify listeners"""
+        changes = {key: value for key, value in updates.items() if self._values.get(key) != value}
+        if not changes:
+            return True
+
+        values = dict(self._values)
+        values.update(changes)
+        if not JSONHandler.write_json(self.config_file, values):
+            print(f"❌ Failed to save settings to {self.config_file}")
+            return False
+
+        self._values = values
+        self._emit(changes)
+        return True
+
+    def reload(self):
+        """Re-read config.json and announce what changed on disk"""
+        values = dict(self.DEFAULTS)
+        values.update(self._read())
+        changes = {key: value for key, value in values.items() if self._values.get(key) != value}
+        self._values = values
+        if changes:
+            self._emit(changes)
+
+    def _emit(self, changes: Dict[str, Any]):
+        for key, value in changes.items():
+            self.setting_changed.emit(key, value)
+        self.settings_changed.emit(dict(changes))
+
+    def _on_files_changed(self, directory, added, changed, removed):
+        if directory != DirectoryWatcher.normalize(os.path.dirname(self.config_file)):
+            return
+        if os.path.basename(self.config_file) in added + changed:
+            self.reload()
@@ -0,0 +1,183 @@
+"""
+Stand-in for the Java ScenarioPlayer
+
+Speaks the same stdin/stdout protocol as `ScenarioPlayer --daemon` (see
+utils/player_daemon.py) without JavaFX, so the daemon and the test flow
+can run headless. It loads the scenario, "selects" a team and answers
+with a RESULT line. As in the Java player, the correct team is the one
+with right_move == 1.
+
+Usage:
+    python -m utils.standin_player --daemon [--delay S] [--answer right|wrong|random] [--crash-after N]
+    python -m utils.standin_player <scenario.json> <mode> [--answer ...] [--result-file PATH]
+    python -m utils.standin_player --playlist PLAYLIST.json <mode> [--result-file PATH]
+
+Setting SQUAD_STANDIN_PLAYER=1 makes ProcessLauncher use it instead of Java.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+READY_MARKER = "SQUAD_READY"
+
+
+def emit(line: str):
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def play(path: str, mode: str, answer: str, delay: float) -> dict:
+    """Load a scenario and pick a team the way a trainee would"""
+    with open(path, 'r', encoding='utf-8') as f:
+        scenario = json.load(f)
+    teams = scenario.get("teams") or []
+    if not teams:
+        raise ValueError("scenario has no teams")
+
+    emit(f"PLAYING {path}")
+    if delay > 0:
+        time.sleep(delay)
+
+    right = [team for team in teams if team.get("right_move") == 1]
+    wrong = [team for team in teams if team.get("right_move") != 1]
+    if answer == "right" and right:
+        selected = right[0]
+    elif answer == "wrong" and wrong:
+        selected = wrong[0]
+    else:
+        selected = random.choice(teams)
+
+    emit("PARTIAL " + json.dumps({
+        "scenario": path,
+        "team_index": teams.index(selected),
+        "team": selected.get("color"),
+        "correct": selected.get("right_move") == 1,
+    }, ensure_ascii=False))
+
+    return {
+        "scenario": path,
+        "scenario_file": os.path.basename(path),
+        "mode": mode,
+        "selected_team": selected.get("color"),
+        "correct": selected.get("right_move") == 1,
+        "completed": True,
+        "standin": True,
+    }
+
+
+def play_all(paths, mode: str, args, result_file: str = None) -> int:
+    """Play scenarios back to back; returns how many were played"""
+    results = []
+    for index, path in enumerate(paths):
+        try:
+            result = play(path, mode, args.answer, args.delay)
+        except (OSError, ValueError) as e:
+            result = {"scenario": path, "scenario_file": os.path.basename(path), "mode": mode,
+                      "completed": False, "correct": False, "error": str(e)}
+        result.update({"index": index, "total": len(paths)})
+        results.append(result)
+        emit("RESULT " + json.dumps(result, ensure_ascii=False))
+        if result_file:
+            write_result_file(result_file, results)
+    completed = sum(1 for result in results if result.get("completed"))
+    emit("PLAYLIST_DONE " + json.dumps({"count": len(paths), "played": len(results),
+                                        "completed": completed, "aborted": False}))
+    return len(results)
+
+
+def run_daemon(args):
+    emit(READY_MARKER)
+    played = 0
+    for raw in sys.stdin:
+        line = raw.strip()
+        if not line:
+            continue
+        command, _, rest = line.partition(" ")
+        if command == "quit":
+            break
+        if command == "ping":
+            emit("PONG")
+            continue
+        if command == "playlist":
+            mode, _, paths = rest.partition(" ")
+            try:
+                paths = json.loads(paths)
+            except json.JSONDecodeError:
+                emit("ERROR usage: playlist <mode> <json array>")
+                continue
+            played += play_all(paths, mode, args)
+            continue
+        if command != "play":
+            emit(f"ERROR unknown command: {command}")
+            continue
+
+        path, _, mode = rest.rpartition(" ")
+        if not path:
+            emit("ERROR usage: play <path> <mode>")
+            continue
+        if args.crash_after and played >= args.crash_after:
+            # Simulate a JVM crash for the restart policy
+            os._exit(3)
+        try:
+            result = play(path, mode, args.answer, args.delay)
+        except (OSError, ValueError) as e:
+            emit(f"ERROR {e}")
+            continue
+        played += 1
+        emit("RESULT " + json.dumps(result, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", nargs="?")
+    parser.add_argument("mode", nargs="?", default="practice")
+    parser.add_argument("--daemon", action="store_true", help="serve play commands from stdin")
+    parser.add_argument("--answer", choices=("right", "wrong", "random"), default="random")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to 'think' per scenario")
+    parser.add_argument("--result-file", help="also write the result to this file (single run)")
+    parser.add_argument("--playlist", help="JSON file with the list of scenarios to play (single run)")
+    parser.add_argument("--crash-after", type=int, default=0,
+                        help="exit abruptly on the play command after N scenarios")
+    args = parser.parse_args()
+
+    # Results carry Arabic text
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    if args.daemon:
+        run_daemon(args)
+        return
+    if args.playlist:
+        # With --playlist the only positional argument is the mode
+        mode = args.scenario or "practice"
+        with open(args.playlist, 'r', encoding='utf-8') as f:
+            paths = json.load(f)
+        emit(READY_MARKER)
+        play_all([os.path.abspath(path) for path in paths], mode, args, args.result_file)
+        return
+    if not args.scenario:
+        parser.error("a scenario path is required without --daemon")
+
+    emit(READY_MARKER)
+    try:
+        result = play(os.path.abspath(args.scenario), args.mode, args.answer, args.delay)
+    except (OSError, ValueError) as e:
+        emit(f"ERROR {e}")
+        sys.exit(1)
+    emit("RESULT " + json.dumps(result, ensure_ascii=False))
+    if args.result_file:
+        write_result_file(args.result_file, result)
+
+
+def write_result_file(path: str, result: dict):
+    """Fallback channel: write the result atomically for the launcher to pick up"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,32 @@
 import os
-import random
+import threading
 import time
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QListWidget, QListWidgetItem,
                              QMessageBox, QInputDialog, QLineEdit, QTabWidget,
-                             QTextEdit, QSplitter, QFrame, QFileDialog, QProgressDialog)
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+                             QTextEdit, QSplitter, QFrame, QFileDialog, QProgressDialog,
+                             QTableView, QAbstractItemView, QHeaderView, QSpinBox,
+                             QCheckBox, QDateEdit)
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QDate
 from PyQt5.QtGui import QFont, QIcon
 
-from utils.json_handler import JSONHandler
+from utils.history_store import HistoryStore
+from utils.profile_store import ProfileStore
+from utils.item_analysis import ItemAnalysis
+from utils.course_repository import CourseRepository
+from utils.settings_service import SettingsService
 from utils.process_launcher import ProcessLauncher
+from utils.scenario_catalog import ScenarioCatalog
+from utils.file_watcher import DirectoryWatcher
+from utils.results_uploader import query_server
 from windows.assets_manager import AssetsManagerTab
+from windows.history_model import HistoryTableModel
+from windows.scenario_list import apply_catalog_changes
 class AdminDashboard(QMainWindow):
+    # Emitted from the fetch thread; delivered queued to the GUI thread
+    hall_summary_loaded = pyqtSignal(object)
+    item_stats_loaded = pyqtSignal(object)
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
@@ -19,8 +34,12 @@ class AdminDashboard(QMainWindow):
         self.data_dir = os.path.join(self.current_dir, "..", "data")
         self.scenarios_dir = os.path.join(self.data_dir, "scenarios")
         self.config_file = os.path.join(self.data_dir, "config.json")
+        self.settings = SettingsService.instance(self.config_file)
         self.courses_file = os.path.join(self.data_dir, "courses.json")
-        self.history_file = os.path.join(self.data_dir, "history.json")
+        self.course_repository = CourseRepository.instance(self.courses_file)
+        self.history_store = HistoryStore.instance(self.data_dir)
+        self.profile_store = ProfileStore.instance(self.data_dir)
+        self.scenario_catalog = ScenarioCatalog.instance(self.scenarios_dir)
         
         # Fix: Use absolute path for Java apps
         project_root = os.path.dirname(os.path.dirname(self.current_dir))
@@ -31,11 +50,20 @@ class AdminDashboard(QMainWindow):
         print(f"   Java app path: {java_app_path}")
         print(f"   Java app exists: {os.path.exists(java_app_path)}")
         
-        self.process_launcher = ProcessLauncher(java_app_path)
+        self.process_launcher = ProcessLauncher.instance(java_app_path)
+        self.editor_handle = None
+        self.player_handle = None
+        
+        self.scenario_items = {}
         
         self.init_ui()
         self.load_data()
         
+        # Live updates: scenarios saved by the editor show up without a refresh
+        self.watcher = DirectoryWatcher.instance()
+        self.watcher.watch(self.scenarios_dir, extensions=[".json"])
+        self.watcher.files_changed.connect(self.on_scenario_files_changed)
+        
     def init_ui(self):
         self.setWindowTitle("Admin Dashboard - لوحة التحكم")
         self.setGeometry(100, 100, 1000, 700)
@@ -65,6 +93,22 @@ class AdminDashboard(QMainWindow):
             QListWidget::item:selected {
                 background: #5d9557;
             }
+            QTableView {
+                background: rgba(58, 107, 52, 0.9);
+                alternate-background-color: rgba(74, 124, 69, 0.9);
+                color: white;
+                border: 2px solid #2d5429;
+                border-radius: 5px;
+                font-size: 14px;
+                selection-background-color: #5d9557;
+            }
+            QHeaderView::section {
+                background: #2d5429;
+                color: white;
+                font-weight: bold;
+                padding: 6px;
+                border: 1px solid #1a3317;
+            }
             QPushButton {
                 background: qlineargradient(x1: 0, y1: 0, x2: 0, y2: 1,
                     stop: 0 #4a7c45, stop: 0.5 #3a6635, stop: 1 #2d5429);
@@ -134,6 +178,16 @@ class AdminDashboard(QMainWindow):
         self.init_history_tab()
         self.tabs.addTab(self.history_tab, "سجل النتائج - History")
         
+        # Hall Tab (results of every station, from the results server)
+        self.hall_tab = QWidget()
+        self.init_hall_tab()
+        self.tabs.addTab(self.hall_tab, "نتائج القاعة - Hall Results")
+        
+        # Item Analysis Tab (difficulty and discrimination per scenario)
+        self.items_tab = QWidget()
+        self.init_items_tab()
+        self.tabs.addTab(self.items_tab, "تحليل الأسئلة - Item Analysis")
+        
         # Settings Tab (Simplified - only password change)
         self.settings_tab = QWidget()
         self.init_settings_tab()
@@ -223,6 +277,8 @@ class AdminDashboard(QMainWindow):
         
         # Courses list
         self.courses_list = QListWidget()
+        # Several selected courses are deleted together
+        self.courses_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.courses_list.itemDoubleClicked.connect(self.edit_course)
         layout.addWidget(self.courses_list)
         
@@ -231,9 +287,77 @@ class AdminDashboard(QMainWindow):
     def init_history_tab(self):
         layout = QVBoxLayout()
         
-        # History list
-        self.history_list = QListWidget()
-        layout.addWidget(self.history_list)
+        # Search and filter bar; answered from the history store's indexes
+        filter_layout = QHBoxLayout()
+        self.history_name_edit = QLineEdit()
+        self.history_name_edit.setPlaceholderText("الاسم - Name")
+        filter_layout.addWidget(self.history_name_edit)
+        self.history_user_edit = QLineEdit()
+        self.history_user_edit.setPlaceholderText("الرقم - ID")
+        filter_layout.addWidget(self.history_user_edit)
+        filter_layout.addWidget(QLabel("النتيجة - Score"))
+        self.history_score_min = QSpinBox()
+        self.history_score_min.setRange(0, 100)
+        filter_layout.addWidget(self.history_score_min)
+        self.history_score_max = QSpinBox()
+        self.history_score_max.setRange(0, 100)
+        self.history_score_max.setValue(100)
+        filter_layout.addWidget(self.history_score_max)
+        self.history_date_check = QCheckBox("التاريخ - Date")
+        filter_layout.addWidget(self.history_date_check)
+        self.history_date_from = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.history_date_to = QDateEdit(QDate.currentDate())
+        for date_edit in (self.history_date_from, self.history_date_to):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setEnabled(False)
+            filter_layout.addWidget(date_edit)
+        self.history_date_check.toggled.connect(self.history_date_from.setEnabled)
+        self.history_date_check.toggled.connect(self.history_date_to.setEnabled)
+        self.reset_history_filter_btn = QPushButton("الكل - All")
+        self.reset_history_filter_btn.clicked.connect(self.reset_history_filter)
+        filter_layout.addWidget(self.reset_history_filter_btn)
+        layout.addLayout(filter_layout)
+        
+        # Typing restarts the timer, so the query runs once the user pauses
+        self.history_filter_timer = QTimer(self)
+        self.history_filter_timer.setSingleShot(True)
+        self.history_filter_timer.setInterval(250)
+        self.history_filter_timer.timeout.connect(self.apply_history_filter)
+        for signal in (self.history_name_edit.textChanged, self.history_user_edit.textChanged,
+                       self.history_score_min.valueChanged, self.history_score_max.valueChanged,
+                       self.history_date_check.toggled, self.history_date_from.dateChanged,
+                       self.history_date_to.dateChanged):
+            signal.connect(self.history_filter_timer.start)
+        
+        self.history_count_label = QLabel("")
+        layout.addWidget(self.history_count_label)
+        
+        # History table; the model hands rows to the view a page at a time
+        self.history_model = HistoryTableModel(self.history_store, self)
+        self.history_view = QTableView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.horizontalHeader().setSortIndicator(3, Qt.DescendingOrder)
+        self.history_view.setSortingEnabled(True)
+        self.history_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.history_view.verticalHeader().setVisible(False)
+        self.history_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.history_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.history_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_view.setAlternatingRowColors(True)
+        layout.addWidget(self.history_view)
+        self.history_model.modelReset.connect(self.update_history_count)
+        self.history_model.rowsInserted.connect(self.update_history_count)
+        self.update_history_count()
+        
+        # Profile of the trainee in the selected row
+        self.history_profile_label = QLabel("")
+        self.history_profile_label.setWordWrap(True)
+        layout.addWidget(self.history_profile_label)
+        self.history_view.selectionModel().currentRowChanged.connect(self.show_history_profile)
+        
+        # Build the search indexes off the GUI thread before the first search
+        threading.Thread(target=self.history_store.build_index, name="history-index", daemon=True).start()
         
         # Clear history button
         self.clear_history_btn = QPushButton("مسح السجل - Clear History")
@@ -242,6 +366,40 @@ class AdminDashboard(QMainWindow):
         
         self.history_tab.setLayout(layout)
         
+    def init_hall_tab(self):
+        layout = QVBoxLayout()
+        
+        self.hall_status_label = QLabel("")
+        layout.addWidget(self.hall_status_label)
+        
+        # One line per trainee, aggregated over all stations
+        self.hall_list = QListWidget()
+        layout.addWidget(self.hall_list)
+        
+        self.refresh_hall_btn = QPushButton("تحديث - Refresh")
+        self.refresh_hall_btn.clicked.connect(self.refresh_hall)
+        layout.addWidget(self.refresh_hall_btn)
+        
+        self.hall_summary_loaded.connect(self.on_hall_summary_loaded)
+        self.hall_tab.setLayout(layout)
+        
+    def init_items_tab(self):
+        layout = QVBoxLayout()
+        
+        self.items_status_label = QLabel("")
+        layout.addWidget(self.items_status_label)
+        
+        # One line per scenario, hardest first
+        self.items_list = QListWidget()
+        layout.addWidget(self.items_list)
+        
+        self.refresh_items_btn = QPushButton("تحديث - Refresh")
+        self.refresh_items_btn.clicked.connect(self.refresh_item_stats)
+        layout.addWidget(self.refresh_items_btn)
+        
+        self.item_stats_loaded.connect(self.on_item_stats_loaded)
+        self.items_tab.setLayout(layout)
+        
     def init_settings_tab(self):
         layout = QVBoxLayout()
         layout.setSpacing(20)
@@ -271,6 +429,11 @@ class AdminDashboard(QMainWindow):
         password_layout.addWidget(password_title)
         password_layout.addWidget(self.change_password_btn)
         
+        self.results_server_btn = QPushButton("خادم النتائج - Results Server")
+        self.results_server_btn.clicked.connect(self.change_results_server)
+        self.results_server_btn.setMinimumHeight(50)
+        password_layout.addWidget(self.results_server_btn)
+        
         layout.addWidget(password_frame)
         layout.addStretch(1)
         
@@ -281,38 +444,59 @@ class AdminDashboard(QMainWindow):
         self.load_scenarios()
         self.load_courses()
         self.load_history()
+        self.refresh_item_stats()
         
     def load_scenarios(self):
         """Load scenarios list"""
         self.scenarios_list.clear()
+        self.scenario_items = {}
         self.scenario_status_label.setText("Loading scenarios...")
         
-        if not os.path.exists(self.scenarios_dir):
-            os.makedirs(self.scenarios_dir, exist_ok=True)
-            self.scenario_status_label.setText("No scenarios found. Click 'Add New Scenario' to create one.")
-            return
-            
-        scenario_files = [f for f in os.listdir(self.scenarios_dir) if f.endswith('.json')]
+        self.scenario_catalog.refresh()
+        scenarios = self.scenario_catalog.list_scenarios()
         
-        if not scenario_files:
+        if not scenarios:
             self.scenario_status_label.setText("No scenarios found. Click 'Add New Scenario' to create one.")
             return
             
-        for file in scenario_files:
-            scenario_path = os.path.join(self.scenarios_dir, file)
-            scenario_data = JSONHandler.read_json(scenario_path)
-            if scenario_data:
-                title = scenario_data.get('title', 'Unknown Scenario')
-                item = QListWidgetItem(f"📋 {title}\n   File: {file}")
-                item.setData(Qt.UserRole, file)
-                self.scenarios_list.addItem(item)
-        
-        self.scenario_status_label.setText(f"Loaded {len(scenario_files)} scenario(s)")
+        for scenario in scenarios:
+            self.scenario_items[scenario['file_name']] = self.create_scenario_item(scenario)
+            self.scenarios_list.addItem(self.scenario_items[scenario['file_name']])
+        
+        self.scenario_status_label.setText(f"Loaded {len(scenarios)} scenario(s)")
+        
+    def create_scenario_item(self, scenario):
+        """Build the list item for one catalog entry"""
+        item = QListWidgetItem()
+        self.update_scenario_item(item, scenario)
+        return item
+        
+    def update_scenario_item(self, item, scenario):
+        """Refresh an existing list item from a catalog entry"""
+        file = scenario['file_name']
+        title = scenario['title'] or 'Unknown Scenario'
+        text = f"📋 {title}\n   File: {file}"
+        if scenario['problems']:
+            text += f"\n   ⚠️ لا يستخدم في الاختبارات - not used in tests: {'; '.join(scenario['problems'])}"
+        item.setText(text)
+        item.setData(Qt.UserRole, file)
+        
+    def on_scenario_files_changed(self, directory, added, changed, removed):
+        """Apply watcher events to the scenarios list item by item"""
+        if directory != DirectoryWatcher.normalize(self.scenarios_dir):
+            return
+        self.apply_scenario_changes(added + changed + removed)
+        
+    def apply_scenario_changes(self, file_names):
+        """Re-index the given files and update only their list items"""
+        apply_catalog_changes(self.scenarios_list, self.scenario_items, self.scenario_catalog, file_names,
+                              self.create_scenario_item, self.update_scenario_item)
+        self.scenario_status_label.setText(f"🔄 Updated - {len(self.scenario_items)} scenario(s)")
                     
     def load_courses(self):
         """Load courses list with file status"""
         self.courses_list.clear()
-        courses = JSONHandler.read_json(self.courses_file) or []
+        courses = self.course_repository.all()
         
         if not courses:
             no_courses_item = QListWidgetItem("لا توجد دروس متاحة - No courses available")
@@ -338,12 +522,125 @@ class AdminDashboard(QMainWindow):
             
     def load_history(self):
         """Load history records"""
-        self.history_list.clear()
-        history = JSONHandler.read_json(self.history_file) or []
-        for record in history:
-            text = f"{record.get('name')} - {record.get('user_id')} - Score: {record.get('score')}% - {record.get('date')}"
-            item = QListWidgetItem(text)
-            self.history_list.addItem(item)
+        self.history_model.reload()
+        
+    def apply_history_filter(self):
+        """Show the records matching the filter bar"""
+        score_min = self.history_score_min.value()
+        score_max = self.history_score_max.value()
+        date_from = date_to = None
+        if self.history_date_check.isChecked():
+            date_from = self.history_date_from.date().toString("yyyy-MM-dd")
+            date_to = self.history_date_to.date().toString("yyyy-MM-dd")
+        self.history_model.set_filter(
+            name=self.history_name_edit.text().strip(),
+            user_id=self.history_user_edit.text().strip(),
+            score_min=score_min if score_min > 0 else None,
+            score_max=score_max if score_max < 100 else None,
+            date_from=date_from,
+            date_to=date_to)
+        
+    def reset_history_filter(self):
+        """Clear the filter bar and show every record"""
+        self.history_name_edit.clear()
+        self.history_user_edit.clear()
+        self.history_score_min.setValue(0)
+        self.history_score_max.setValue(100)
+        self.history_date_check.setChecked(False)
+        self.history_filter_timer.stop()
+        self.history_model.set_filter()
+        
+    def show_history_profile(self, current, previous=None):
+        """Show the aggregates of the selected record's trainee"""
+        record = self.history_model.record(current.row())
+        profile = self.profile_store.get(record.get('user_id', "")) if record else None
+        if profile is None or not profile['count']:
+            self.history_profile_label.setText("")
+            return
+        weakest = sorted(profile['scenarios'].items(), key=lambda item: item[1][0] - item[1][1])[:3]
+        weakest_text = ", ".join(f"{name} ({right}/{right + wrong})" for name, (right, wrong) in weakest)
+        self.history_profile_label.setText(
+            f"👤 {profile['name']} ({profile['user_id']}): {profile['count']} محاولة - attempts | "
+            f"best {profile['best']}% | mean {profile['mean']}% ± {profile['stddev']} | "
+            f"last {profile['last_score']}% ({profile['last_date']})"
+            + (f"\n   الأضعف - weakest: {weakest_text}" if weakest else ""))
+        
+    def update_history_count(self):
+        self.history_count_label.setText(f"📋 {self.history_model.matching_count()} سجل - records")
+            
+    def closeEvent(self, event):
+        """Detach the history table and the file watcher, so a closed dashboard is released"""
+        self.history_model.detach()
+        self.watcher.disconnect_listener(self.on_scenario_files_changed)
+        self.assets_tab.detach()
+        super().closeEvent(event)
+        
+    def refresh_hall(self):
+        """Fetch the hall-wide summary from the results server (in the background)"""
+        server_url = self.settings.results_server
+        if not server_url:
+            self.hall_status_label.setText("لم يتم ضبط خادم النتائج - No results server configured")
+            return
+        self.refresh_hall_btn.setEnabled(False)
+        self.hall_status_label.setText(f"جاري التحميل - Loading from {server_url}...")
+        threading.Thread(
+            target=lambda: self.hall_summary_loaded.emit(query_server(server_url, "/summary")),
+            name="hall-summary", daemon=True
+        ).start()
+        
+    def on_hall_summary_loaded(self, summary):
+        """Show the per-trainee aggregates"""
+        self.refresh_hall_btn.setEnabled(True)
+        if summary is None:
+            self.hall_status_label.setText("تعذر الاتصال بخادم النتائج - Results server unreachable")
+            return
+        self.hall_status_label.setText(
+            f"{summary.get('records', 0)} results from {summary.get('stations', 0)} stations")
+        self.hall_list.clear()
+        for user in summary.get('users', []):
+            text = (f"{user.get('name')} - {user.get('user_id')} - Tests: {user.get('tests')} - "
+                    f"Average: {user.get('average_score')}% - Best: {user.get('best_score')}% - "
+                    f"Last: {user.get('last_date')} - Stations: {len(user.get('stations', []))}")
+            self.hall_list.addItem(QListWidgetItem(text))
+            
+    def refresh_item_stats(self):
+        """Compute the item statistics (in the background; the first run folds the whole history)"""
+        self.refresh_items_btn.setEnabled(False)
+        self.items_status_label.setText("جاري التحليل - Analyzing...")
+        threading.Thread(target=self._load_item_stats, name="item-analysis", daemon=True).start()
+        
+    def _load_item_stats(self):
+        """Runs on the worker thread; always answers, so the refresh button comes back"""
+        try:
+            rows = ItemAnalysis.instance(self.data_dir).statistics()
+        except Exception as e:
+            print(f"❌ Item analysis failed: {e}")
+            rows = None
+        self.item_stats_loaded.emit(rows)
+        
+    def on_item_stats_loaded(self, rows):
+        """Show difficulty, discrimination and distractors; flag items worth reviewing"""
+        self.refresh_items_btn.setEnabled(True)
+        self.items_list.clear()
+        if rows is None:
+            self.items_status_label.setText("تعذر تحليل الأسئلة - Item analysis failed")
+            return
+        flagged = 0
+        for row in rows:
+            difficulty, discrimination = row["difficulty"], row["discrimination"]
+            review = difficulty < 0.2 or difficulty > 0.9 or (discrimination is not None and discrimination < 0.2)
+            flagged += int(review)
+            distractors = ", ".join(f"{d['team']} ({d['explanation']}) {d['frequency']:.0%}"
+                                    for d in row["distractors"]) or "-"
+            text = (f"{'⚠️ ' if review else ''}{row['title'] or row['scenario_file']} - "
+                    f"Attempts: {row['attempts']} - p: {difficulty:.2f} - "
+                    f"r_pb: {'-' if discrimination is None else f'{discrimination:.2f}'} - "
+                    f"Correct: {row['correct_team'] or '-'} - Distractors: {distractors} - "
+                    f"No choice: {row['no_choice']}")
+            self.items_list.addItem(QListWidgetItem(text))
+        self.items_status_label.setText(
+            f"{len(rows)} سيناريو - scenarios, {flagged} ⚠️ للمراجعة - to review "
+            f"(p < 0.2 or p > 0.9 or r_pb < 0.2)")
             
     def add_scenario(self):
         """Add new scenario using JavaFX editor"""
@@ -356,71 +653,53 @@ class AdminDashboard(QMainWindow):
         self.add_scenario_btn.setText("⏳ Opening Editor...")
         self.scenario_status_label.setText("Launching Scenario Editor...")
         
-        # Force GUI update
-        self.add_scenario_btn.repaint()
-        self.scenario_status_label.repaint()
+        # Returns immediately; the handle reports back when the window is up
+        print("🚀 Attempting to launch scenario editor...")
+        handle = self.process_launcher.start_scenario_editor()
+        if handle is None:
+            self._on_editor_failed("Could not start the Java process")
+            return
         
-        # Use QTimer to delay launch slightly (gives GUI time to update)
-        QTimer.singleShot(500, self._launch_editor)
+        self.editor_handle = handle
+        handle.ready.connect(self._on_editor_ready)
+        handle.failed.connect(self._on_editor_failed)
     
-    def _launch_editor(self):
-        """Actually launch the editor (called after short delay)"""
-        try:
-            print("🚀 Attempting to launch scenario editor...")
-            success = self.process_launcher.launch_scenario_editor()
-            
-            if success:
-                self.scenario_status_label.setText("✅ Scenario Editor launched! Window should appear shortly...")
-                QMessageBox.information(
-                    self, 
-                    "Success! ✅", 
-                    "Scenario Editor launched successfully!\n\n"
-                    "محرر السيناريو تم تشغيله بنجاح!\n\n"
-                    "The editor window should open in a few seconds.\n"
-                    "If you don't see it, check your taskbar or behind other windows.\n\n"
-                    "After creating your scenario:\n"
-                    "1. Save it in the scenarios folder\n"
-                    "2. Click 'Refresh' button to see it in the list"
-                )
-                print("✅ Editor launch reported as successful")
-                
-                # Set up a timer to refresh the list after 5 seconds
-                QTimer.singleShot(5000, self.auto_refresh_scenarios)
-                
-            else:
-                self.scenario_status_label.setText("❌ Failed to launch editor")
-                QMessageBox.warning(
-                    self, 
-                    "Error ❌", 
-                    "Failed to launch scenario editor!\n\n"
-                    "فشل في تشغيل محرر السيناريو!\n\n"
-                    "Possible reasons:\n"
-                    "1. JAR file not built - Run build script first\n"
-                    "2. JavaFX not installed correctly\n"
-                    "3. Java not in PATH\n\n"
-                    "Check the console for detailed error messages."
-                )
-                print("❌ Editor launch reported as failed")
-                
-        except Exception as e:
-            print(f"💥 Exception in add_scenario: {e}")
-            self.scenario_status_label.setText(f"❌ Error: {str(e)}")
-            QMessageBox.critical(
-                self, 
-                "Error ❌", 
-                f"Error launching editor:\n\n{str(e)}\n\n"
-                f"خطأ في تشغيل المحرر:\n{str(e)}"
-            )
-        finally:
-            # Re-enable button
-            self.add_scenario_btn.setEnabled(True)
-            self.add_scenario_btn.setText("➕ إضافة سيناريو جديد - Add New Scenario")
+    def _reset_add_scenario_button(self):
+        self.add_scenario_btn.setEnabled(True)
+        self.add_scenario_btn.setText("➕ إضافة سيناريو جديد - Add New Scenario")
+    
+    def _on_editor_ready(self):
+        """The editor window is open"""
+        self._reset_add_scenario_button()
+        self.scenario_status_label.setText("✅ Scenario Editor is open")
+        print("✅ Editor launch reported as successful")
+        QMessageBox.information(
+            self, 
+            "Success! ✅", 
+            "Scenario Editor launched successfully!\n\n"
+            "محرر السيناريو تم تشغيله بنجاح!\n\n"
+            "If you don't see it, check your taskbar or behind other windows.\n\n"
+            "After creating your scenario, save it in the scenarios folder.\n"
+            "It will appear in the list automatically."
+        )
+    
+    def _on_editor_failed(self, error):
+        """The editor could not start or died before showing its window"""
+        self._reset_add_scenario_button()
+        self.scenario_status_label.setText("❌ Failed to launch editor")
+        print("❌ Editor launch reported as failed")
+        QMessageBox.warning(
+            self, 
+            "Error ❌", 
+            "Failed to launch scenario editor!\n\n"
+            "فشل في تشغيل محرر السيناريو!\n\n"
+            "Possible reasons:\n"
+            "1. JAR file not built - Run build script first\n"
+            "2. JavaFX not installed correctly\n"
+            "3. Java not in PATH\n\n"
+            f"{error}"
+        )
     
-    def auto_refresh_scenarios(self):
-        """Auto-refresh scenarios list (called after editor is launched)"""
-        print("🔄 Auto-refreshing scenarios list...")
-        self.load_scenarios()
-
     def edit_scenario(self):
         """Edit selected scenario"""
         current_item = self.scenarios_list.currentItem()
@@ -438,24 +717,33 @@ class AdminDashboard(QMainWindow):
         self.edit_scenario_btn.setText("⏳ Opening Editor...")
         self.scenario_status_label.setText(f"Opening {scenario_file} for editing...")
         
-        try:
-            success = self.process_launcher.launch_scenario_editor(scenario_path)
-            if success:
-                self.scenario_status_label.setText(f"✅ Editing: {scenario_file}")
-                QMessageBox.information(
-                    self, 
-                    "Success", 
-                    f"Scenario editor opened for:\n{scenario_file}\n\n"
-                    "After editing, click 'Refresh' to see changes."
-                )
-            else:
-                self.scenario_status_label.setText("❌ Failed to open editor")
-                QMessageBox.warning(self, "Error", "Failed to launch scenario editor\nفشل في تشغيل محرر السيناريو")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error launching editor: {str(e)}\nخطأ في تشغيل المحرر: {str(e)}")
-        finally:
-            self.edit_scenario_btn.setEnabled(True)
-            self.edit_scenario_btn.setText("✏️ تعديل السيناريو - Edit Scenario")
+        handle = self.process_launcher.start_scenario_editor(scenario_path)
+        if handle is None:
+            self._on_edit_failed(scenario_file, "Could not start the Java process")
+            return
+        
+        self.editor_handle = handle
+        handle.ready.connect(lambda: self._on_edit_ready(scenario_file))
+        handle.failed.connect(lambda error: self._on_edit_failed(scenario_file, error))
+    
+    def _reset_edit_scenario_button(self):
+        self.edit_scenario_btn.setEnabled(True)
+        self.edit_scenario_btn.setText("✏️ تعديل السيناريو - Edit Scenario")
+    
+    def _on_edit_ready(self, scenario_file):
+        self._reset_edit_scenario_button()
+        self.scenario_status_label.setText(f"✅ Editing: {scenario_file}")
+        QMessageBox.information(
+            self, 
+            "Success", 
+            f"Scenario editor opened for:\n{scenario_file}\n\n"
+            "Saved changes will appear in the list automatically."
+        )
+    
+    def _on_edit_failed(self, scenario_file, error):
+        self._reset_edit_scenario_button()
+        self.scenario_status_label.setText("❌ Failed to open editor")
+        QMessageBox.warning(self, "Error", f"Failed to launch scenario editor\nفشل في تشغيل محرر السيناريو\n\n{error}")
             
     def view_scenario(self):
         """View selected scenario in player"""
@@ -473,19 +761,27 @@ class AdminDashboard(QMainWindow):
         self.view_scenario_btn.setText("⏳ Opening Player...")
         self.scenario_status_label.setText(f"Playing: {scenario_file}")
         
-        try:
-            success = self.process_launcher.launch_scenario_player(scenario_path, "practice")
-            if success:
-                self.scenario_status_label.setText(f"✅ Viewing: {scenario_file}")
-                QMessageBox.information(self, "Success", f"Scenario player opened:\n{scenario_file}")
-            else:
-                self.scenario_status_label.setText("❌ Failed to open player")
-                QMessageBox.warning(self, "Error", "Failed to launch scenario player\nفشل في تشغيل مشغل السيناريو")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error launching player: {str(e)}\nخطأ في تشغيل المشغل: {str(e)}")
-        finally:
-            self.view_scenario_btn.setEnabled(True)
-            self.view_scenario_btn.setText("👁️ عرض السيناريو - View Scenario")
+        handle = self.process_launcher.start_scenario_player(scenario_path, "practice")
+        if handle is None:
+            self._on_view_failed("Could not start the Java process")
+            return
+        
+        self.player_handle = handle
+        handle.ready.connect(lambda: self._on_view_ready(scenario_file))
+        handle.failed.connect(self._on_view_failed)
+    
+    def _reset_view_scenario_button(self):
+        self.view_scenario_btn.setEnabled(True)
+        self.view_scenario_btn.setText("👁️ عرض السيناريو - View Scenario")
+    
+    def _on_view_ready(self, scenario_file):
+        self._reset_view_scenario_button()
+        self.scenario_status_label.setText(f"✅ Viewing: {scenario_file}")
+    
+    def _on_view_failed(self, error):
+        self._reset_view_scenario_button()
+        self.scenario_status_label.setText("❌ Failed to open player")
+        QMessageBox.warning(self, "Error", f"Failed to launch scenario player\nفشل في تشغيل مشغل السيناريو\n\n{error}")
             
     def delete_scenario(self):
         """Delete selected scenario"""
@@ -504,7 +800,7 @@ class AdminDashboard(QMainWindow):
         if reply == QMessageBox.Yes:
             try:
                 os.remove(scenario_path)
-                self.load_scenarios()
+                self.apply_scenario_changes([scenario_file])
                 self.scenario_status_label.setText(f"✅ Deleted: {scenario_file}")
                 QMessageBox.information(self, "Success", "Scenario deleted successfully\nتم حذف السيناريو بنجاح")
             except Exception as e:
@@ -529,16 +825,13 @@ class AdminDashboard(QMainWindow):
             )
             
             if file_path:
-                courses = JSONHandler.read_json(self.courses_file) or []
                 new_course = {
                     "title": title,
                     "file_path": file_path,
-                    "id": f"course_{random.randint(1000, 9999)}",
                     "added_date": self.get_current_date()
                 }
-                courses.append(new_course)
                 
-                if JSONHandler.write_json(self.courses_file, courses):
+                if self.course_repository.add(new_course):
                     self.load_courses()
                     QMessageBox.information(
                         self, 
@@ -566,34 +859,31 @@ class AdminDashboard(QMainWindow):
             return
             
         course_data = current_item.data(Qt.UserRole)
-        courses = JSONHandler.read_json(self.courses_file) or []
+        course = self.course_repository.get(course_data.get('id'))
+        if course is None:
+            return
+        
+        new_title, ok = QInputDialog.getText(
+            self, 
+            "Edit Course - تعديل الدرس", 
+            "Enter new course title:\nأدخل العنوان الجديد للدرس:", 
+            text=course.get('title', '')
+        )
         
-        # Find and update course
-        for i, course in enumerate(courses):
-            if course.get('id') == course_data.get('id'):
-                new_title, ok = QInputDialog.getText(
+        if ok and new_title:
+            if self.course_repository.update(course['id'], {'title': new_title}):
+                self.load_courses()
+                QMessageBox.information(
                     self, 
-                    "Edit Course - تعديل الدرس", 
-                    "Enter new course title:\nأدخل العنوان الجديد للدرس:", 
-                    text=course.get('title', '')
+                    "Success", 
+                    "Course updated successfully\nتم تحديث الدرس بنجاح"
+                )
+            else:
+                QMessageBox.warning(
+                    self, 
+                    "Error", 
+                    "Failed to update course\nفشل في تحديث الدرس"
                 )
-                
-                if ok and new_title:
-                    courses[i]['title'] = new_title
-                    if JSONHandler.write_json(self.courses_file, courses):
-                        self.load_courses()
-                        QMessageBox.information(
-                            self, 
-                            "Success", 
-                            "Course updated successfully\nتم تحديث الدرس بنجاح"
-                        )
-                    else:
-                        QMessageBox.warning(
-                            self, 
-                            "Error", 
-                            "Failed to update course\nفشل في تحديث الدرس"
-                        )
-                break
                 
     def set_course_file(self):
         """Set PowerPoint file for selected course"""
@@ -618,8 +908,9 @@ class AdminDashboard(QMainWindow):
         )
         
         if file_path:
-            course_data['file_path'] = file_path
-            self.update_course_in_file(course_data)
+            if not self.course_repository.update(course_data.get('id'), {'file_path': file_path}):
+                QMessageBox.warning(self, "Error", "Failed to update course\nفشل في تحديث الدرس")
+                return
             QMessageBox.information(
                 self,
                 "Success",
@@ -629,30 +920,23 @@ class AdminDashboard(QMainWindow):
 
     def update_course_in_file(self, updated_course):
         """Update course in JSON file"""
-        courses = JSONHandler.read_json(self.courses_file) or []
-        
-        for i, course in enumerate(courses):
-            if course.get('id') == updated_course.get('id'):
-                courses[i] = updated_course
-                break
-                
-        JSONHandler.write_json(self.courses_file, courses)
+        return self.course_repository.update(updated_course.get('id'), updated_course)
                 
     def delete_course(self):
-        """Delete selected course"""
-        current_item = self.courses_list.currentItem()
-        if not current_item:
+        """Delete the selected courses"""
+        courses = [item.data(Qt.UserRole) for item in self.courses_list.selectedItems()]
+        courses = [course for course in courses if course]
+        if not courses:
             QMessageBox.warning(self, "Error", "Please select a course to delete\nيرجى اختيار درس للحذف")
             return
             
-        course_data = current_item.data(Qt.UserRole)
-        courses = JSONHandler.read_json(self.courses_file) or []
-        
-        # Remove course
-        courses = [c for c in courses if c.get('id') != course_data.get('id')]
+        # One write to courses.json; nothing is deleted if any step fails
+        with self.course_repository.batch() as batch:
+            if not all(self.course_repository.delete(course.get('id')) for course in courses):
+                batch.rollback()
         
-        if JSONHandler.write_json(self.courses_file, courses):
-            self.load_courses()
+        self.load_courses()
+        if batch.saved:
             QMessageBox.information(self, "Success", "Course deleted successfully\nتم حذف الدرس بنجاح")
         else:
             QMessageBox.warning(self, "Error", "Failed to delete course\nفشل في حذف الدرس")
@@ -664,7 +948,7 @@ class AdminDashboard(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            if JSONHandler.write_json(self.history_file, []):
+            if self.history_store.clear():
                 self.load_history()
                 QMessageBox.information(self, "Success", "History cleared successfully\nتم مسح السجل بنجاح")
             else:
@@ -676,11 +960,23 @@ class AdminDashboard(QMainWindow):
                                               "Enter new password:\nأدخل كلمة المرور الجديدة:", 
                                               QLineEdit.Password)
         if ok and new_password:
-            if JSONHandler.update_json(self.config_file, {"admin_password": new_password}):
+            if self.settings.set("admin_password", new_password):
                 QMessageBox.information(self, "Success", "Password changed successfully\nتم تغيير كلمة المرور بنجاح")
             else:
                 QMessageBox.warning(self, "Error", "Failed to change password\nفشل في تغيير كلمة المرور")
 
+    def change_results_server(self):
+        """Set the URL of the hall's results server (empty keeps results on this station)"""
+        server_url, ok = QInputDialog.getText(self, "Results Server",
+                                              "Results server URL (e.g. http://hall-server:8765):\n"
+                                              "عنوان خادم النتائج:",
+                                              QLineEdit.Normal, self.settings.results_server)
+        if ok:
+            if self.settings.set("results_server", server_url.strip()):
+                QMessageBox.information(self, "Success", "Results server saved\nتم حفظ خادم النتائج")
+            else:
+                QMessageBox.warning(self, "Error", "Failed to save settings\nفشل في حفظ الإعدادات")
+
     def get_current_date(self):
         """Get current date in string format"""
         from datetime import datetime
@@ -11,6 +11,10 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QPixmap, QIcon
 
+from utils.file_watcher import DirectoryWatcher
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
 class AssetsManagerTab(QWidget):
     """Tab for managing logos and squad markers"""
     
@@ -25,8 +29,20 @@ class AssetsManagerTab(QWidget):
         os.makedirs(self.logos_dir, exist_ok=True)
         os.makedirs(self.markers_dir, exist_ok=True)
         
+        # filename -> thumbnail frame, per asset type
+        self.thumbnails = {"logos": {}, "markers": {}}
+        
         self.init_ui()
         self.load_assets()
+        
+        self.watcher = DirectoryWatcher.instance()
+        self.watcher.watch(self.logos_dir, extensions=IMAGE_EXTENSIONS)
+        self.watcher.watch(self.markers_dir, extensions=IMAGE_EXTENSIONS)
+        self.watcher.files_changed.connect(self.on_asset_files_changed)
+        
+    def detach(self):
+        """Stop following asset changes (called when the dashboard closes)"""
+        self.watcher.disconnect_listener(self.on_asset_files_changed)
     
     def init_ui(self):
         """Initialize the UI"""
@@ -155,7 +171,7 @@ class AssetsManagerTab(QWidget):
         if not file_paths:
             return
         
-        uploaded = 0
+        uploaded = []
         for file_path in file_paths:
             try:
                 filename = os.path.basename(file_path)
@@ -174,7 +190,7 @@ class AssetsManagerTab(QWidget):
                 
                 # Copy file
                 shutil.copy2(file_path, destination)
-                uploaded += 1
+                uploaded.append(filename)
                 
             except Exception as e:
                 QMessageBox.warning(
@@ -183,13 +199,13 @@ class AssetsManagerTab(QWidget):
                     f"Failed to upload {filename}: {str(e)}"
                 )
         
-        if uploaded > 0:
+        if uploaded:
             QMessageBox.information(
                 self,
                 "Success",
-                f"Successfully uploaded {uploaded} file(s)!"
+                f"Successfully uploaded {len(uploaded)} file(s)!"
             )
-            self.load_assets()
+            self.refresh_asset_files(asset_type, uploaded)
     
     def delete_asset(self, asset_type):
         """Delete selected asset"""
@@ -227,6 +243,47 @@ class AssetsManagerTab(QWidget):
     
     def load_asset_grid(self, asset_type, folder):
         """Load assets into grid view"""
+        # Drop existing thumbnails
+        for thumbnail in self.thumbnails[asset_type].values():
+            thumbnail.setParent(None)
+            thumbnail.deleteLater()
+        self.thumbnails[asset_type] = {}
+        
+        # Get all image files
+        if os.path.exists(folder):
+            for file in os.listdir(folder):
+                if file.lower().endswith(IMAGE_EXTENSIONS):
+                    file_path = os.path.join(folder, file)
+                    self.thumbnails[asset_type][file] = self.create_thumbnail(file_path, file, asset_type)
+        
+        self.layout_asset_grid(asset_type)
+    
+    def on_asset_files_changed(self, directory, added, changed, removed):
+        """Apply watcher events to the matching asset grid"""
+        if directory == DirectoryWatcher.normalize(self.logos_dir):
+            self.refresh_asset_files("logos", added + changed + removed)
+        elif directory == DirectoryWatcher.normalize(self.markers_dir):
+            self.refresh_asset_files("markers", added + changed + removed)
+    
+    def refresh_asset_files(self, asset_type, file_names):
+        """Rebuild only the thumbnails of the given files"""
+        folder = self.logos_dir if asset_type == "logos" else self.markers_dir
+        thumbnails = self.thumbnails[asset_type]
+        
+        for file in file_names:
+            old = thumbnails.pop(file, None)
+            if old is not None:
+                old.setParent(None)
+                old.deleteLater()
+            
+            file_path = os.path.join(folder, file)
+            if file.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(file_path):
+                thumbnails[file] = self.create_thumbnail(file_path, file, asset_type)
+        
+        self.layout_asset_grid(asset_type)
+    
+    def layout_asset_grid(self, asset_type):
+        """Place the existing thumbnails in the grid (no images are reloaded)"""
         # Get the grid layout
         tab = self.logos_tab if asset_type == "logos" else self.markers_tab
         grid_container = tab.findChild(QFrame, f"{asset_type}_grid")
@@ -235,35 +292,24 @@ class AssetsManagerTab(QWidget):
         
         grid_layout = grid_container.layout()
         
-        # Clear existing items
+        # Take items out of the layout without deleting the widgets
         while grid_layout.count():
-            child = grid_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+            grid_layout.takeAt(0)
         
-        # Get all image files
-        image_files = []
-        if os.path.exists(folder):
-            for file in os.listdir(folder):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    image_files.append(file)
+        thumbnails = self.thumbnails[asset_type]
         
         # Update count
         count_label = tab.findChild(QLabel, f"{asset_type}_count")
         if count_label:
-            count_label.setText(f"{len(image_files)} asset(s)")
+            count_label.setText(f"{len(thumbnails)} asset(s)")
         
         # Add thumbnails to grid
         row = 0
         col = 0
         max_cols = 4
         
-        for file in image_files:
-            file_path = os.path.join(folder, file)
-            
-            # Create thumbnail widget
-            thumbnail = self.create_thumbnail(file_path, file, asset_type)
-            grid_layout.addWidget(thumbnail, row, col)
+        for file in sorted(thumbnails):
+            grid_layout.addWidget(thumbnails[file], row, col)
             
             col += 1
             if col >= max_cols:
@@ -271,6 +317,8 @@ class AssetsManagerTab(QWidget):
                 row += 1
         
         # Add stretch to push items to top
+        for stretch_row in range(grid_layout.rowCount()):
+            grid_layout.setRowStretch(stretch_row, 0)
         grid_layout.setRowStretch(row + 1, 1)
     
     def create_thumbnail(self, file_path, filename, asset_type):
@@ -337,7 +385,7 @@ class AssetsManagerTab(QWidget):
                     "Success",
                     f"{filename} deleted successfully!"
                 )
-                self.load_assets()
+                self.refresh_asset_files(asset_type, [filename])
             except Exception as e:
                 QMessageBox.warning(
                     self,
@@ -6,7 +6,7 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
-from utils.json_handler import JSONHandler
+from utils.course_repository import CourseRepository
 
 class CourseWindow(QMainWindow):
     def __init__(self, parent=None):
@@ -15,6 +15,7 @@ class CourseWindow(QMainWindow):
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_dir = os.path.join(self.current_dir, "..", "data")
         self.courses_file = os.path.join(self.data_dir, "courses.json")
+        self.course_repository = CourseRepository.instance(self.courses_file)
         
         self.init_ui()
         self.load_courses()
@@ -117,7 +118,7 @@ class CourseWindow(QMainWindow):
     def load_courses(self):
         """Load available courses"""
         self.courses_list.clear()
-        courses = JSONHandler.read_json(self.courses_file) or []
+        courses = self.course_repository.all()
         
         if not courses:
             no_courses_label = QLabel("لا توجد دروس متاحة - No courses available")
@@ -216,14 +217,7 @@ class CourseWindow(QMainWindow):
                 
     def update_course_file_path(self, updated_course):
         """Update course file path in the JSON file"""
-        courses = JSONHandler.read_json(self.courses_file) or []
-        
-        for i, course in enumerate(courses):
-            if course.get('id') == updated_course.get('id'):
-                courses[i] = updated_course
-                break
-                
-        JSONHandler.write_json(self.courses_file, courses)
+        return self.course_repository.update(updated_course.get('id'), updated_course)
         
     def launch_powerpoint(self, file_path):
         """Launch PowerPoint file using system default program"""
@@ -270,20 +264,14 @@ class CourseWindow(QMainWindow):
             )
             
             if file_path:
-                # Create new course
-                import random
+                # Create new course (the repository assigns its id)
                 new_course = {
                     "title": title,
                     "file_path": file_path,
-                    "id": f"course_{random.randint(1000, 9999)}",
                     "added_date": self.get_current_date()
                 }
                 
-                # Add to courses list
-                courses = JSONHandler.read_json(self.courses_file) or []
-                courses.append(new_course)
-                
-                if JSONHandler.write_json(self.courses_file, courses):
+                if self.course_repository.add(new_course):
                     QMessageBox.information(
                         self,
                         "Success",
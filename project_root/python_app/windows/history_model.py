@@ -0,0 +1,189 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal
+
+from utils.history_index import record_matches
+from utils.history_store import HistoryStore
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Table model over HistoryStore, exposed to the view page by page.
+
+    Rows hold indexes into the store's records sorted by the current
+    column; the view only asks for the rows it shows, and canFetchMore /
+    fetchMore grow the visible row count PAGE_SIZE rows at a time as the
+    view scrolls. New records and clears from the store are applied
+    incrementally through the store's listener. set_filter() narrows the
+    rows to a HistoryStore.query() result.
+    """
+
+    COLUMNS = [
+        ("name", "الاسم - Name"),
+        ("user_id", "الرقم - ID"),
+        ("score", "النتيجة - Score"),
+        ("date", "التاريخ - Date"),
+    ]
+    PAGE_SIZE = 200
+
+    # Store events can arrive on any thread; re-emitted to run in the GUI thread
+    _history_event = pyqtSignal(str, object)
+
+    def __init__(self, history_store: HistoryStore, parent=None):
+        super().__init__(parent)
+        self.history_store = history_store
+        self._records: List[Dict[str, Any]] = []
+        self._order: List[int] = []
+        self._keys: List[Any] = []
+        self._loaded = 0
+        self._filter: Dict[str, Any] = {}
+        # Newest first until the user picks a column
+        self._sort_column = 3
+        self._sort_order = Qt.DescendingOrder
+
+        self._history_event.connect(self._on_history_event)
+        self._listener = self._history_event.emit
+        self.history_store.add_listener(self._listener)
+        self.reload()
+
+    def detach(self):
+        """Stop following the store (call before the model goes away)"""
+        self.history_store.remove_listener(self._listener)
+
+    def set_filter(self, **conditions):
+        """Show only records matching the conditions of HistoryStore.query (none: all)"""
+        self._filter = {key: value for key, value in conditions.items() if value is not None and value != ""}
+        self.reload()
+
+    def matching_count(self) -> int:
+        """Number of records passing the filter, fetched or not"""
+        return len(self._order)
+
+    def reload(self):
+        """Re-read the store and show the first page"""
+        self.beginResetModel()
+        if self._filter:
+            self._records = self.history_store.query(**self._filter)
+        else:
+            self._records = self.history_store.read_all()
+        self._resort()
+        self.endResetModel()
+
+    def _sort_key(self, row: int):
+        """Sort key of a record; ties keep append order"""
+        field = self.COLUMNS[self._sort_column][0]
+        value = self._records[row].get(field)
+        if field == "score":
+            value = value if isinstance(value, (int, float)) else -1
+        else:
+            value = "" if value is None else str(value)
+        if self._sort_order == Qt.DescendingOrder:
+            # Newer records come first among equals
+            return _Descending(value), -row
+        return value, row
+
+    def _resort(self):
+        self._order = sorted(range(len(self._records)), key=self._sort_key)
+        self._keys = [self._sort_key(row) for row in self._order]
+        self._loaded = min(self.PAGE_SIZE, len(self._order))
+
+    def record(self, row: int) -> Optional[Dict[str, Any]]:
+        """The history record shown in a row"""
+        if 0 <= row < self._loaded:
+            return self._records[self._order[row]]
+        return None
+
+    # QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.PAGE_SIZE, len(self._order) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return QVariant()
+        record = self._records[self._order[index.row()]]
+        field = self.COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            value = record.get(field)
+            if value is None:
+                return ""
+            return f"{value}%" if field == "score" else str(value)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return QVariant()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column == self._sort_column and order == self._sort_order:
+            return
+        self.beginResetModel()
+        self._sort_column = column
+        self._sort_order = order
+        self._resort()
+        self.endResetModel()
+
+    # Store events
+
+    def _on_history_event(self, event: str, record: Optional[Dict[str, Any]]):
+        if event == "clear":
+            self.beginResetModel()
+            self._records, self._order, self._keys, self._loaded = [], [], [], 0
+            self.endResetModel()
+        elif event == "append" and record is not None:
+            if not record_matches(record, **self._filter):
+                return
+            self._records.append(record)
+            row = len(self._records) - 1
+            key = self._sort_key(row)
+            position = bisect_left(self._keys, key)
+            self._order.insert(position, row)
+            self._keys.insert(position, key)
+            # Rows past the fetched range show up with the next fetchMore
+            if position < self._loaded or self._loaded == len(self._order) - 1:
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._loaded += 1
+                self.endInsertRows()
+
+
+class _Descending:
+    """Wraps a value so that an ascending sort orders it descending"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __gt__(self, other):
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __le__(self, other):
+        return self.value >= other.value
+
+    def __ge__(self, other):
+        return self.value <= other.value
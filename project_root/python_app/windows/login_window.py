@@ -5,7 +5,7 @@ from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont, QPalette, QColor
 
 from windows.admin_dashboard import AdminDashboard
-from utils.json_handler import JSONHandler
+from utils.settings_service import SettingsService
 
 class MilitaryLineEdit(QLineEdit):
     def __init__(self, placeholder="", parent=None):
@@ -39,6 +39,7 @@ class LoginWindow(QDialog):
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_dir = os.path.join(self.current_dir, "..", "data")
         self.config_file = os.path.join(self.data_dir, "config.json")
+        self.settings = SettingsService.instance(self.config_file)
         
         self.init_ui()
         self.setup_animations()
@@ -204,9 +205,8 @@ class LoginWindow(QDialog):
     def authenticate(self):
         """Check admin password"""
         password = self.password_input.text()
-        config = JSONHandler.read_json(self.config_file)
         
-        if config and config.get("admin_password") == password:
+        if self.settings.check_password(password):
             # Success animation
             self.login_btn.setStyleSheet(self.login_btn.styleSheet().replace("color", "#32CD32"))
             
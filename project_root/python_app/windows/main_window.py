@@ -9,7 +9,8 @@ from windows.login_window import LoginWindow
 from windows.admin_dashboard import AdminDashboard
 from windows.user_entry import UserEntryWindow
 from windows.course_window import CourseWindow
-from utils.json_handler import JSONHandler
+from utils.settings_service import SettingsService
+from utils.session_registry import SessionRegistry
 
 class AnimatedButton(QPushButton):
     def __init__(self, text, parent=None):
@@ -62,6 +63,8 @@ class MainWindow(QMainWindow):
         self.data_dir = os.path.join(self.current_dir, "..", "data")
         self.assets_dir = os.path.join(self.current_dir, "..", "assets")
         self.config_file = os.path.join(self.data_dir, "config.json")
+        self.settings = SettingsService.instance(self.config_file)
+        self.session_registry = SessionRegistry.instance(self.data_dir)
         
         self.background_label = None
         
@@ -69,10 +72,13 @@ class MainWindow(QMainWindow):
         self.load_config()
         self.setup_animations()
         
+        self.session_registry.add_listener(self.on_session_event)
+        self.update_sessions_label()
+        
     def load_config(self):
         """Load configuration"""
-        config = JSONHandler.read_json(self.config_file)
-        # Always use military theme
+        # Always use military theme. Every label is bilingual, so the language
+        # and theme settings have nothing to switch
         
     def init_ui(self):
         self.setWindowTitle("Interactive Tactical Training System - نظام التدريب التكتيكي التفاعلي")
@@ -170,6 +176,20 @@ class MainWindow(QMainWindow):
         # Add bottom spacer
         main_layout.addStretch(1)
         
+        # Progress of the tests running in parallel on this station
+        self.sessions_label = QLabel("")
+        self.sessions_label.setAlignment(Qt.AlignCenter)
+        self.sessions_label.setStyleSheet("""
+            QLabel {
+                background: rgba(30, 63, 26, 0.8);
+                color: white;
+                font-size: 14px;
+                padding: 8px;
+                border-radius: 5px;
+            }
+        """)
+        main_layout.addWidget(self.sessions_label)
+        
         # Add tactical footer
         footer_label = QLabel("ⓘ نظام التدريب التكتيكي - الإصدار 1.0 | © 2024 القوات المسلحة")
         footer_label.setAlignment(Qt.AlignCenter)
@@ -335,6 +355,18 @@ class MainWindow(QMainWindow):
         
         self.pulse_state = (self.pulse_state + 1) % 4
         
+    def on_session_event(self, event, session):
+        """A test session opened, made progress or ended"""
+        self.update_sessions_label()
+        
+    def update_sessions_label(self):
+        """List the running test sessions with their progress"""
+        sessions = self.session_registry.sessions()
+        self.sessions_label.setVisible(bool(sessions))
+        self.sessions_label.setText("   |   ".join(
+            f"{session['name']}: {session['index']}/{session['total']}" for session in sessions
+        ))
+        
     def open_admin_login(self):
         """Open admin login window"""
         self.login_window = LoginWindow(self)
@@ -1,12 +1,14 @@
 import os
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QListWidget, QListWidgetItem,
-                             QMessageBox)
+                             QMessageBox, QAbstractItemView)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
-from utils.json_handler import JSONHandler
 from utils.process_launcher import ProcessLauncher
+from utils.scenario_catalog import ScenarioCatalog
+from utils.file_watcher import DirectoryWatcher
+from windows.scenario_list import apply_catalog_changes
 
 class PracticeWindow(QMainWindow):
     def __init__(self, parent=None):
@@ -15,14 +17,22 @@ class PracticeWindow(QMainWindow):
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_dir = os.path.join(self.current_dir, "..", "data")
         self.scenarios_dir = os.path.join(self.data_dir, "scenarios")
+        self.scenario_catalog = ScenarioCatalog.instance(self.scenarios_dir)
         
-        self.process_launcher = ProcessLauncher(
+        self.process_launcher = ProcessLauncher.instance(
             os.path.join(os.path.dirname(self.current_dir), "..", "java_app")
         )
+        self.player_handle = None
+        
+        self.scenario_items = {}
         
         self.init_ui()
         self.load_scenarios()
         
+        self.watcher = DirectoryWatcher.instance()
+        self.watcher.watch(self.scenarios_dir, extensions=[".json"])
+        self.watcher.files_changed.connect(self.on_scenario_files_changed)
+        
     def init_ui(self):
         self.setWindowTitle("تمرين - Practice Mode")
         self.setGeometry(100, 100, 800, 600)
@@ -39,6 +49,8 @@ class PracticeWindow(QMainWindow):
         
         # Scenarios list
         self.scenarios_list = QListWidget()
+        # Several selected scenarios are practised back to back
+        self.scenarios_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.scenarios_list.itemDoubleClicked.connect(self.play_scenario)
         layout.addWidget(self.scenarios_list)
         
@@ -59,42 +71,79 @@ class PracticeWindow(QMainWindow):
     def load_scenarios(self):
         """Load available scenarios"""
         self.scenarios_list.clear()
-        if not os.path.exists(self.scenarios_dir):
-            os.makedirs(self.scenarios_dir, exist_ok=True)
-            QMessageBox.information(self, "Info", "No scenarios found. Please add scenarios in admin mode.")
-            return
-            
-        scenario_files = []
-        for file in os.listdir(self.scenarios_dir):
-            if file.endswith('.json'):
-                scenario_files.append(file)
+        self.scenario_items = {}
+        self.scenario_catalog.refresh()
+        scenarios = self.scenario_catalog.list_scenarios()
                 
-        if not scenario_files:
+        if not scenarios:
             QMessageBox.information(self, "Info", "No scenarios found. Please add scenarios in admin mode.")
             return
             
-        for file in scenario_files:
-            scenario_path = os.path.join(self.scenarios_dir, file)
-            scenario_data = JSONHandler.read_json(scenario_path)
-            if scenario_data:
-                item = QListWidgetItem(scenario_data.get('title', file))
-                item.setData(Qt.UserRole, file)
-                self.scenarios_list.addItem(item)
+        for scenario in scenarios:
+            item = self.create_scenario_item(scenario)
+            self.scenarios_list.addItem(item)
+            self.scenario_items[scenario['file_name']] = item
+            
+    def create_scenario_item(self, scenario):
+        """Build the list item for one catalog entry"""
+        item = QListWidgetItem()
+        self.update_scenario_item(item, scenario)
+        return item
+        
+    def update_scenario_item(self, item, scenario):
+        """Refresh an existing list item from a catalog entry"""
+        item.setText(scenario['title'] or scenario['file_name'])
+        item.setData(Qt.UserRole, scenario['file_name'])
+            
+    def on_scenario_files_changed(self, directory, added, changed, removed):
+        """Update only the list items of scenarios that changed on disk"""
+        if directory != DirectoryWatcher.normalize(self.scenarios_dir):
+            return
+        apply_catalog_changes(self.scenarios_list, self.scenario_items, self.scenario_catalog,
+                              added + changed + removed, self.create_scenario_item, self.update_scenario_item)
+        
+    def closeEvent(self, event):
+        """Stop following scenario changes, so a closed window is released"""
+        self.watcher.disconnect_listener(self.on_scenario_files_changed)
+        super().closeEvent(event)
                 
     def play_selected_scenario(self):
-        """Play the selected scenario"""
-        current_item = self.scenarios_list.currentItem()
-        if not current_item:
+        """Play the selected scenario, or all selected scenarios in list order"""
+        items = sorted(self.scenarios_list.selectedItems(), key=self.scenarios_list.row)
+        if not items:
+            current_item = self.scenarios_list.currentItem()
+            items = [current_item] if current_item else []
+        if not items:
             QMessageBox.warning(self, "Error", "Please select a scenario to play")
             return
-            
-        self.play_scenario(current_item)
+        if len(items) == 1:
+            self.play_scenario(items[0])
+            return
+        
+        scenario_paths = [os.path.join(self.scenarios_dir, item.data(Qt.UserRole)) for item in items]
+        # One player window runs them back to back
+        handle = self.process_launcher.start_scenario_playlist(scenario_paths, "practice")
+        if handle is None:
+            QMessageBox.warning(self, "Error", "Failed to launch scenario player")
+            return
+        
+        self.player_handle = handle
+        handle.failed.connect(self.on_player_failed)
         
     def play_scenario(self, item):
         """Play the scenario"""
         scenario_file = item.data(Qt.UserRole)
         scenario_path = os.path.join(self.scenarios_dir, scenario_file)
         
-        success = self.process_launcher.launch_scenario_player(scenario_path, "practice")
-        if not success:
-            QMessageBox.warning(self, "Error", "Failed to launch scenario player")
\ No newline at end of file
+        # Returns immediately; failures are reported through the handle
+        handle = self.process_launcher.start_scenario_player(scenario_path, "practice")
+        if handle is None:
+            QMessageBox.warning(self, "Error", "Failed to launch scenario player")
+            return
+        
+        self.player_handle = handle
+        handle.failed.connect(self.on_player_failed)
+        
+    def on_player_failed(self, error):
+        """The player exited before its window opened"""
+        QMessageBox.warning(self, "Error", f"Failed to launch scenario player\n\n{error}")
\ No newline at end of file
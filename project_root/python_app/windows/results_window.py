@@ -4,6 +4,8 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPalette, QColor
 
+from utils.profile_store import ProfileStore
+
 class ResultsWindow(QMainWindow):
     def __init__(self, result_data, parent=None):
         super().__init__(parent)
@@ -78,8 +80,38 @@ class ResultsWindow(QMainWindow):
         scenarios_label.setFont(QFont("Arial", 14))
         details_layout.addWidget(scenarios_label)
         
+        # The trainee's record over all tests, this one included
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+        profile_store = ProfileStore.instance(data_dir)
+        profile = profile_store.get(self.result_data['user_id'])
+        if profile is not None and profile['count']:
+            profile_label = QLabel(
+                f"عدد المحاولات: {profile['count']} - الأفضل: {profile['best']}% - المتوسط: {profile['mean']}%")
+            profile_label.setFont(QFont("Arial", 14))
+            details_layout.addWidget(profile_label)
+        
+        # Rank among the other trainees' best scores
+        percentile = profile_store.trainee_percentile(self.result_data['score'], self.result_data['user_id'])
+        if percentile is not None:
+            rank_label = QLabel(f"أفضل من {percentile:g}% من المتدربين - Better than {percentile:g}% of trainees")
+            rank_label.setFont(QFont("Arial", 14, QFont.Bold))
+            details_layout.addWidget(rank_label)
+        
         layout.addLayout(details_layout)
         
+        # Leaderboard by best score per trainee
+        leaders = profile_store.leaderboard(5)
+        if leaders:
+            board_label = QLabel("لوحة المتصدرين - Leaderboard")
+            board_label.setFont(QFont("Arial", 14, QFont.Bold))
+            layout.addWidget(board_label)
+            for leader in leaders:
+                mark = "▶ " if leader['user_id'] == str(self.result_data['user_id']) else ""
+                leader_label = QLabel(f"{mark}{leader['rank']}. {leader['name']} ({leader['user_id']}) - "
+                                      f"{leader['best']}%")
+                leader_label.setFont(QFont("Arial", 12))
+                layout.addWidget(leader_label)
+        
         # Buttons
         buttons_layout = QHBoxLayout()
         
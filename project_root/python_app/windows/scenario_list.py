@@ -0,0 +1,28 @@
+def apply_catalog_changes(list_widget, items, catalog, file_names, create_item, update_item):
+    """Re-index the given scenario files and update only their list items.
+
+    items maps file name -> list item for the scenarios shown (valid ones,
+    sorted by file name) and is kept in step with list_widget.
+    create_item(entry) builds a new item and update_item(item, entry)
+    refreshes an existing one.
+    """
+    # The catalog is shared, so another window may already have re-indexed
+    # these files: update from the catalog entries, not from the diff
+    catalog.refresh(file_names)
+
+    for file in file_names:
+        entry = catalog.get(file)
+        item = items.get(file)
+
+        if entry is None or not entry['valid']:
+            if item is not None:
+                list_widget.takeItem(list_widget.row(item))
+                del items[file]
+        elif item is not None:
+            update_item(item, entry)
+        else:
+            # Keep the list sorted by file name
+            row = sum(1 for name in items if name < file)
+            item = create_item(entry)
+            list_widget.insertItem(row, item)
+            items[file] = item
@@ -1,12 +1,17 @@
 import os
 import random
+import uuid
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QProgressBar, QMessageBox)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
-from utils.json_handler import JSONHandler
+from utils.grading import AnswerKey, grade_answers
+from utils.history_store import HistoryStore
 from utils.process_launcher import ProcessLauncher
+from utils.scenario_catalog import ScenarioCatalog
+from utils.scenario_prefetcher import ScenarioPrefetcher
+from utils.session_registry import SessionRegistry
 from windows.results_window import ResultsWindow
 
 class TestWindow(QMainWindow):
@@ -18,13 +23,47 @@ class TestWindow(QMainWindow):
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
         self.data_dir = os.path.join(self.current_dir, "..", "data")
         self.scenarios_dir = os.path.join(self.data_dir, "scenarios")
-        self.history_file = os.path.join(self.data_dir, "history.json")
-        self.temp_result_file = os.path.join(self.data_dir, "temp_result.json")
+        self.history_store = HistoryStore.instance(self.data_dir)
+        self.scenario_catalog = ScenarioCatalog.instance(self.scenarios_dir)
+        self.prefetcher = ScenarioPrefetcher.instance(
+            os.path.join(self.current_dir, "..", "assets")
+        )
         
-        self.process_launcher = ProcessLauncher(
+        self.process_launcher = ProcessLauncher.instance(
             os.path.join(os.path.dirname(self.current_dir), "..", "java_app")
         )
         
+        # Each window is one session: its own player, result files and progress,
+        # so several trainees can be tested side by side
+        self.session_registry = SessionRegistry.instance(self.data_dir)
+        session = self.session_registry.open(user_id, user_name)
+        self.session_state = "abandoned"
+        if session is None:
+            # Another window started a test for this trainee meanwhile; a second,
+            # untracked test would share its results. The caller closes us.
+            self.session_id = None
+            self.player_service = None
+            QMessageBox.warning(parent, "خطأ - Error",
+                                "هذا المتدرب لديه اختبار قيد التشغيل\nThis trainee already has a test running")
+            return
+        self.session_id = session['id']
+        
+        self.player_handle = None
+        # The rest of the test is handed to the player as one playlist;
+        # these are the scenario paths whose results are still to come
+        self.awaiting_scenarios = []
+        self.playlist_running = False
+        
+        # One warm player serves every scenario of the test
+        self.player_service = self.process_launcher.acquire_player_service(self.session_id)
+        if self.player_service is not None:
+            self.player_service.playing.connect(self.on_player_ready)
+            self.player_service.partial.connect(self.on_partial_result)
+            self.player_service.result.connect(self.on_daemon_result)
+            self.player_service.playlist_done.connect(self.on_playlist_done)
+            self.player_service.error.connect(self.on_daemon_error)
+            self.player_service.start()
+        
         self.current_scenario_index = 0
         self.scenarios_to_play = []
         self.user_answers = []
@@ -34,7 +73,7 @@ class TestWindow(QMainWindow):
         self.prepare_test()
         
     def init_ui(self):
-        self.setWindowTitle("اختبار - Test Mode")
+        self.setWindowTitle(f"اختبار - Test Mode - {self.user_name}")
         self.setGeometry(100, 100, 800, 600)
         
         central_widget = QWidget()
@@ -71,11 +110,9 @@ class TestWindow(QMainWindow):
     def prepare_test(self):
         """Prepare random scenarios for the test"""
         # Get all available scenarios
-        scenario_files = []
-        if os.path.exists(self.scenarios_dir):
-            for file in os.listdir(self.scenarios_dir):
-                if file.endswith('.json'):
-                    scenario_files.append(file)
+        self.scenario_catalog.refresh()
+        # Scenarios with problems (e.g. no right team) cannot be graded
+        scenario_files = self.scenario_catalog.file_names(testable_only=True)
         
         if not scenario_files:
             QMessageBox.warning(self, "Error", "No scenarios found! Please add scenarios first.")
@@ -87,80 +124,234 @@ class TestWindow(QMainWindow):
         self.scenarios_to_play = random.sample(scenario_files, num_scenarios)
         self.total_scenarios = len(self.scenarios_to_play)
         
+        # Check the scenarios and warm their files while the trainee gets ready
+        self.prefetcher.prefetch(self.scenario_path(scenario_file) for scenario_file in self.scenarios_to_play)
+        
+        self.session_registry.update(self.session_id, total=self.total_scenarios)
         self.progress_label.setText(f"الاختبار سيتضمن {self.total_scenarios} سيناريوهات")
         self.progress_bar.setMaximum(self.total_scenarios)
         self.progress_bar.setValue(0)
         self.status_label.setText("جاهز للبدء")
         
     def start_next_scenario(self):
-        """Start the next scenario in the test"""
+        """Hand the remaining scenarios to the player as one playlist"""
         if self.current_scenario_index >= len(self.scenarios_to_play):
             self.finish_test()
             return
             
         self.start_btn.setEnabled(False)
-        scenario_file = self.scenarios_to_play[self.current_scenario_index]
-        scenario_path = os.path.join(self.scenarios_dir, scenario_file)
+        self.replace_unplayable_scenarios()
+        if self.current_scenario_index >= len(self.scenarios_to_play):
+            self.finish_test()
+            return
+        scenario_paths = [self.scenario_path(scenario_file)
+                          for scenario_file in self.scenarios_to_play[self.current_scenario_index:]]
         
-        # Update progress
-        self.progress_label.setText(f"السيناريو {self.current_scenario_index + 1} من {self.total_scenarios}")
-        self.progress_bar.setValue(self.current_scenario_index + 1)
+        self.show_progress()
         self.status_label.setText("جاري تشغيل السيناريو...")
+        self.awaiting_scenarios = list(scenario_paths)
+        self.playlist_running = True
+        
+        if self.player_service is not None:
+            if self.player_service.play_playlist(scenario_paths, "test"):
+                return
+        
+        # Fall back to a one-off JVM (returns immediately)
+        handle = self.process_launcher.start_scenario_playlist(
+            scenario_paths, "test", result_file=self.session_registry.result_file(self.session_id))
+        if handle is None:
+            self.playlist_running = False
+            self.awaiting_scenarios = []
+            self.on_player_failed("Could not start the Java process")
+            return
+        
+        self.player_handle = handle
+        handle.ready.connect(self.on_player_ready)
+        handle.failed.connect(self.on_player_failed)
+        handle.partial.connect(self.on_partial_result)
+        handle.result.connect(self.on_daemon_result)
+        handle.playlist_done.connect(self.on_playlist_done)
+        handle.finished.connect(self.on_player_finished)
+        
+    def scenario_path(self, scenario_file):
+        return os.path.abspath(os.path.join(self.scenarios_dir, scenario_file))
+        
+    def replace_unplayable_scenarios(self):
+        """Swap scenarios that failed the prefetch check for other valid ones
+        (or drop them), so the player never stumbles on a broken file.
+        Only finished checks are used: this runs on the GUI thread, so a
+        scenario whose check is still queued is played as it is"""
+        remaining = self.scenarios_to_play[self.current_scenario_index:]
+        spares = None
+        
+        playable = []
+        for scenario_file in remaining:
+            while scenario_file is not None and not self.is_playable(scenario_file):
+                print(f"⚠️ Skipping unplayable scenario: {scenario_file}")
+                if spares is None:
+                    spares = self.spare_scenarios()
+                scenario_file = spares.pop() if spares else None
+            if scenario_file is not None:
+                playable.append(scenario_file)
+        
+        if playable == remaining:
+            return
+        self.scenarios_to_play[self.current_scenario_index:] = playable
+        self.total_scenarios = len(self.scenarios_to_play)
+        self.progress_bar.setMaximum(max(self.total_scenarios, 1))
+        self.session_registry.update(self.session_id, total=self.total_scenarios)
         
-        # Launch Java player
-        success = self.process_launcher.launch_scenario_player(scenario_path, "test")
-        if not success:
-            QMessageBox.warning(self, "Error", "Failed to launch scenario player")
-            self.start_btn.setEnabled(True)
+    def is_playable(self, scenario_file):
+        """False only when the prefetch check has already found the file broken"""
+        report = self.prefetcher.cached_report(self.scenario_path(scenario_file))
+        return report is None or report['ok']
+        
+    def spare_scenarios(self):
+        """Scenarios not in this test that are not known to be broken, shuffled,
+        with the ones already checked OK at the end so pop() takes them first"""
+        spares = [scenario_file for scenario_file in self.scenario_catalog.file_names(testable_only=True)
+                  if scenario_file not in self.scenarios_to_play]
+        random.shuffle(spares)
+        checked = {scenario_file: self.prefetcher.cached_report(self.scenario_path(scenario_file))
+                   for scenario_file in spares}
+        spares.sort(key=lambda scenario_file: checked[scenario_file] is not None)
+        return [scenario_file for scenario_file in spares
+                if checked[scenario_file] is None or checked[scenario_file]['ok']]
+        
+    def show_progress(self):
+        """Show which scenario of the test is playing"""
+        number = min(self.current_scenario_index + 1, self.total_scenarios)
+        self.progress_label.setText(f"السيناريو {number} من {self.total_scenarios}")
+        self.progress_bar.setValue(number)
+        
+    def on_player_ready(self, *args):
+        """The player window is open"""
+        self.status_label.setText("السيناريو قيد التشغيل...")
+        
+    def on_player_failed(self, error):
+        """The player could not start or died before showing its window"""
+        self.playlist_running = False
+        self.awaiting_scenarios = []
+        self.status_label.setText("فشل تشغيل السيناريو")
+        QMessageBox.warning(self, "Error", f"Failed to launch scenario player\n\n{error}")
+        self.start_btn.setEnabled(True)
+        
+    def on_daemon_result(self, result):
+        """A scenario of our playlist finished; results stream in playlist order"""
+        if not self.awaiting_scenarios or result.get('scenario') != self.awaiting_scenarios[0]:
             return
+        self.awaiting_scenarios.pop(0)
+        self.record_scenario_result(result)
+        
+    def on_daemon_error(self, error):
+        """The warm player could not play (or crashed during) our playlist"""
+        if not self.playlist_running:
+            return
+        self.on_player_failed(error)
+        
+    def on_partial_result(self, partial):
+        """A team was chosen; the full result follows once the explanation is closed"""
+        if not self.awaiting_scenarios or partial.get('scenario') != self.awaiting_scenarios[0]:
+            return
+        mark = "✅" if partial.get('correct') else "❌"
+        self.status_label.setText(f"{mark} تم اختيار الفريق {partial.get('team', '')}")
+        
+    def on_playlist_done(self, summary):
+        """The player went through the playlist (or its window was closed)"""
+        if not self.playlist_running:
+            return
+        self.playlist_running = False
+        self.awaiting_scenarios = []
+        if self.current_scenario_index >= self.total_scenarios:
+            self.finish_test()
+            return
+        self.status_label.setText("تم إيقاف الاختبار - يمكنك المتابعة")
+        self.start_btn.setText("متابعة الاختبار")
+        self.start_btn.setEnabled(True)
+        
+    def on_player_finished(self, returncode):
+        """The one-off player exited; scenarios without a result can be resumed"""
+        if not self.playlist_running:
+            return
+        self.playlist_running = False
+        self.awaiting_scenarios = []
+        if self.current_scenario_index >= self.total_scenarios:
+            self.finish_test()
+            return
+        self.status_label.setText("لم يتم تسجيل نتيجة - أعد تشغيل السيناريو")
+        self.start_btn.setText("متابعة الاختبار")
+        self.start_btn.setEnabled(True)
             
-        # Start checking for result
-        self.check_result_timer = QTimer()
-        self.check_result_timer.timeout.connect(self.check_scenario_result)
-        self.check_result_timer.start(1000)  # Check every second
-        
-    def check_scenario_result(self):
-        """Check if scenario result is available"""
-        result = self.process_launcher.get_scenario_result(self.temp_result_file)
-        if result:
-            self.check_result_timer.stop()
-            self.user_answers.append(result)
-            self.current_scenario_index += 1
-            self.status_label.setText("تم الانتهاء من السيناريو")
-            self.start_btn.setEnabled(True)
-            self.start_btn.setText("السيناريو التالي" if self.current_scenario_index < self.total_scenarios else "إنهاء الاختبار")
+    def record_scenario_result(self, result):
+        """Store one scenario answer; the player moves on to the next by itself"""
+        self.user_answers.append(result)
+        self.current_scenario_index += 1
+        self.session_registry.update(
+            self.session_id, index=self.current_scenario_index,
+            correct=sum(1 for answer in self.user_answers if answer.get('correct', False)))
+        self.status_label.setText("تم الانتهاء من السيناريو")
+        self.show_progress()
             
     def finish_test(self):
         """Calculate results and show results window"""
-        # Calculate score
-        correct_answers = sum(1 for answer in self.user_answers if answer.get('correct', False))
-        total_questions = len(self.user_answers)
-        score_percentage = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+        # Grade against the scenarios' answer keys rather than the player's flags
+        grades = grade_answers(self.user_answers, AnswerKey(self.scenario_catalog))
         
         # Create result record
         result_record = {
+            # Lets the hall's results server drop duplicate uploads
+            "record_id": uuid.uuid4().hex,
             "user_id": self.user_id,
             "name": self.user_name,
-            "score": round(score_percentage),
-            "right": correct_answers,
-            "wrong": total_questions - correct_answers,
+            "score": grades['score'],
+            "right": grades['right'],
+            "wrong": grades['wrong'],
             "date": self.get_current_date(),
-            "scenarios_played": len(self.scenarios_to_play)
+            "scenarios_played": len(self.scenarios_to_play),
+            # Per-scenario answers feed the trainee profiles and regrading
+            "answers": [{"scenario_file": scenario['scenario_file'],
+                         "selected_team": scenario['selected_team'],
+                         "correct": scenario['correct'],
+                         # Per-team outcomes for item analysis
+                         "team_correct": {team['color']: team['right'] for team in scenario['teams']}}
+                        for scenario in grades['scenarios']]
         }
         
         # Save to history
         self.save_to_history(result_record)
+        self.session_state = "finished"
         
         # Show results
         self.results_window = ResultsWindow(result_record, self.parent)
         self.results_window.show()
         self.close()
         
+    def closeEvent(self, event):
+        """End the session and hand the player back"""
+        if self.session_id is None:
+            super().closeEvent(event)
+            return
+        if self.player_service is not None:
+            for signal, slot in ((self.player_service.playing, self.on_player_ready),
+                                 (self.player_service.partial, self.on_partial_result),
+                                 (self.player_service.result, self.on_daemon_result),
+                                 (self.player_service.playlist_done, self.on_playlist_done),
+                                 (self.player_service.error, self.on_daemon_error)):
+                try:
+                    signal.disconnect(slot)
+                except TypeError:
+                    pass
+            self.player_service = None
+        self.process_launcher.release_player_service(self.session_id)
+        if self.player_handle is not None and self.playlist_running:
+            self.player_handle.terminate()
+        self.session_registry.close(self.session_id, self.session_state)
+        super().closeEvent(event)
+        
     def save_to_history(self, result_record):
         """Save test result to history"""
-        history = JSONHandler.read_json(self.history_file) or []
-        history.append(result_record)
-        JSONHandler.write_json(self.history_file, history)
+        if not self.history_store.append(result_record):
+            QMessageBox.warning(self, "Error", "Failed to save result to history")
         
     def get_current_date(self):
         """Get current date in string format"""
@@ -5,6 +5,8 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 from windows.test_window import TestWindow
+from utils.session_registry import SessionRegistry
+from utils.profile_store import ProfileStore
 
 class MilitaryLineEdit(QLineEdit):
     def __init__(self, placeholder="", parent=None):
@@ -40,6 +42,8 @@ class UserEntryWindow(QDialog):
         super().__init__(parent)
         self.mode = mode  # 'test' or 'practice'
         self.parent = parent
+        self.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+        self.profile_store = ProfileStore.instance(self.data_dir)
         self.init_ui()
         
     def init_ui(self):
@@ -125,6 +129,14 @@ class UserEntryWindow(QDialog):
         id_container.addWidget(self.id_input)
         input_layout.addLayout(id_container)
         
+        # Previous attempts of the trainee whose ID is typed
+        self.profile_label = QLabel("")
+        self.profile_label.setAlignment(Qt.AlignCenter)
+        self.profile_label.setFont(QFont("Arial", 12))
+        self.profile_label.setStyleSheet("color: #e8f5e8; padding: 5px;")
+        input_layout.addWidget(self.profile_label)
+        self.id_input.textChanged.connect(self.show_profile)
+        
         layout.addWidget(input_frame)
         layout.addStretch(1)
         
@@ -195,6 +207,18 @@ class UserEntryWindow(QDialog):
         b = min(255, int(b + (255 - b) * percent / 100))
         return f"#{r:02x}{g:02x}{b:02x}"
         
+    def show_profile(self, user_id):
+        """Summarise the trainee's earlier tests under the ID field"""
+        profile = self.profile_store.get(user_id.strip()) if user_id.strip() else None
+        if profile is None or not profile["count"]:
+            self.profile_label.setText("")
+            return
+        if not self.name_input.text().strip() and profile["name"]:
+            self.name_input.setText(profile["name"])
+        self.profile_label.setText(
+            f"📋 {profile['count']} محاولة - attempts | الأفضل - best {profile['best']}% | "
+            f"الأخيرة - last {profile['last_score']}% ({profile['last_date']})")
+        
     def start_session(self):
         """Start test session"""
         name = self.name_input.text().strip()
@@ -206,6 +230,11 @@ class UserEntryWindow(QDialog):
             return
             
         if self.mode == "test":
+            # Several trainees can be tested at once, but each only once at a time
+            if SessionRegistry.instance(self.data_dir).active_for(user_id) is not None:
+                QMessageBox.warning(self, "خطأ - Error",
+                                  "هذا المتدرب لديه اختبار قيد التشغيل\nThis trainee already has a test running")
+                return
             self.accept()
             self.open_test_window(name, user_id)
         else:
@@ -215,4 +244,9 @@ class UserEntryWindow(QDialog):
     def open_test_window(self, name, user_id):
         """Open test window with user info"""
         self.test_window = TestWindow(name, user_id, self.parent)
+        if self.test_window.session_id is None:
+            # No session could be opened (the window has told the user why)
+            self.test_window.close()
+            self.test_window = None
+            return
         self.test_window.show()
\ No newline at end of file